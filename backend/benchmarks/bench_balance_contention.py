@@ -0,0 +1,115 @@
+"""
+Contention benchmark for account balance writes.
+
+Creates a source and a destination account and N pending transfers between
+them, then confirms all N concurrently, the way N simultaneous OTP
+confirmations against one account would. Every confirmation writes the same
+two account rows, so most attempts hit a version conflict and retry.
+Reports throughput, retry rate and whether the final balances add up.
+
+Needs a disposable database: ledger entries are append-only and are not
+cleaned up.
+
+    cd backend
+    ASYNC_DB_DSN=postgresql+asyncpg://... PYTHONPATH=src \\
+        python benchmarks/bench_balance_contention.py --confirmations 50 --max-attempts 8
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+
+from loguru import logger
+
+from infrastructure import repositories
+from infrastructure.db import engine
+from infrastructure.models import TransactionStatus, TransactionType
+from infrastructure.repositories import (
+    InsufficientFunds,
+    balance_update_stats,
+    create_account,
+    create_transaction,
+    get_account_by_id,
+    get_transaction_by_id,
+    transfer_money_between_accounts,
+)
+from settings import settings
+
+
+async def run(args: argparse.Namespace):
+    run_id = f"bench-{uuid.uuid4().hex[:8]}"
+    amount = Decimal("1.00")
+    initial = amount * args.confirmations * args.funding
+
+    source = await create_account(f"{run_id}-SRC", run_id, "Source", initial)
+    destination = await create_account(f"{run_id}-DST", run_id, "Destination")
+    transactions = [
+        await create_transaction(
+            reference=f"{run_id}-{i}",
+            amount=amount,
+            transaction_type=TransactionType.TRANSFER,
+            from_account_id=source.id,
+            to_account_id=destination.id,
+        )
+        for i in range(args.confirmations)
+    ]
+
+    settings.BALANCE_UPDATE_MAX_ATTEMPTS = args.max_attempts
+    repositories.balance_update_stats = stats = type(balance_update_stats)()
+    insufficient = 0
+
+    async def confirm(transaction_id: int):
+        nonlocal insufficient
+        try:
+            return await transfer_money_between_accounts(
+                source.id, destination.id, amount, transaction_id=transaction_id
+            )
+        except InsufficientFunds:
+            insufficient += 1
+            return None
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(confirm(t.id) for t in transactions))
+    elapsed = time.perf_counter() - started
+
+    settled = sum(1 for result in results if result)
+    source_after = await get_account_by_id(source.id)
+    destination_after = await get_account_by_id(destination.id)
+    completed = 0
+    for transaction in transactions:
+        current = await get_transaction_by_id(transaction.id)
+        completed += current.status == TransactionStatus.COMPLETED
+
+    balanced = (
+        source_after.balance == initial - amount * completed
+        and destination_after.balance == amount * completed
+        and completed == settled
+    )
+
+    print(f"confirmations       {args.confirmations} (pool size {settings.DB_POOL_SIZE})")
+    print(f"settled             {settled}, insufficient funds {insufficient}, gave up {stats.exhausted}")
+    print(f"wall time           {elapsed:.2f}s")
+    print(f"confirmations/sec   {settled / elapsed:.1f}")
+    print(f"attempts            {stats.attempts} ({stats.attempts / max(args.confirmations, 1):.2f} per confirmation)")
+    print(f"retry rate          {stats.conflicts / max(stats.attempts, 1):.1%} of attempts conflicted")
+    print(f"balances consistent {balanced} (source {source_after.balance}, destination {destination_after.balance}, version {source_after.version})")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--confirmations", type=int, default=50)
+    parser.add_argument("--max-attempts", type=int, default=settings.BALANCE_UPDATE_MAX_ATTEMPTS)
+    parser.add_argument(
+        "--funding",
+        type=float,
+        default=1.0,
+        help="source balance as a share of the total transferred; below 1 some confirmations must fail",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logger.remove()
+    engine.echo = False
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,189 @@
+"""
+Offline benchmark for the call scheduler.
+
+Seeds N scheduled calls, points the worker at a local provider stand-in and
+runs worker cycles until every seeded call has been dialed or dead-lettered.
+Reports calls/sec, dispatch lag (scheduled_at -> request received by the
+provider) p50/p99 and DB statements per dial.
+
+Needs a disposable database: the worker claims every due call it can see.
+
+    cd backend
+    ASYNC_DB_DSN=postgresql+asyncpg://... PYTHONPATH=src \
+        python benchmarks/bench_dialing.py --calls 500 --latency-ms 80 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from loguru import logger
+from sqlalchemy import delete, event, func, insert, select
+
+from provider_stub import ProviderStub, ProviderStubConfig
+
+from core.calls.assistants import sync_assistants
+from entrypoints.background_jobs import main as worker
+from infrastructure.db import engine, session_maker
+from infrastructure.models import Call, CallStatus
+from settings import settings
+
+
+async def seed_calls(run_id: str, count: int, scheduled_at: datetime):
+    async with session_maker() as session:
+        await session.execute(
+            insert(Call),
+            [
+                {
+                    "user_id": run_id,
+                    "phone_number": f"6000{i:08d}",
+                    "scheduled_at": scheduled_at,
+                    "status": CallStatus.SCHEDULED,
+                    "language": "en",
+                    "customer_name": f"{run_id}-{i}",
+                }
+                for i in range(count)
+            ],
+        )
+        await session.commit()
+
+
+async def count_open_calls(run_id: str) -> int:
+    async with session_maker() as session:
+        result = await session.execute(
+            select(func.count(Call.id)).where(
+                Call.user_id == run_id, Call.status == CallStatus.SCHEDULED
+            )
+        )
+        return result.scalar_one()
+
+
+async def count_by_status(run_id: str) -> dict[str, int]:
+    async with session_maker() as session:
+        result = await session.execute(
+            select(Call.status, func.count(Call.id))
+            .where(Call.user_id == run_id)
+            .group_by(Call.status)
+        )
+        return {status.value: count for status, count in result.all()}
+
+
+async def delete_calls(run_id: str):
+    async with session_maker() as session:
+        await session.execute(delete(Call).where(Call.user_id == run_id))
+        await session.commit()
+
+
+def percentile(values: list[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+async def run(args: argparse.Namespace):
+    run_id = f"bench-{uuid.uuid4().hex[:8]}"
+    stub_config = ProviderStubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after,
+    )
+
+    async with ProviderStub(stub_config) as stub:
+        settings.VAPI_API_URL = stub.url
+        settings.GROQ_PRIVATE_API_KEY = settings.GROQ_PRIVATE_API_KEY or "bench"
+        settings.GROQ_PHONE_NUMBER_ID = settings.GROQ_PHONE_NUMBER_ID or "bench"
+        settings.CALL_CLAIM_BATCH_SIZE = args.batch_size
+        settings.CALL_RETRY_BASE_SECONDS = args.retry_base
+        settings.CALL_RETRY_MAX_SECONDS = args.retry_base * 8
+        settings.VAPI_PERSISTENT_ASSISTANTS = args.persistent_assistants
+        if args.persistent_assistants:
+            # Faults are for the dial path; register assistants on a clean stub
+            stub.config = ProviderStubConfig(latency_ms=0, jitter_ms=0)
+            settings.VAPI_ASSISTANT_CACHE_PATH = f"/tmp/{run_id}-assistants.json"
+            await sync_assistants()
+            stub.config = stub_config
+            stub.stats.requests = 0
+            stub.stats.bytes_received = 0
+
+        scheduled_at = datetime.utcnow()
+        await seed_calls(run_id, args.calls, scheduled_at)
+
+        statements = 0
+
+        def count_statement(*_):
+            nonlocal statements
+            statements += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+        stopping = asyncio.Event()
+        cycles = polls = 0
+        started = time.perf_counter()
+        try:
+            while await count_open_calls(run_id):
+                polls += 1
+                if not await worker.run_cycle(stopping):
+                    # Everything left is backing off; don't spin on the DB
+                    await asyncio.sleep(0.05)
+                cycles += 1
+                if time.perf_counter() - started > args.timeout:
+                    logger.warning("Benchmark timed out before all calls were dialed")
+                    break
+        finally:
+            elapsed = time.perf_counter() - started
+            event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+        # The open-call polling above is harness overhead, not worker work
+        statements -= polls + 1
+        statuses = await count_by_status(run_id)
+        if not args.keep:
+            await delete_calls(run_id)
+
+    scheduled_ts = scheduled_at.replace(tzinfo=timezone.utc).timestamp()
+    lags_ms = [
+        (received - scheduled_ts) * 1000
+        for name, received in stub.stats.received_at.items()
+        if name.startswith(run_id)
+    ]
+    dials = stub.stats.requests
+
+    print(f"calls seeded        {args.calls}")
+    print(f"final statuses      {statuses}")
+    print(f"worker cycles       {cycles}")
+    print(f"provider requests   {dials} (created {stub.stats.created}, 5xx {stub.stats.errors}, 429 {stub.stats.rate_limited})")
+    print(f"wall time           {elapsed:.2f}s")
+    print(f"calls/sec           {dials / elapsed:.1f}")
+    print(f"dispatch lag p50    {percentile(lags_ms, 50):.0f} ms")
+    print(f"dispatch lag p99    {percentile(lags_ms, 99):.0f} ms")
+    print(f"DB statements/dial  {statements / max(dials, 1):.2f}")
+    print(f"request bytes/dial  {stub.stats.bytes_received / max(dials, 1):.0f}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=50, help="calls claimed per worker cycle")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 503 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After sent with 429s")
+    parser.add_argument("--retry-base", type=float, default=0.2, help="backoff base seconds")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--keep", action="store_true", help="keep seeded calls after the run")
+    parser.add_argument(
+        "--persistent-assistants",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="dial registered assistants by id instead of sending them inline",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logger.remove()
+    engine.echo = False
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,213 @@
+"""
+Benchmark for transaction history reads on a large transactions table.
+
+Seeds N transactions (10M by default) spread over a set of accounts with
+server-side generate_series inserts, then compares, for a sample of accounts:
+
+- first page: the OR query of get_account_transactions vs the UNION ALL of
+  index range scans in get_transaction_history
+- a deep page: OFFSET on the OR query vs a keyset cursor
+- a user's full history across several accounts
+
+Reports p50/p99 per query and, with --explain, one plan of each. Seeding
+10M rows takes a few minutes; pass --keep and --reuse to benchmark the same
+data again.
+
+Needs a disposable database.
+
+    cd backend
+    ASYNC_DB_DSN=postgresql+asyncpg://... PYTHONPATH=src \\
+        python benchmarks/bench_history.py --transactions 10000000 --accounts 100000 --keep
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import desc, or_, select, text
+
+from infrastructure.db import engine, session_maker
+from infrastructure.models import BankAccount, Transaction
+from infrastructure.repositories import (
+    _transaction_history_statement,
+    get_account_transactions,
+    get_transaction_history,
+)
+
+SEED_CHUNK = 1_000_000
+
+
+async def seed(run_id: str, accounts: int, transactions: int):
+    async with session_maker() as session:
+        await session.execute(
+            text(
+                """
+                INSERT INTO bank_accounts (account_number, user_id, balance, status, title, version, created_at, updated_at)
+                SELECT :run_id || '-' || g, :run_id || '-user-' || (g % :users), 0, 'ACTIVE', 'Account ' || g, 0, now(), now()
+                FROM generate_series(1, :accounts) g
+                """
+            ),
+            {"run_id": run_id, "accounts": accounts, "users": max(accounts // 3, 1)},
+        )
+        await session.commit()
+
+    # ~10% of rows are bill payments with no destination account
+    seeded = 0
+    while seeded < transactions:
+        chunk = min(SEED_CHUNK, transactions - seeded)
+        started = time.perf_counter()
+        async with session_maker() as session:
+            await session.execute(
+                text(
+                    """
+                    WITH ids AS (
+                        SELECT array_agg(id) AS a, count(*) AS n FROM bank_accounts WHERE account_number LIKE :run_id || '-%'
+                    )
+                    INSERT INTO transactions (reference, from_account_id, to_account_id, amount, type, status, created_at, updated_at)
+                    SELECT
+                        'BENCH-' || :run_id || '-' || g,
+                        ids.a[1 + floor(random() * ids.n)::int],
+                        CASE WHEN random() < 0.1 THEN NULL ELSE ids.a[1 + floor(random() * ids.n)::int] END,
+                        round((random() * 500)::numeric, 2),
+                        'TRANSFER',
+                        'COMPLETED',
+                        now() - random() * interval '365 days',
+                        now()
+                    FROM ids, generate_series(:first, :last) g
+                    """
+                ),
+                {"run_id": run_id, "first": seeded + 1, "last": seeded + chunk},
+            )
+            await session.commit()
+        seeded += chunk
+        print(f"seeded {seeded}/{transactions} transactions ({time.perf_counter() - started:.1f}s)")
+
+    async with engine.connect() as connection:
+        await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text("ANALYZE bank_accounts"))
+        await connection.execute(text("ANALYZE transactions"))
+
+
+async def load_accounts(run_id: str) -> dict[str, list[int]]:
+    """Seeded account ids grouped by user."""
+    async with session_maker() as session:
+        result = await session.execute(
+            select(BankAccount.user_id, BankAccount.id).where(BankAccount.account_number.like(f"{run_id}-%"))
+        )
+        users: dict[str, list[int]] = {}
+        for user_id, account_id in result.all():
+            users.setdefault(user_id, []).append(account_id)
+        return users
+
+
+def _or_query(account_id: int):
+    return select(Transaction).where(
+        or_(Transaction.from_account_id == account_id, Transaction.to_account_id == account_id)
+    ).order_by(desc(Transaction.created_at))
+
+
+async def offset_page(account_id: int, limit: int, offset: int):
+    async with session_maker() as session:
+        result = await session.execute(_or_query(account_id).offset(offset).limit(limit))
+        return list(result.scalars().all())
+
+
+async def cursor_at_page(account_ids: list[int], limit: int, page: int):
+    cursor = None
+    for _ in range(page):
+        _, cursor = await get_transaction_history(account_ids, limit, cursor=cursor)
+        if cursor is None:
+            break
+    return cursor
+
+
+async def timed(samples: list, operation: Callable[[], Awaitable]):
+    started = time.perf_counter()
+    await operation()
+    samples.append((time.perf_counter() - started) * 1000)
+
+
+def percentile(values: list[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+async def explain(statement) -> str:
+    compiled = statement.compile(engine.sync_engine, compile_kwargs={"literal_binds": True})
+    async with session_maker() as session:
+        result = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}"))
+        return "\n".join(row[0] for row in result.all())
+
+
+async def run(args: argparse.Namespace):
+    run_id = args.reuse or f"bench-{uuid.uuid4().hex[:8]}"
+    if not args.reuse:
+        await seed(run_id, args.accounts, args.transactions)
+
+    users = await load_accounts(run_id)
+    if not users:
+        raise SystemExit(f"No seeded accounts for run {run_id}")
+    rng = random.Random(args.seed)
+    sample_users = rng.sample(sorted(users), min(args.samples, len(users)))
+    sample_accounts = [users[user][0] for user in sample_users]
+
+    results: dict[str, list[float]] = {
+        "first page, OR + LIMIT": [],
+        "first page, UNION ALL": [],
+        f"page {args.depth}, OR + OFFSET": [],
+        f"page {args.depth}, keyset cursor": [],
+        "all accounts of a user, UNION ALL": [],
+    }
+    names = list(results)
+    for user, account_id in zip(sample_users, sample_accounts):
+        await timed(results[names[0]], lambda: get_account_transactions(account_id, args.limit))
+        await timed(results[names[1]], lambda: get_transaction_history([account_id], args.limit))
+
+        await timed(results[names[2]], lambda: offset_page(account_id, args.limit, args.limit * (args.depth - 1)))
+        cursor = await cursor_at_page([account_id], args.limit, args.depth - 1)
+        await timed(results[names[3]], lambda: get_transaction_history([account_id], args.limit, cursor=cursor))
+
+        await timed(results[names[4]], lambda: get_transaction_history(users[user], args.limit))
+
+    print(f"run                 {run_id}")
+    print(f"accounts sampled    {len(sample_accounts)}, page size {args.limit}")
+    for name, samples in results.items():
+        print(f"{name:<36} p50 {percentile(samples, 50):8.2f} ms   p99 {percentile(samples, 99):8.2f} ms")
+
+    if args.explain:
+        account_id = sample_accounts[0]
+        print("\nOR + LIMIT plan:")
+        print(await explain(_or_query(account_id).limit(args.limit)))
+        print("\nUNION ALL plan:")
+        print(await explain(_transaction_history_statement([account_id], args.limit, None, None, None)))
+
+    if not args.keep:
+        async with session_maker() as session:
+            await session.execute(text("DELETE FROM transactions WHERE reference LIKE 'BENCH-' || :run_id || '-%'"), {"run_id": run_id})
+            await session.execute(text("DELETE FROM bank_accounts WHERE account_number LIKE :run_id || '-%'"), {"run_id": run_id})
+            await session.commit()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=10_000_000)
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=200, help="accounts to time the queries on")
+    parser.add_argument("--limit", type=int, default=5, help="page size")
+    parser.add_argument("--depth", type=int, default=20, help="page number for the deep-page comparison")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--explain", action="store_true", help="print EXPLAIN ANALYZE of the queries")
+    parser.add_argument("--keep", action="store_true", help="keep seeded rows after the run")
+    parser.add_argument("--reuse", help="benchmark the rows kept by an earlier run id instead of seeding")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logger.remove()
+    engine.echo = False
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,83 @@
+"""
+Concurrency benchmark for OTP issuance and verification.
+
+Issues N OTPs for one user concurrently, the way a caller repeating "send me
+a new code" or several overlapping calls would. Then it checks the issuance
+invariants: every issuance got its own OTP, exactly one of them is still
+pending, and only that one's token verifies. The surviving token is then
+verified N times concurrently, and exactly one verification must win.
+
+Uses a fresh user id per run, so it can share a database with other data.
+
+    cd backend
+    ASYNC_DB_DSN=postgresql+asyncpg://... PYTHONPATH=src \\
+        python benchmarks/bench_otp_issuance.py --requests 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from loguru import logger
+
+from infrastructure.db import engine
+from infrastructure.models import OTPStatus
+from infrastructure.repositories import create_otp, get_otps_by_user, verify_and_use_otp
+from settings import settings
+
+
+async def run(args: argparse.Namespace):
+    user_id = f"bench-{uuid.uuid4().hex[:8]}"
+
+    started = time.perf_counter()
+    issued = await asyncio.gather(*(create_otp(user_id, None) for _ in range(args.requests)))
+    issue_elapsed = time.perf_counter() - started
+
+    otps = await get_otps_by_user(user_id, limit=args.requests + 1)
+    pending = [otp for otp in otps if otp.status == OTPStatus.PENDING]
+    expired = sum(1 for otp in otps if otp.status == OTPStatus.EXPIRED)
+    plaintext = sum(1 for otp in otps if otp.token is not None)
+    winner = next((otp for otp in issued if pending and otp.id == pending[0].id), None)
+
+    # Every losing token must be rejected, and must not consume the winner
+    stale = [otp for otp in issued if winner is None or otp.token != winner.token]
+    stale_accepted = sum(
+        1 for result in await asyncio.gather(*(verify_and_use_otp(user_id, otp.token) for otp in stale)) if result
+    )
+
+    started = time.perf_counter()
+    verified = []
+    if winner:
+        verified = await asyncio.gather(*(verify_and_use_otp(user_id, winner.token) for _ in range(args.requests)))
+    verify_elapsed = time.perf_counter() - started
+    winners = sum(1 for result in verified if result)
+
+    consistent = (
+        len({otp.id for otp in issued}) == args.requests
+        and len(otps) == args.requests
+        and len(pending) == 1
+        and winner is not None
+        and stale_accepted == 0
+        and winners == 1
+        and plaintext == 0
+    )
+
+    print(f"requests            {args.requests} (pool size {settings.DB_POOL_SIZE})")
+    print(f"issued              {len(issued)} in {issue_elapsed:.2f}s ({len(issued) / issue_elapsed:.1f}/s)")
+    print(f"pending / expired   {len(pending)} / {expired}")
+    print(f"stale accepted      {stale_accepted} of {len(stale)}")
+    print(f"verifications won   {winners} of {len(verified)} in {verify_elapsed:.2f}s")
+    print(f"plaintext tokens    {plaintext}")
+    print(f"consistent          {consistent}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logger.remove()
+    engine.echo = False
+    asyncio.run(run(parse_args()))
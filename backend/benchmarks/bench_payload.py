@@ -0,0 +1,83 @@
+"""
+Per-call cost of building and encoding the POST /call body.
+
+Compares the dict path (build_call_payload + json encoding of the whole
+request, as httpx does for json=) with build_call_request, which splices the
+per-call fields onto the pre-encoded assistant for the call's language.
+
+    cd backend
+    PYTHONPATH=src python benchmarks/bench_payload.py --iterations 20000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from core.calls.build_payload import (
+    PER_LANGUAGE_CONFIGS,
+    build_call_payload,
+    build_call_request,
+    invalidate_payload_cache,
+    warm_payload_cache,
+)
+from infrastructure.models import Call
+from settings import settings
+
+
+def make_call(i: int, language: str) -> Call:
+    return Call(
+        id=i,
+        phone_number=f"+6000{i:08d}",
+        customer_name=f"Customer {i}",
+        language=language,
+        scheduled_at=datetime.utcnow(),
+    )
+
+
+async def dict_path(call: Call) -> bytes:
+    assistant = await build_call_payload(call)
+    body = {
+        "assistant": assistant,
+        "phoneNumberId": settings.GROQ_PHONE_NUMBER_ID,
+        "customer": {"number": call.phone_number, "name": call.customer_name},
+    }
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+async def run(iterations: int):
+    languages = list(PER_LANGUAGE_CONFIGS)
+    calls = [make_call(i, languages[i % len(languages)]) for i in range(iterations)]
+
+    # Both paths must produce the same request
+    for call in calls[: len(languages)]:
+        assert json.loads(build_call_request(call)) == json.loads(await dict_path(call))
+
+    started = time.perf_counter()
+    for call in calls:
+        await dict_path(call)
+    dict_seconds = time.perf_counter() - started
+
+    invalidate_payload_cache()
+    started = time.perf_counter()
+    warm_payload_cache()
+    warm_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for call in calls:
+        build_call_request(call)
+    spliced_seconds = time.perf_counter() - started
+
+    size = len(build_call_request(calls[0]))
+    print(f"iterations          {iterations}")
+    print(f"request size        {size} bytes")
+    print(f"dict + encode       {dict_seconds / iterations * 1e6:.1f} us/call")
+    print(f"cached splice       {spliced_seconds / iterations * 1e6:.1f} us/call")
+    print(f"cache warm-up       {warm_seconds * 1e3:.2f} ms ({len(languages)} languages)")
+    print(f"speedup             {dict_seconds / spliced_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    asyncio.run(run(parser.parse_args().iterations))
@@ -0,0 +1,113 @@
+"""
+Cost of writing out a 50-account listing for text-to-speech.
+
+Compares the previous rendering (num2words per balance, a regex substitution
+per account number that reads it as one big integer) with
+core.tools.spoken_numbers, both cold (tables and caches empty, as on the
+first listing after startup) and warm (as on later listings). Balances
+repeat across accounts the way round amounts do in real portfolios.
+
+    cd backend
+    PYTHONPATH=src python benchmarks/bench_spoken_numbers.py --accounts 50 --iterations 200 --language ms
+"""
+import argparse
+import random
+import re
+import time
+from decimal import Decimal
+
+from num2words import num2words
+
+from core.tools import spoken_numbers
+from core.tools.spoken_numbers import amounts_to_words, number_to_words, spell_digits
+
+
+def legacy_numbers_to_words(text: str, lang="en") -> str:
+    def replace(match):
+        number = match.group(0)
+        if "." in number:
+            whole, frac = number.split(".")
+            return f"{num2words(int(whole), lang=lang)} point {' '.join(num2words(int(d), lang=lang) for d in frac)}"
+        return num2words(int(number), lang=lang)
+
+    return re.sub(r"\b\d+(\.\d+)?\b", replace, text)
+
+
+def legacy_ringgit_to_words(amount) -> str:
+    ringgit = int(amount)
+    sen = int(round((amount - ringgit) * 100))
+    if sen:
+        return f"{num2words(ringgit)} ringgit and {num2words(sen)} sen"
+    return f"{num2words(ringgit)} ringgit"
+
+
+def legacy_listing(accounts: list[tuple[str, str, Decimal]]) -> str:
+    lines = [
+        f"- {title}: Account number {legacy_numbers_to_words(number)}, Balance: {legacy_ringgit_to_words(balance)}"
+        for title, number, balance in accounts
+    ]
+    return f"You have {num2words(len(accounts))} accounts:\n" + "\n".join(lines)
+
+
+def listing(accounts: list[tuple[str, str, Decimal]], language: str) -> str:
+    balances = amounts_to_words([balance for _, _, balance in accounts], language)
+    lines = [
+        f"- {title}: Account number {spell_digits(number, language)}, Balance: {balance_text}"
+        for (title, number, _), balance_text in zip(accounts, balances)
+    ]
+    return f"You have {number_to_words(len(accounts), language)} accounts:\n" + "\n".join(lines)
+
+
+def clear_caches():
+    for cached in (
+        spoken_numbers._converter,
+        spoken_numbers._small_numbers,
+        spoken_numbers._large_number_to_words,
+        spoken_numbers._amount_to_words,
+    ):
+        cached.cache_clear()
+
+
+def time_it(render, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    return (time.perf_counter() - started) / iterations
+
+
+def run(args: argparse.Namespace):
+    rng = random.Random(42)
+    amounts = [Decimal(rng.choice([0, 50, 100, 250, 1000, 12345])) + Decimal(rng.randrange(100)) / 100 for _ in range(10)]
+    accounts = [
+        (f"Account {i}", f"{rng.randrange(10**12):012d}{rng.randrange(10)}", rng.choice(amounts))
+        for i in range(args.accounts)
+    ]
+
+    # num2words' own import is paid by both paths; keep it out of the cold timing
+    num2words(1)
+
+    legacy = time_it(lambda: legacy_listing(accounts), args.iterations)
+    clear_caches()
+    started = time.perf_counter()
+    listing(accounts, args.language)
+    cold = time.perf_counter() - started
+    warm = time_it(lambda: listing(accounts, args.language), args.iterations)
+
+    print(f"accounts       {args.accounts}, language {args.language}")
+    print(f"legacy (en)    {legacy * 1000:.3f} ms per listing")
+    print(f"cold           {cold * 1000:.3f} ms for the first listing")
+    print(f"warm           {warm * 1000:.3f} ms per listing ({legacy / warm:.1f}x faster)")
+    print()
+    print(listing(accounts[:3], args.language))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--language", default="en")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
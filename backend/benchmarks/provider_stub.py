@@ -0,0 +1,144 @@
+"""
+Local stand-in for the Vapi REST API.
+
+Accepts POST /call like https://api.vapi.ai/call and answers with a fake call
+id after a configurable delay. GET/POST /assistant and PATCH /assistant/{id}
+keep persistent assistants in memory. A share of requests can be answered with 5xx
+errors or 429s carrying a Retry-After header, so retry handling can be
+exercised without placing real phone calls.
+
+Point the backend at it with settings.VAPI_API_URL = stub.url.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class ProviderStubConfig:
+    latency_ms: float = 50.0
+    # Uniform jitter added on top of latency_ms
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+
+
+@dataclass
+class ProviderStubStats:
+    requests: int = 0
+    created: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    assistant_writes: int = 0
+    bytes_received: int = 0
+    # Receive time (time.time()) of the first request, by customer name
+    received_at: dict[str, float] = field(default_factory=dict)
+
+
+class ProviderStub:
+    def __init__(self, config: Optional[ProviderStubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or ProviderStubConfig()
+        self.stats = ProviderStubStats()
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.Server] = None
+        self.assistants: dict[str, dict] = {}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "ProviderStub":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "ProviderStub":
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode().strip()
+            if not request_line:
+                return
+            method, path, _ = request_line.split(" ", 2)
+
+            content_length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode().partition(":")
+                if name.strip().lower() == "content-length":
+                    content_length = int(value.strip())
+            body = await reader.readexactly(content_length) if content_length else b""
+
+            status, headers, payload = await self.respond(method, path, body)
+            data = json.dumps(payload).encode()
+            head = f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\nConnection: close\r\n"
+            for name, value in headers.items():
+                head += f"{name}: {value}\r\n"
+            writer.write(head.encode() + b"\r\n" + data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def respond(self, method: str, path: str, body: bytes) -> tuple[str, dict, dict | list]:
+        """Build the (status line, headers, json body) for a request."""
+        self.stats.requests += 1
+        self.stats.bytes_received += len(body)
+        payload = json.loads(body) if body else {}
+
+        customer = (payload.get("customer") or {}).get("name")
+        if customer:
+            self.stats.received_at.setdefault(customer, time.time())
+
+        config = self.config
+        await asyncio.sleep((config.latency_ms + random.uniform(0, config.jitter_ms)) / 1000)
+
+        roll = random.random()
+        if roll < config.rate_limit_rate:
+            self.stats.rate_limited += 1
+            return (
+                "429 Too Many Requests",
+                {"Retry-After": f"{config.retry_after_seconds:g}"},
+                {"message": "rate limited"},
+            )
+        if roll < config.rate_limit_rate + config.error_rate:
+            self.stats.errors += 1
+            return "503 Service Unavailable", {}, {"message": "upstream unavailable"}
+
+        if method == "POST" and path == "/call":
+            if "assistantId" in payload and payload["assistantId"] not in self.assistants:
+                return "404 Not Found", {}, {"message": "unknown assistantId"}
+            self.stats.created += 1
+            return "201 Created", {}, {"id": str(uuid.uuid4()), "status": "queued"}
+
+        if method == "GET" and path == "/assistant":
+            return "200 OK", {}, list(self.assistants.values())
+
+        if method == "POST" and path == "/assistant":
+            self.stats.assistant_writes += 1
+            assistant = {**payload, "id": str(uuid.uuid4())}
+            self.assistants[assistant["id"]] = assistant
+            return "201 Created", {}, assistant
+
+        if method == "PATCH" and path.startswith("/assistant/"):
+            assistant_id = path.removeprefix("/assistant/")
+            if assistant_id not in self.assistants:
+                return "404 Not Found", {}, {"message": "assistant not found"}
+            self.stats.assistant_writes += 1
+            self.assistants[assistant_id] = {**payload, "id": assistant_id}
+            return "200 OK", {}, self.assistants[assistant_id]
+
+        return "404 Not Found", {}, {"message": f"no route for {method} {path}"}
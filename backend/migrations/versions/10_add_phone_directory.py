@@ -0,0 +1,93 @@
+"""add phone directory
+
+Revision ID: a0f9f26c1d3d7
+Revises: 9f9f26c1d3d6
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a0f9f26c1d3d7'
+down_revision: Union[str, Sequence[str], None] = '9f9f26c1d3d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'phone_directory',
+        sa.Column('phone_number', sa.String(length=16), nullable=False),
+        sa.Column('user_id', sa.String(length=255), nullable=False),
+        sa.Column('source', sa.Enum('ONBOARDING', 'CALL', name='phonenumbersource'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('phone_number'),
+    )
+    op.create_index(op.f('ix_phone_directory_user_id'), 'phone_directory', ['user_id'], unique=False)
+
+    # Same rules as infrastructure.phone_directory.normalize_phone_number; the
+    # default country code is PHONE_DEFAULT_COUNTRY_CODE
+    op.execute("""
+        CREATE FUNCTION normalize_phone_number(raw text, default_country_code text DEFAULT '60')
+        RETURNS text AS $$
+            SELECT CASE WHEN digits ~ '^[1-9][0-9]{7,14}$' THEN '+' || digits END
+            FROM (
+                SELECT CASE
+                    WHEN cleaned LIKE '+%' THEN substr(cleaned, 2)
+                    WHEN cleaned LIKE '00%' THEN substr(cleaned, 3)
+                    WHEN cleaned LIKE '0%' THEN default_country_code || substr(cleaned, 2)
+                    ELSE cleaned
+                END AS digits
+                FROM (SELECT regexp_replace(coalesce(raw, ''), '[^0-9+]', '', 'g') AS cleaned) AS c
+            ) AS d
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+
+    # Calls are created by the dashboard with raw SQL as well as by the
+    # backend; register their numbers here so both are covered. The latest
+    # call wins, except over numbers registered at onboarding.
+    op.execute("""
+        CREATE FUNCTION calls_register_phone_number() RETURNS trigger AS $$
+        DECLARE
+            normalized text := normalize_phone_number(NEW.phone_number);
+        BEGIN
+            IF normalized IS NOT NULL THEN
+                INSERT INTO phone_directory (phone_number, user_id, source, created_at, updated_at)
+                VALUES (normalized, NEW.user_id, 'CALL', timezone('utc', now()), timezone('utc', now()))
+                ON CONFLICT (phone_number) DO UPDATE
+                    SET user_id = EXCLUDED.user_id, updated_at = EXCLUDED.updated_at
+                    WHERE phone_directory.source = 'CALL' AND phone_directory.user_id <> EXCLUDED.user_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER calls_register_phone_number
+        AFTER INSERT OR UPDATE OF phone_number, user_id ON calls
+        FOR EACH ROW EXECUTE FUNCTION calls_register_phone_number()
+    """)
+
+    op.execute("""
+        INSERT INTO phone_directory (phone_number, user_id, source, created_at, updated_at)
+        SELECT DISTINCT ON (normalized) normalized, user_id, 'CALL', timezone('utc', now()), timezone('utc', now())
+        FROM (SELECT normalize_phone_number(phone_number) AS normalized, user_id, created_at FROM calls) AS numbered
+        WHERE normalized IS NOT NULL
+        ORDER BY normalized, created_at DESC
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS calls_register_phone_number ON calls")
+    op.execute("DROP FUNCTION IF EXISTS calls_register_phone_number()")
+    op.execute("DROP FUNCTION IF EXISTS normalize_phone_number(text, text)")
+    op.drop_index(op.f('ix_phone_directory_user_id'), table_name='phone_directory')
+    op.drop_table('phone_directory')
+    op.execute("DROP TYPE IF EXISTS phonenumbersource")
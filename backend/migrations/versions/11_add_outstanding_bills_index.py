@@ -0,0 +1,34 @@
+"""add outstanding bills index
+
+Revision ID: b0f9f26c1d3d8
+Revises: a0f9f26c1d3d7
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b0f9f26c1d3d8'
+down_revision: Union[str, Sequence[str], None] = 'a0f9f26c1d3d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_bill_user_outstanding_due',
+        'bills',
+        ['user_id', 'due_date', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('PENDING', 'OVERDUE')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bill_user_outstanding_due', table_name='bills')
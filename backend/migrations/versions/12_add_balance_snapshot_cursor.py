@@ -0,0 +1,42 @@
+"""add balance snapshot cursor
+
+Revision ID: c0f9f26c1d3d9
+Revises: b0f9f26c1d3d8
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0f9f26c1d3d9'
+down_revision: Union[str, Sequence[str], None] = 'b0f9f26c1d3d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('balance_snapshot_cursor',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('last_entry_id', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Resume from the snapshots; counterparty legs past them are re-read once
+    op.execute("""
+        INSERT INTO balance_snapshot_cursor (id, last_entry_id, created_at, updated_at)
+        SELECT 1, COALESCE(MAX(last_entry_id), 0), now(), now() FROM account_balance_snapshots
+    """)
+    # Only served the max(last_entry_id) watermark the cursor replaces
+    op.drop_index('ix_snapshot_last_entry', table_name='account_balance_snapshots')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_snapshot_last_entry', 'account_balance_snapshots', ['last_entry_id'], unique=False)
+    op.drop_table('balance_snapshot_cursor')
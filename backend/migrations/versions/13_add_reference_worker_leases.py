@@ -0,0 +1,43 @@
+"""add reference worker leases
+
+Revision ID: d0f9f26c1d3da
+Revises: c0f9f26c1d3d9
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0f9f26c1d3da'
+down_revision: Union[str, Sequence[str], None] = 'c0f9f26c1d3d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reference_worker_leases',
+        sa.Column('id', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('holder', sa.String(length=100), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # One row per worker id, all free
+    op.execute("""
+        INSERT INTO reference_worker_leases (id, holder, expires_at, created_at, updated_at)
+        SELECT worker_id, NULL, 'epoch', now(), now() FROM generate_series(0, 1023) AS worker_id
+    """)
+    # Worker ids taken from it were never handed back, so they wrapped after 1024 starts
+    op.execute("DROP SEQUENCE IF EXISTS reference_worker_seq")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("CREATE SEQUENCE reference_worker_seq START WITH 0 MINVALUE 0")
+    op.drop_table('reference_worker_leases')
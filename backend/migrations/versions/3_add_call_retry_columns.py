@@ -0,0 +1,34 @@
+"""add call retry columns
+
+Revision ID: 3f9f26c1d3d0
+Revises: 2f9f26c1d3cf
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9f26c1d3d0'
+down_revision: Union[str, Sequence[str], None] = '2f9f26c1d3cf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('calls', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('calls', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    op.add_column('calls', sa.Column('last_error', sa.Text(), nullable=True))
+    op.create_index('ix_call_status_next_attempt', 'calls', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_call_status_next_attempt', table_name='calls')
+    op.drop_column('calls', 'last_error')
+    op.drop_column('calls', 'next_attempt_at')
+    op.drop_column('calls', 'attempts')
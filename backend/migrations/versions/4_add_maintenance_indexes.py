@@ -0,0 +1,30 @@
+"""add maintenance indexes
+
+Revision ID: 4f9f26c1d3d1
+Revises: 3f9f26c1d3d0
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f9f26c1d3d1'
+down_revision: Union[str, Sequence[str], None] = '3f9f26c1d3d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_otp_status_expires', 'otps', ['status', 'expires_at'], unique=False)
+    op.create_index('ix_bill_status_due', 'bills', ['status', 'due_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bill_status_due', table_name='bills')
+    op.drop_index('ix_otp_status_expires', table_name='otps')
@@ -0,0 +1,97 @@
+"""add ledger
+
+Revision ID: 5f9f26c1d3d2
+Revises: 4f9f26c1d3d1
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f9f26c1d3d2'
+down_revision: Union[str, Sequence[str], None] = '4f9f26c1d3d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SEQUENCE ledger_postings_seq")
+    op.create_table('ledger_entries',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('posting_id', sa.BigInteger(), nullable=False),
+        sa.Column('account_id', sa.BigInteger(), nullable=True),
+        sa.Column('counterparty', sa.String(length=100), nullable=True),
+        sa.Column('transaction_id', sa.BigInteger(), nullable=True),
+        sa.Column('amount', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('type', sa.Enum('OPENING_BALANCE', 'TRANSFER', 'BILL_PAYMENT', 'ACCOUNT_CLOSURE', name='ledgerentrytype'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['bank_accounts.id'], ),
+        sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ),
+        sa.CheckConstraint('(account_id IS NULL) <> (counterparty IS NULL)', name='ck_ledger_entry_party'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ledger_entries_posting_id'), 'ledger_entries', ['posting_id'], unique=False)
+    op.create_index(op.f('ix_ledger_entries_transaction_id'), 'ledger_entries', ['transaction_id'], unique=False)
+    op.create_index('ix_ledger_account_id', 'ledger_entries', ['account_id', 'id'], unique=False)
+    op.create_index('ix_ledger_created', 'ledger_entries', ['created_at'], unique=False)
+
+    # Entries are append-only
+    op.execute("""
+        CREATE FUNCTION ledger_entries_immutable() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'ledger_entries is append-only';
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER ledger_entries_immutable
+        BEFORE UPDATE OR DELETE ON ledger_entries
+        FOR EACH ROW EXECUTE FUNCTION ledger_entries_immutable()
+    """)
+
+    op.create_table('account_balance_snapshots',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('account_id', sa.BigInteger(), nullable=False),
+        sa.Column('balance', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('last_entry_id', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['bank_accounts.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('account_id')
+    )
+    op.create_index('ix_snapshot_last_entry', 'account_balance_snapshots', ['last_entry_id'], unique=False)
+
+    # Open the ledger with the current balance of every existing account
+    op.execute("""
+        WITH accounts AS (
+            SELECT id, balance, nextval('ledger_postings_seq') AS posting_id
+            FROM bank_accounts
+            WHERE balance <> 0
+        )
+        INSERT INTO ledger_entries (posting_id, account_id, counterparty, amount, type, created_at, updated_at)
+        SELECT posting_id, id, NULL, balance, 'OPENING_BALANCE', now(), now() FROM accounts
+        UNION ALL
+        SELECT posting_id, NULL, 'OPENING_BALANCE', -balance, 'OPENING_BALANCE', now(), now() FROM accounts
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_snapshot_last_entry', table_name='account_balance_snapshots')
+    op.drop_table('account_balance_snapshots')
+    op.execute("DROP TRIGGER IF EXISTS ledger_entries_immutable ON ledger_entries")
+    op.execute("DROP FUNCTION IF EXISTS ledger_entries_immutable()")
+    op.drop_index('ix_ledger_created', table_name='ledger_entries')
+    op.drop_index('ix_ledger_account_id', table_name='ledger_entries')
+    op.drop_index(op.f('ix_ledger_entries_transaction_id'), table_name='ledger_entries')
+    op.drop_index(op.f('ix_ledger_entries_posting_id'), table_name='ledger_entries')
+    op.drop_table('ledger_entries')
+    op.execute("DROP TYPE IF EXISTS ledgerentrytype")
+    op.execute("DROP SEQUENCE IF EXISTS ledger_postings_seq")
@@ -0,0 +1,48 @@
+"""add account version
+
+Revision ID: 6f9f26c1d3d3
+Revises: 5f9f26c1d3d2
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f9f26c1d3d3'
+down_revision: Union[str, Sequence[str], None] = '5f9f26c1d3d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bank_accounts', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+    # The dashboard updates bank_accounts with raw SQL; bump the version for
+    # any write that didn't, so backend compare-and-swap updates see it
+    op.execute("""
+        CREATE FUNCTION bank_accounts_bump_version() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.version = OLD.version THEN
+                NEW.version := OLD.version + 1;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER bank_accounts_bump_version
+        BEFORE UPDATE ON bank_accounts
+        FOR EACH ROW EXECUTE FUNCTION bank_accounts_bump_version()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS bank_accounts_bump_version ON bank_accounts")
+    op.execute("DROP FUNCTION IF EXISTS bank_accounts_bump_version()")
+    op.drop_column('bank_accounts', 'version')
@@ -0,0 +1,28 @@
+"""add account number sequence
+
+Revision ID: 7f9f26c1d3d4
+Revises: 6f9f26c1d3d3
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f9f26c1d3d4'
+down_revision: Union[str, Sequence[str], None] = '6f9f26c1d3d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The increment is the allocator's block size, keep it in sync with ACCOUNT_NUMBER_SEQUENCE
+    op.execute("CREATE SEQUENCE account_number_seq INCREMENT BY 100 START WITH 1")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP SEQUENCE IF EXISTS account_number_seq")
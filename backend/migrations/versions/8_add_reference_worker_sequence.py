@@ -0,0 +1,28 @@
+"""add reference worker sequence
+
+Revision ID: 8f9f26c1d3d5
+Revises: 7f9f26c1d3d4
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f9f26c1d3d5'
+down_revision: Union[str, Sequence[str], None] = '7f9f26c1d3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Each process takes one value on first use, as its worker id modulo 1024
+    op.execute("CREATE SEQUENCE reference_worker_seq START WITH 0 MINVALUE 0")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP SEQUENCE IF EXISTS reference_worker_seq")
@@ -0,0 +1,51 @@
+"""hash otp tokens
+
+Revision ID: 9f9f26c1d3d6
+Revises: 8f9f26c1d3d5
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f9f26c1d3d6'
+down_revision: Union[str, Sequence[str], None] = '8f9f26c1d3d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('otps', sa.Column('token_hash', sa.String(length=64), nullable=True))
+    op.alter_column('otps', 'token', existing_type=sa.String(length=6), nullable=True)
+    # Pending plaintext OTPs can't be verified any more, and users could hold
+    # several; expire them and drop every stored plaintext token
+    op.execute(
+        "UPDATE otps SET token = NULL, "
+        "status = CASE WHEN status = 'PENDING' THEN 'EXPIRED' ELSE status END, "
+        "updated_at = now()"
+    )
+    op.create_index(
+        'ux_otp_user_pending',
+        'otps',
+        ['user_id'],
+        unique=True,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_otp_user_pending', table_name='otps', postgresql_where=sa.text("status = 'PENDING'"))
+    # Hashed tokens can't be restored; their OTPs are expired and keep an empty token
+    op.execute(
+        "UPDATE otps SET token = '', "
+        "status = CASE WHEN status = 'PENDING' THEN 'EXPIRED' ELSE status END "
+        "WHERE token IS NULL"
+    )
+    op.alter_column('otps', 'token', existing_type=sa.String(length=6), nullable=False)
+    op.drop_column('otps', 'token_hash')
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+
+import httpx
+from loguru import logger
+
+from core.calls.build_payload import (
+    PER_LANGUAGE_CONFIGS,
+    SupportedLanguage,
+    build_assistant_config,
+)
+from settings import settings
+
+
+# language -> provider assistant id, filled by sync_assistants()
+_ASSISTANT_IDS: dict[str, str] = {}
+
+
+def get_assistant_id(language: str) -> str | None:
+    """Persistent assistant to dial for a language, if one has been synced."""
+    return _ASSISTANT_IDS.get(language)
+
+
+def forget_assistant(language: str, assistant_id: str):
+    """
+    Stop dialing an assistant the provider no longer has.
+
+    Drops it from the ids in memory and from the on-disk cache, so calls in
+    `language` go out inline and the next sync creates it again.
+    """
+    if _ASSISTANT_IDS.get(language) == assistant_id:
+        del _ASSISTANT_IDS[language]
+    cache_path = Path(settings.VAPI_ASSISTANT_CACHE_PATH)
+    cache = _load_cache(cache_path)
+    if (cache.get(language) or {}).get("id") == assistant_id:
+        del cache[language]
+        _save_cache(cache_path, cache)
+
+
+def assistant_config_hash(assistant: dict) -> str:
+    canonical = json.dumps(assistant, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _load_cache(path: Path) -> dict[str, dict]:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.opt(exception=e).warning(f"Ignoring unreadable assistant cache {path}")
+        return {}
+
+
+def _save_cache(path: Path, cache: dict[str, dict]):
+    try:
+        path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    except Exception as e:
+        logger.opt(exception=e).warning(f"Could not write assistant cache {path}")
+
+
+def _find_remote_assistant(remote: list[dict], language: str, config_hash: str) -> str | None:
+    for assistant in remote:
+        metadata = assistant.get("metadata") or {}
+        if metadata.get("language") == language and metadata.get("configHash") == config_hash:
+            return assistant["id"]
+    return None
+
+
+async def sync_assistants(client: httpx.AsyncClient | None = None) -> dict[str, str]:
+    """
+    Create or update one persistent provider assistant per supported language.
+
+    Assistants are keyed by a content hash of the built config. An assistant
+    whose hash matches the local cache is reused without any API call; on a
+    cache miss an existing assistant with the same hash is looked up by its
+    metadata before a new one is created, and a stale cached assistant is
+    updated in place.
+
+    Returns:
+        language -> assistant id for every language that synced
+    """
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(
+            base_url=settings.VAPI_API_URL,
+            headers={"Authorization": f"Bearer {settings.GROQ_PRIVATE_API_KEY}"},
+            timeout=30.0,
+        )
+
+    cache_path = Path(settings.VAPI_ASSISTANT_CACHE_PATH)
+    cache = _load_cache(cache_path)
+    remote: list[dict] | None = None
+
+    try:
+        for language in SupportedLanguage:
+            if language.value not in PER_LANGUAGE_CONFIGS:
+                continue
+
+            assistant = build_assistant_config(language.value)
+            config_hash = assistant_config_hash(assistant)
+            cached = cache.get(language.value)
+
+            if cached and cached.get("hash") == config_hash:
+                _ASSISTANT_IDS[language.value] = cached["id"]
+                continue
+
+            try:
+                if remote is None:
+                    response = await client.get("/assistant")
+                    response.raise_for_status()
+                    remote = response.json()
+
+                body = {
+                    **assistant,
+                    "metadata": {"language": language.value, "configHash": config_hash},
+                }
+                assistant_id = _find_remote_assistant(remote, language.value, config_hash)
+                if not assistant_id and cached:
+                    response = await client.patch(f"/assistant/{cached['id']}", json=body)
+                    if response.status_code != 404:
+                        response.raise_for_status()
+                        assistant_id = cached["id"]
+                if not assistant_id:
+                    response = await client.post("/assistant", json=body)
+                    response.raise_for_status()
+                    assistant_id = response.json()["id"]
+            except Exception as e:
+                logger.opt(exception=e).error(
+                    f"Failed to sync assistant for {language.value}, dialing it inline"
+                )
+                _ASSISTANT_IDS.pop(language.value, None)
+                continue
+
+            logger.info(f"Synced assistant {assistant_id} for {language.value}")
+            cache[language.value] = {"id": assistant_id, "hash": config_hash}
+            _ASSISTANT_IDS[language.value] = assistant_id
+    finally:
+        if own_client:
+            await client.aclose()
+
+    _save_cache(cache_path, cache)
+    return dict(_ASSISTANT_IDS)
+
+
+if __name__ == "__main__":
+    print(asyncio.run(sync_assistants()))
@@ -1,9 +1,11 @@
+import json
 from enum import Enum
 from typing import TypedDict, Literal, NotRequired
 
 from pydantic import BaseModel
 
 from settings import settings
+from core.tools.registry import banking_tool_definitions, tool_definition
 from infrastructure.models import Call, ToolType
 
 
@@ -23,289 +25,22 @@ class SupportedLanguage(Enum):
 
 
 class ToolsManager:
-    # Transfer Tools
-    TRANSFER_MONEY_OWN_ACCOUNTS_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.TRANSFER_MONEY_OWN_ACCOUNTS.value,
-            "strict": True,
-            "description": "Transfer money between the user's own accounts by account name/label",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "amount": {
-                        "type": "number",
-                        "description": "How much money to transfer",
-                    },
-                    "account_name_to": {
-                        "type": "string",
-                        "description": "The name/label of the account to transfer to",
-                    },
-                    "account_name_from": {
-                        "type": "string",
-                        "description": "The name/label of the account to transfer from",
-                    },
-                },
-                "required": ["amount", "account_name_to", "account_name_from"],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    TRANSFER_MONEY_TO_USER_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.TRANSFER_MONEY_TO_USER.value,
-            "strict": True,
-            "description": "Transfer money to another user by their name or phone number",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "amount": {
-                        "type": "number",
-                        "description": "How much money to transfer",
-                    },
-                    "account_name_from": {
-                        "type": "string",
-                        "description": "The name/label of your account to transfer from",
-                    },
-                    "recipient_phone_number": {
-                        "type": "string",
-                        "description": "The phone number of the user to transfer to",
-                    },
-                },
-                "required": ["amount", "account_name_from", "recipient_phone_number"],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    # Payment/Bill Tools
-    PAY_BILL_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.PAY_BILL.value,
-            "strict": True,
-            "description": "Pay an outstanding bill (electricity, water, gas, internet, phone, parking, etc.)",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "bill_type": {
-                        "type": "string",
-                        "enum": [
-                            "electricity",
-                            "water",
-                            "gas",
-                            "internet",
-                            "tv",
-                            "phone",
-                            "parking",
-                            "other",
-                        ],
-                        "description": "The type of bill to pay",
-                    },
-                    "account_name_from": {
-                        "type": "string",
-                        "description": "The name/label of the account to pay from",
-                    },
-                },
-                "required": ["bill_type", "account_name_from"],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    LIST_BILLS_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.LIST_BILLS.value,
-            "strict": True,
-            "description": "List all outstanding bills for the user",
-            "parameters": {
-                "type": "object",
-                "properties": {},
-                "required": [],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    LIST_ACCOUNTS_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.LIST_ACCOUNTS.value,
-            "strict": True,
-            "description": "List all bank accounts for the user with their titles, account numbers, balances, and status",
-            "parameters": {
-                "type": "object",
-                "properties": {},
-                "required": [],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    # Account Management Tools
-    OPEN_ACCOUNT_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.OPEN_ACCOUNT.value,
-            "strict": True,
-            "description": "Open a new bank account with a specified name/label",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "account_title": {
-                        "type": "string",
-                        "description": "The name/label for the new account (e.g., 'Savings', 'Travel Fund')",
-                    },
-                },
-                "required": ["account_title"],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    CLOSE_ACCOUNT_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.CLOSE_ACCOUNT.value,
-            "strict": True,
-            "description": "Close an existing bank account. If the account has a balance, specify where to transfer the remaining funds.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "account_title": {
-                        "type": "string",
-                        "description": "The name/label of the account to close",
-                    },
-                    "transfer_to_account": {
-                        "type": "string",
-                        "description": "The name/label of the account to transfer remaining funds to (required if balance is non-zero)",
-                    },
-                },
-                "required": ["account_title"],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    FREEZE_ACCOUNT_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.FREEZE_ACCOUNT.value,
-            "strict": True,
-            "description": "Freeze/suspend a bank account to prevent any transactions",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "account_title": {
-                        "type": "string",
-                        "description": "The name/label of the account to freeze",
-                    },
-                },
-                "required": ["account_title"],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    UNFREEZE_ACCOUNT_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.UNFREEZE_ACCOUNT.value,
-            "strict": True,
-            "description": "Unfreeze/reactivate a previously frozen bank account",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "account_title": {
-                        "type": "string",
-                        "description": "The name/label of the account to unfreeze",
-                    },
-                },
-                "required": ["account_title"],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    # OTP-based Transfer Tools
-    REQUEST_TRANSFER_OWN_ACCOUNTS_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.REQUEST_TRANSFER_OWN_ACCOUNTS.value,
-            "strict": True,
-            "description": "Request a transfer between the user's own accounts. This will generate an OTP that the user must provide to confirm the transaction.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "amount": {
-                        "type": "number",
-                        "description": "How much money to transfer",
-                    },
-                    "account_name_to": {
-                        "type": "string",
-                        "description": "The name/label of the account to transfer to",
-                    },
-                    "account_name_from": {
-                        "type": "string",
-                        "description": "The name/label of the account to transfer from",
-                    },
-                },
-                "required": ["amount", "account_name_to", "account_name_from"],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    REQUEST_TRANSFER_TO_USER_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.REQUEST_TRANSFER_TO_USER.value,
-            "strict": True,
-            "description": "Request a transfer to another user by their phone number. This will generate an OTP that the user must provide to confirm the transaction.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "amount": {
-                        "type": "number",
-                        "description": "How much money to transfer",
-                    },
-                    "account_name_from": {
-                        "type": "string",
-                        "description": "The name/label of your account to transfer from",
-                    },
-                    "recipient_phone_number": {
-                        "type": "string",
-                        "description": "The phone number of the user to transfer to",
-                    },
-                },
-                "required": ["amount", "account_name_from", "recipient_phone_number"],
-                "additionalProperties": False,
-            },
-        },
-    }
-
-    CONFIRM_TRANSFER_OTP_TOOL_DEFINITION = {
-        "type": "function",
-        "function": {
-            "name": ToolType.CONFIRM_TRANSFER_OTP.value,
-            "strict": True,
-            "description": "Confirm a pending transfer transaction using the OTP code provided by the user",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "otp_code": {
-                        "type": "string",
-                        "description": "The 6-digit OTP code provided by the user to confirm the transaction",
-                    },
-                },
-                "required": ["otp_code"],
-                "additionalProperties": False,
-            },
-        },
-    }
+    # Generated from the *ToolCallParameters models, see core.tools.registry
+    TRANSFER_MONEY_OWN_ACCOUNTS_TOOL_DEFINITION = tool_definition(ToolType.TRANSFER_MONEY_OWN_ACCOUNTS)
+    TRANSFER_MONEY_TO_USER_TOOL_DEFINITION = tool_definition(ToolType.TRANSFER_MONEY_TO_USER)
+    PAY_BILL_TOOL_DEFINITION = tool_definition(ToolType.PAY_BILL)
+    PAY_ALL_BILLS_TOOL_DEFINITION = tool_definition(ToolType.PAY_ALL_BILLS)
+    LIST_BILLS_TOOL_DEFINITION = tool_definition(ToolType.LIST_BILLS)
+    LIST_ACCOUNTS_TOOL_DEFINITION = tool_definition(ToolType.LIST_ACCOUNTS)
+    CHECK_BALANCE_TOOL_DEFINITION = tool_definition(ToolType.CHECK_BALANCE)
+    GET_HISTORY_TOOL_DEFINITION = tool_definition(ToolType.GET_HISTORY)
+    OPEN_ACCOUNT_TOOL_DEFINITION = tool_definition(ToolType.OPEN_ACCOUNT)
+    CLOSE_ACCOUNT_TOOL_DEFINITION = tool_definition(ToolType.CLOSE_ACCOUNT)
+    FREEZE_ACCOUNT_TOOL_DEFINITION = tool_definition(ToolType.FREEZE_ACCOUNT)
+    UNFREEZE_ACCOUNT_TOOL_DEFINITION = tool_definition(ToolType.UNFREEZE_ACCOUNT)
+    REQUEST_TRANSFER_OWN_ACCOUNTS_TOOL_DEFINITION = tool_definition(ToolType.REQUEST_TRANSFER_OWN_ACCOUNTS)
+    REQUEST_TRANSFER_TO_USER_TOOL_DEFINITION = tool_definition(ToolType.REQUEST_TRANSFER_TO_USER)
+    CONFIRM_TRANSFER_OTP_TOOL_DEFINITION = tool_definition(ToolType.CONFIRM_TRANSFER_OTP)
 
     # Calendar Tool (kept for reference)
     CALENDAR_CREATE_APPOINTMENT_TOOL_DEFINITION = {
@@ -340,20 +75,7 @@ class ToolsManager:
     @classmethod
     def get_all_banking_tools(cls) -> list:
         """Return all banking-related tool definitions"""
-        return [
-            # OTP-based transfer tools (secure flow)
-            cls.REQUEST_TRANSFER_OWN_ACCOUNTS_TOOL_DEFINITION,
-            cls.REQUEST_TRANSFER_TO_USER_TOOL_DEFINITION,
-            cls.CONFIRM_TRANSFER_OTP_TOOL_DEFINITION,
-            # Other banking tools
-            cls.PAY_BILL_TOOL_DEFINITION,
-            cls.LIST_BILLS_TOOL_DEFINITION,
-            cls.LIST_ACCOUNTS_TOOL_DEFINITION,
-            cls.OPEN_ACCOUNT_TOOL_DEFINITION,
-            cls.CLOSE_ACCOUNT_TOOL_DEFINITION,
-            cls.FREEZE_ACCOUNT_TOOL_DEFINITION,
-            cls.UNFREEZE_ACCOUNT_TOOL_DEFINITION,
-        ]
+        return list(banking_tool_definitions())
 
 
 class VoiceConfig(TypedDict, total=False):
@@ -616,10 +338,8 @@ PER_LANGUAGE_CONFIGS: dict[Literal["en", "ms", "zh"], AgentConfig] = {
                 },
             ],
             "tools": [
-                {
-                    "type": "endCall",
-                },
-                ToolsManager.TRANSFER_MONEY_OWN_ACCOUNTS_TOOL_DEFINITION,
+                {"type": "endCall"},
+                *ToolsManager.get_all_banking_tools(),
             ],
         },
         transcriber={
@@ -642,10 +362,15 @@ PER_LANGUAGE_CONFIGS: dict[Literal["en", "ms", "zh"], AgentConfig] = {
 }
 
 
-async def build_call_payload(call: Call) -> VapiAssistantConfig:
-    config: AgentConfig | None = PER_LANGUAGE_CONFIGS.get(call.language)
+def _get_agent_config(language: str) -> AgentConfig:
+    config: AgentConfig | None = PER_LANGUAGE_CONFIGS.get(language)
     if not config:
         raise ValueError("LANGUAGE NOT SUPPORTED")
+    return config
+
+
+def _static_assistant(config: AgentConfig) -> VapiAssistantConfig:
+    """The part of the assistant that only depends on the language config."""
     return {
         "name": "Jason",
         "model": config.model,
@@ -662,8 +387,96 @@ async def build_call_payload(call: Call) -> VapiAssistantConfig:
             "end-of-call-report",
             "assistant.started",
         ],
-        "server": {
-            "url": f"{settings.PROJECT_URL}/webhooks",
-            # "url": "https://webhook.site/c7ec072b-27fb-48be-86f9-7bb7029fde20/webhooks"
-        },
     }
+
+
+def _server_config() -> dict:
+    return {
+        "url": f"{settings.PROJECT_URL}/webhooks",
+        # "url": "https://webhook.site/c7ec072b-27fb-48be-86f9-7bb7029fde20/webhooks"
+    }
+
+
+def build_assistant_config(language: str) -> VapiAssistantConfig:
+    """Full assistant for a language, as sent inline or registered with the provider."""
+    config = _get_agent_config(language)
+    return {
+        **_static_assistant(config),
+        "server": _server_config(),
+    }
+
+
+async def build_call_payload(call: Call) -> VapiAssistantConfig:
+    return build_assistant_config(call.language)
+
+
+def _encode(value) -> bytes:
+    # Same encoding httpx uses for json= bodies
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# language -> (config the bytes were built from, encoded request prefix)
+_PAYLOAD_CACHE: dict[str, tuple[AgentConfig, bytes]] = {}
+
+
+def _request_prefix(language: str) -> bytes:
+    """
+    `{"assistant":{...static fields...` for a language, encoded once.
+
+    The closing brace of the assistant object is left off so per-call fields
+    can be appended. An entry is rebuilt when PER_LANGUAGE_CONFIGS points at
+    a different config object; in-place edits need invalidate_payload_cache().
+    """
+    config = _get_agent_config(language)
+    cached = _PAYLOAD_CACHE.get(language)
+    if cached and cached[0] is config:
+        return cached[1]
+
+    prefix = b'{"assistant":' + _encode(_static_assistant(config))[:-1]
+    _PAYLOAD_CACHE[language] = (config, prefix)
+    return prefix
+
+
+def warm_payload_cache():
+    """Encode the static assistant of every configured language up front."""
+    for language in PER_LANGUAGE_CONFIGS:
+        _request_prefix(language)
+
+
+def invalidate_payload_cache():
+    _PAYLOAD_CACHE.clear()
+
+
+def build_call_request(
+    call: Call,
+    assistant_id: str | None = None,
+    assistant_overrides: dict | None = None,
+) -> bytes:
+    """
+    Encoded body for POST /call.
+
+    With an `assistant_id` the call references a persistent provider
+    assistant and only the per-call fields are sent. Otherwise the per-call
+    fields (server URL, customer, optional assistantOverrides) are spliced
+    onto the cached, pre-encoded assistant for the call's language, so the
+    large static config is never re-serialized per dial.
+    """
+    if assistant_id:
+        parts = [b'{"assistantId":', _encode(assistant_id)]
+    else:
+        parts = [
+            _request_prefix(call.language),
+            b',"server":',
+            _encode(_server_config()),
+            b"}",
+        ]
+    parts += [
+        b',"phoneNumberId":',
+        _encode(settings.GROQ_PHONE_NUMBER_ID),
+        b',"customer":',
+        _encode({"number": call.phone_number, "name": call.customer_name}),
+    ]
+    if assistant_overrides:
+        parts += [b',"assistantOverrides":', _encode(assistant_overrides)]
+    parts.append(b"}")
+    return b"".join(parts)
@@ -1,8 +1,13 @@
 import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
 
 import httpx
 
-from core.calls.build_payload import build_call_payload
+from core.calls.assistants import forget_assistant, get_assistant_id
+from core.calls.build_payload import build_call_request
+from core.calls.retry import is_retryable_status, parse_retry_after
 from infrastructure.models import Call
 from loguru import logger
 
@@ -10,12 +15,47 @@ from infrastructure.repositories import get_call_by_id
 from settings import settings
 
 
-async def initiate_call(scheduled_call: Call) -> None:
+@dataclass(frozen=True)
+class DialOutcome:
+    """Result of a single dial attempt for a scheduled call."""
+
+    call_id: int
+    call_sid: Optional[str] = None
+    started_at: Optional[datetime] = None
+    error: Optional[str] = None
+    # Provider 5xx/429 responses and network errors are worth retrying
+    retryable: bool = False
+    # Provider Retry-After hint in seconds
+    retry_after: Optional[float] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def missing_dial_settings() -> list[str]:
+    """Settings that must be set before any call can be dialed."""
+    return [
+        name
+        for name in ("GROQ_PRIVATE_API_KEY", "GROQ_PHONE_NUMBER_ID")
+        if not getattr(settings, name)
+    ]
+
+
+async def initiate_call(
+    scheduled_call: Call, on_request: Optional[Callable[[], None]] = None
+) -> DialOutcome:
     """
     Initiate a GROQ call for a scheduled call entry.
 
     Args:
         scheduled_call: The ScheduledCall model instance to initiate
+        on_request: Called right before the dial request is sent; from then
+            on the provider may place the call even if we never see the response
+
+    Returns:
+        The outcome of the dial: the provider call id on success, or the
+        error and whether it is retryable on failure
     """
     logger.info(
         f"Initiating call for scheduled_call {scheduled_call.id}",
@@ -23,42 +63,52 @@ async def initiate_call(scheduled_call: Call) -> None:
         phone_number=scheduled_call.phone_number,
     )
 
-    if not settings.GROQ_PRIVATE_API_KEY:
-        error_msg = "GROQ_PRIVATE_API_KEY not configured"
+    missing = missing_dial_settings()
+    if missing:
+        # The worker doesn't claim calls while misconfigured; retrying wouldn't fix this
+        error_msg = f"{', '.join(missing)} not configured"
         logger.error(error_msg)
-        return
+        return DialOutcome(scheduled_call.id, error=error_msg)
 
-    if not settings.GROQ_PHONE_NUMBER_ID:
-        error_msg = "GROQ_PHONE_NUMBER_ID not configured"
-        logger.error(error_msg)
-        return
+    if not scheduled_call.phone_number.startswith("+"):
+        scheduled_call.phone_number = f"+{scheduled_call.phone_number}"
 
     try:
-        assistant_config = await build_call_payload(scheduled_call)
+        assistant_id = (
+            get_assistant_id(scheduled_call.language)
+            if settings.VAPI_PERSISTENT_ASSISTANTS
+            else None
+        )
+        body = build_call_request(scheduled_call, assistant_id=assistant_id)
     except Exception as e:
         error_msg = f"Failed to build assistant config: {str(e)}"
         logger.opt(exception=e).error(error_msg, scheduled_call_id=scheduled_call.id)
-        return
+        return DialOutcome(scheduled_call.id, error=error_msg)
 
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
-            if not scheduled_call.phone_number.startswith("+"):
-                scheduled_call.phone_number = f"+{scheduled_call.phone_number}"
-            response = await client.post(
-                "https://api.vapi.ai/call",
-                headers={
-                    "Authorization": f"Bearer {settings.GROQ_PRIVATE_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "assistant": assistant_config,
-                    "phoneNumberId": settings.GROQ_PHONE_NUMBER_ID,
-                    "customer": {
-                        "number": scheduled_call.phone_number,
-                        "name": scheduled_call.customer_name,
+
+            async def post(content: bytes) -> httpx.Response:
+                return await client.post(
+                    f"{settings.VAPI_API_URL}/call",
+                    headers={
+                        "Authorization": f"Bearer {settings.GROQ_PRIVATE_API_KEY}",
+                        "Content-Type": "application/json",
                     },
-                },
-            )
+                    content=content,
+                )
+
+            if on_request:
+                on_request()
+            response = await post(body)
+            if response.status_code == 404 and assistant_id:
+                # The persistent assistant is gone; stop using it and send the config inline
+                logger.warning(
+                    f"Assistant {assistant_id} not found, dialing scheduled_call {scheduled_call.id} inline",
+                    scheduled_call_id=scheduled_call.id,
+                )
+                forget_assistant(scheduled_call.language, assistant_id)
+                response = await post(build_call_request(scheduled_call))
             response.raise_for_status()
 
             data = response.json()
@@ -70,6 +120,11 @@ async def initiate_call(scheduled_call: Call) -> None:
                 groq_call_id=groq_call_id,
                 response_data=data,
             )
+            return DialOutcome(
+                scheduled_call.id,
+                call_sid=groq_call_id,
+                started_at=datetime.utcnow(),
+            )
 
     except httpx.HTTPStatusError as e:
         error_msg = f"GROQ API error: {e.response.status_code} - {e.response.text}"
@@ -79,6 +134,20 @@ async def initiate_call(scheduled_call: Call) -> None:
             status_code=e.response.status_code,
             response_text=e.response.text,
         )
+        return DialOutcome(
+            scheduled_call.id,
+            error=error_msg,
+            retryable=is_retryable_status(e.response.status_code),
+            retry_after=parse_retry_after(e.response.headers.get("Retry-After")),
+        )
+
+    except httpx.TransportError as e:
+        error_msg = f"GROQ API unreachable: {str(e)}"
+        logger.opt(exception=e).error(
+            f"Failed to initiate call for scheduled_call {scheduled_call.id}",
+            scheduled_call_id=scheduled_call.id,
+        )
+        return DialOutcome(scheduled_call.id, error=error_msg, retryable=True)
 
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
@@ -86,6 +155,7 @@ async def initiate_call(scheduled_call: Call) -> None:
             f"Failed to initiate call for scheduled_call {scheduled_call.id}",
             scheduled_call_id=scheduled_call.id,
         )
+        return DialOutcome(scheduled_call.id, error=error_msg)
 
 
 async def main():
@@ -94,4 +164,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,389 @@
+"""
+Token budget of the per-language assistants, and trimmed variants of them.
+
+The system prompt and every tool definition are sent to the LLM on every
+turn of a call, so their size adds directly to time-to-first-token. Running
+this module prints, per language, how many tokens go to the prompt, the tool
+schemas and the descriptions inside them, for the full config and for the
+trimmed variant, and checks the trimmed variant against the scripted
+conversations below. It exits non-zero if a variant fails the check, so it
+can gate a build:
+
+    cd backend
+    PYTHONPATH=src python -m core.calls.prompt_budget
+
+Token counts use tiktoken's o200k_base encoding (gpt-4o) when tiktoken is
+installed and a 4-characters-per-token estimate otherwise.
+"""
+import copy
+import json
+import re
+import sys
+from dataclasses import dataclass
+
+from loguru import logger
+
+from core.calls.build_payload import PER_LANGUAGE_CONFIGS, AgentConfig
+from infrastructure.models import ToolType
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+_ENCODING = tiktoken.get_encoding("o200k_base") if tiktoken else None
+
+# Lines shorter than this (headings like "Examples:") are never deduplicated
+_MIN_DEDUP_LINE_LENGTH = 20
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    language: str
+    prompt: int
+    tools: int
+    descriptions: int
+    tool_count: int
+
+    @property
+    def total(self) -> int:
+        return self.prompt + self.tools + self.descriptions
+
+
+def _function_tools(config: AgentConfig) -> list[dict]:
+    return [tool for tool in config.model.get("tools", []) if tool.get("type") == "function"]
+
+
+def _split_descriptions(value, descriptions: list[str]):
+    """Copy of a tool schema with every description removed, collecting them."""
+    if isinstance(value, dict):
+        stripped = {}
+        for key, item in value.items():
+            if key == "description" and isinstance(item, str):
+                descriptions.append(item)
+            else:
+                stripped[key] = _split_descriptions(item, descriptions)
+        return stripped
+    if isinstance(value, list):
+        return [_split_descriptions(item, descriptions) for item in value]
+    return value
+
+
+def analyze_config(language: str, config: AgentConfig) -> TokenBudget:
+    """Tokens sent per LLM turn, split into prompt, tool schemas and descriptions."""
+    prompt = sum(
+        count_tokens(message["content"]) for message in config.model.get("messages", [])
+    )
+    descriptions: list[str] = []
+    schemas = _split_descriptions(config.model.get("tools", []), descriptions)
+    return TokenBudget(
+        language=language,
+        prompt=prompt,
+        tools=count_tokens(json.dumps(schemas, separators=(",", ":"))),
+        descriptions=sum(count_tokens(text) for text in descriptions),
+        tool_count=len(_function_tools(config)),
+    )
+
+
+def minimize_prompt(text: str) -> str:
+    """Strip layout whitespace and drop instruction lines that repeat earlier ones."""
+    seen: set[str] = set()
+    lines: list[str] = []
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if not line:
+            continue
+        if len(line) >= _MIN_DEDUP_LINE_LENGTH:
+            key = line.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _first_sentence(text: str) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    return match.group(1) if match else text
+
+
+def minimize_tool(tool: dict) -> dict:
+    """Keep the schema intact and cut every description down to its first sentence."""
+    tool = copy.deepcopy(tool)
+
+    def shorten(value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key == "description" and isinstance(item, str):
+                    value[key] = _first_sentence(item)
+                else:
+                    shorten(item)
+        elif isinstance(value, list):
+            for item in value:
+                shorten(item)
+
+    shorten(tool)
+    return tool
+
+
+def build_trimmed_config(config: AgentConfig) -> AgentConfig:
+    """
+    Minimized variant of a language config: the same tools with shorter
+    descriptions, and the prompt without layout whitespace or repeated lines.
+    """
+    tools = [
+        minimize_tool(tool) if tool.get("type") == "function" else tool
+        for tool in config.model.get("tools", [])
+    ]
+
+    model = {
+        **config.model,
+        "messages": [
+            {**message, "content": minimize_prompt(message["content"])}
+            for message in config.model.get("messages", [])
+        ],
+        "tools": tools,
+    }
+    return config.model_copy(update={"model": model})
+
+
+# Tool calls the model is expected to be able to make in typical calls.
+# Each entry is (conversation, [(tool name, arguments), ...]).
+SCRIPTED_CONVERSATIONS: list[tuple[str, list[tuple[str, dict]]]] = [
+    (
+        "own transfer with otp",
+        [
+            (
+                ToolType.REQUEST_TRANSFER_OWN_ACCOUNTS.value,
+                {"amount": 150.5, "account_name_from": "Savings", "account_name_to": "Travel Fund"},
+            ),
+            (ToolType.CONFIRM_TRANSFER_OTP.value, {"otp_code": "123456"}),
+        ],
+    ),
+    (
+        "transfer to another user",
+        [
+            (
+                ToolType.REQUEST_TRANSFER_TO_USER.value,
+                {"amount": 20, "account_name_from": "Main", "recipient_phone_number": "60123456789"},
+            ),
+            (ToolType.CONFIRM_TRANSFER_OTP.value, {"otp_code": "654321"}),
+        ],
+    ),
+    (
+        "pay bills",
+        [
+            (ToolType.LIST_BILLS.value, {"limit": None, "cursor": None}),
+            (ToolType.LIST_BILLS.value, {"limit": 5, "cursor": "20261101000000000000-42"}),
+            (ToolType.PAY_BILL.value, {"bill_type": "electricity", "account_name_from": "Main"}),
+        ],
+    ),
+    (
+        "pay every bill at once",
+        [
+            (ToolType.PAY_ALL_BILLS.value, {"account_name_from": "Main", "bill_types": None}),
+            (
+                ToolType.PAY_ALL_BILLS.value,
+                {"account_name_from": "Main", "bill_types": ["water", "internet"]},
+            ),
+        ],
+    ),
+    (
+        "balance enquiry",
+        [
+            (ToolType.CHECK_BALANCE.value, {"account_title": "Savings"}),
+            (ToolType.CHECK_BALANCE.value, {"account_title": None}),
+        ],
+    ),
+    (
+        "transaction history",
+        [
+            (
+                ToolType.GET_HISTORY.value,
+                {"account_title": None, "from_date": None, "to_date": None, "limit": None, "cursor": None},
+            ),
+            (
+                ToolType.GET_HISTORY.value,
+                {
+                    "account_title": "Savings",
+                    "from_date": "2026-09-01",
+                    "to_date": "2026-09-30",
+                    "limit": 5,
+                    "cursor": "20260915093000000000-42",
+                },
+            ),
+        ],
+    ),
+    (
+        "account housekeeping",
+        [
+            (ToolType.LIST_ACCOUNTS.value, {"limit": None, "cursor": None}),
+            (ToolType.LIST_ACCOUNTS.value, {"limit": 5, "cursor": "1250.00-7"}),
+            (ToolType.OPEN_ACCOUNT.value, {"account_title": "Holiday"}),
+            (ToolType.FREEZE_ACCOUNT.value, {"account_title": "Holiday"}),
+            (ToolType.UNFREEZE_ACCOUNT.value, {"account_title": "Holiday"}),
+            (
+                ToolType.CLOSE_ACCOUNT.value,
+                {"account_title": "Holiday", "transfer_to_account": "Main"},
+            ),
+        ],
+    ),
+    (
+        "direct own transfer",
+        [
+            (
+                ToolType.TRANSFER_MONEY_OWN_ACCOUNTS.value,
+                {"amount": 10, "account_name_from": "Main", "account_name_to": "Savings"},
+            ),
+        ],
+    ),
+]
+
+_JSON_TYPES = {
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+}
+
+
+def _argument_errors(parameters: dict, arguments: dict) -> list[str]:
+    errors = []
+    properties = parameters.get("properties", {})
+    for name in parameters.get("required", []):
+        if name not in arguments:
+            errors.append(f"missing required argument {name}")
+    for name, value in arguments.items():
+        schema = properties.get(name)
+        if schema is None:
+            if parameters.get("additionalProperties") is False:
+                errors.append(f"unexpected argument {name}")
+            continue
+        json_types = schema.get("type")
+        if isinstance(json_types, str):
+            json_types = [json_types]
+        if value is None:
+            if "null" not in json_types:
+                errors.append(f"argument {name} is not nullable")
+            continue
+        if not any(isinstance(value, _JSON_TYPES.get(json_type, object)) for json_type in json_types):
+            errors.append(f"argument {name} is not {schema['type']}")
+        if "enum" in schema and value not in schema["enum"]:
+            errors.append(f"argument {name}={value!r} not in enum")
+    return errors
+
+
+def _prompt_text(config: AgentConfig) -> str:
+    return "\n".join(message["content"] for message in config.model.get("messages", []))
+
+
+def _instruction_lines(text: str) -> set[str]:
+    """Distinct lines of a prompt, compared the way minimize_prompt deduplicates them."""
+    return {
+        re.sub(r"\s+", " ", line).strip().lower()
+        for line in text.splitlines()
+        if line.strip()
+    }
+
+
+def verify_trimmed_config(
+    full: AgentConfig,
+    trimmed: AgentConfig,
+    conversations: list[tuple[str, list[tuple[str, dict]]]] = SCRIPTED_CONVERSATIONS,
+) -> list[str]:
+    """
+    Replay scripted tool calls against both variants.
+
+    Every scripted call the full config can serve must be servable by the
+    trimmed one: the tool is present, its schema (ignoring descriptions) is
+    unchanged, and the scripted arguments validate against it. The trimmed
+    prompt must keep every distinct instruction line of the full one, and
+    still name every tool a conversation calls that the full prompt names.
+
+    Returns:
+        Problems found; empty when the trimmed variant is equivalent
+    """
+    full_tools = {tool["function"]["name"]: tool for tool in _function_tools(full)}
+    trimmed_tools = {tool["function"]["name"]: tool for tool in _function_tools(trimmed)}
+
+    full_prompt = _prompt_text(full)
+    trimmed_prompt = _prompt_text(trimmed)
+    problems = [
+        f"trimmed prompt drops instruction: {line!r}"
+        for line in sorted(_instruction_lines(full_prompt) - _instruction_lines(trimmed_prompt))
+    ]
+    for conversation, calls in conversations:
+        for tool_name, arguments in calls:
+            full_tool = full_tools.get(tool_name)
+            if full_tool is None:
+                continue
+            if tool_name in full_prompt and tool_name not in trimmed_prompt:
+                problems.append(f"{conversation}: trimmed prompt no longer mentions {tool_name}")
+            for error in _argument_errors(full_tool["function"]["parameters"], arguments):
+                problems.append(f"{conversation}: full config rejects {tool_name}: {error}")
+
+            trimmed_tool = trimmed_tools.get(tool_name)
+            if trimmed_tool is None:
+                problems.append(f"{conversation}: {tool_name} missing from trimmed config")
+                continue
+            if _split_descriptions(trimmed_tool, []) != _split_descriptions(full_tool, []):
+                problems.append(f"{conversation}: {tool_name} schema differs")
+            for error in _argument_errors(trimmed_tool["function"]["parameters"], arguments):
+                problems.append(f"{conversation}: trimmed config rejects {tool_name}: {error}")
+    return problems
+
+
+def apply_trimmed_configs() -> list[str]:
+    """
+    Swap every PER_LANGUAGE_CONFIGS entry for its trimmed variant.
+
+    Variants that fail verification are left out and the full config stays
+    in place. Returns the languages that were swapped.
+    """
+    swapped = []
+    for language, config in list(PER_LANGUAGE_CONFIGS.items()):
+        trimmed = build_trimmed_config(config)
+        problems = verify_trimmed_config(config, trimmed)
+        if problems:
+            logger.warning(f"Keeping full assistant for {language}: {problems}")
+            continue
+        PER_LANGUAGE_CONFIGS[language] = trimmed
+        swapped.append(language)
+    return swapped
+
+
+def main() -> int:
+    if not _ENCODING:
+        print("tiktoken not installed, token counts are estimates\n")
+
+    print(f"{'lang':<6}{'variant':<10}{'tools':>6}{'prompt':>8}{'schemas':>9}{'descr':>7}{'total':>7}")
+    failed = False
+    for language, config in PER_LANGUAGE_CONFIGS.items():
+        trimmed = build_trimmed_config(config)
+        for variant, budget in (
+            ("full", analyze_config(language, config)),
+            ("trimmed", analyze_config(language, trimmed)),
+        ):
+            print(
+                f"{language:<6}{variant:<10}{budget.tool_count:>6}{budget.prompt:>8}"
+                f"{budget.tools:>9}{budget.descriptions:>7}{budget.total:>7}"
+            )
+        problems = verify_trimmed_config(config, trimmed)
+        for problem in problems:
+            print(f"  FAIL {language}: {problem}")
+        failed = failed or bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from settings import settings
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """Provider responses worth retrying: rate limits and server errors."""
+    return status_code == 429 or 500 <= status_code < 600
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def compute_backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Seconds to wait before the next dial attempt.
+
+    Exponential backoff with equal jitter, capped at CALL_RETRY_MAX_SECONDS.
+    A provider Retry-After hint is treated as a lower bound.
+
+    Args:
+        attempt: Number of attempts already made (1 after the first failure)
+        retry_after: Optional Retry-After hint from the provider
+    """
+    ceiling = min(
+        settings.CALL_RETRY_MAX_SECONDS,
+        settings.CALL_RETRY_BASE_SECONDS * 2 ** max(attempt - 1, 0),
+    )
+    delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
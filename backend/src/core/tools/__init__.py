@@ -1,32 +1,37 @@
-from .transfer_money import (
-    transfer_money_between_own_accounts,
-    transfer_money_to_user,
-    request_transfer_own_accounts,
-    request_transfer_to_user,
-    confirm_transfer_otp,
-)
-from .bills import list_outstanding_bills, pay_outstanding_bill
-from .account_management import (
-    open_account,
-    close_account_tool,
-    freeze_account,
-    unfreeze_account,
-    list_accounts,
-)
+"""
+Tool handlers called by the webhook.
 
-__all__ = [
-    "transfer_money_between_own_accounts",
-    "transfer_money_to_user",
-    "request_transfer_own_accounts",
-    "request_transfer_to_user",
-    "confirm_transfer_otp",
-    "list_outstanding_bills",
-    "pay_outstanding_bill",
-    "open_account",
-    "close_account_tool",
-    "freeze_account",
-    "unfreeze_account",
-    "list_accounts",
-]
+Handlers are imported on first access so that importing a lightweight module
+from this package (e.g. core.tools.registry in the call worker) doesn't pull
+in every handler and its dependencies.
+"""
+import importlib
 
+_HANDLER_MODULES = {
+    "transfer_money_between_own_accounts": ".transfer_money",
+    "transfer_money_to_user": ".transfer_money",
+    "request_transfer_own_accounts": ".transfer_money",
+    "request_transfer_to_user": ".transfer_money",
+    "confirm_transfer_otp": ".transfer_money",
+    "list_outstanding_bills": ".bills",
+    "pay_outstanding_bill": ".bills",
+    "pay_all_outstanding_bills": ".bills",
+    "open_account": ".account_management",
+    "close_account_tool": ".account_management",
+    "freeze_account": ".account_management",
+    "unfreeze_account": ".account_management",
+    "list_accounts": ".account_management",
+    "check_balance": ".account_management",
+    "get_history": ".history",
+}
 
+__all__ = list(_HANDLER_MODULES)
+
+
+def __getattr__(name: str):
+    module_name = _HANDLER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,57 @@
+"""
+Resolving the account titles tools are called with.
+
+Titles come from speech-to-text, so they are matched fuzzily against the
+user's accounts (see infrastructure.account_titles). A tool only asks the
+caller to clarify when a title is ambiguous or matches nothing.
+"""
+from typing import Optional
+
+from collections import Counter
+
+from core.tools.messages import Digits, ToolMessage, message
+from infrastructure.account_titles import TitleCandidate, TitleMatch
+from infrastructure.models import BankAccount
+from infrastructure.repositories import get_account_by_id, get_account_title_index
+
+
+def _options(candidates: tuple[TitleCandidate, ...]) -> list:
+    """How to name each candidate; accounts sharing a title are told apart by their last digits."""
+    shared = {title for title, count in Counter(c.title for c in candidates).items() if count > 1}
+    return [
+        message("account.ambiguous_option", title=c.title, digits=Digits(c.account_number[-4:]))
+        if c.title in shared and c.account_number
+        else f"'{c.title}'"
+        for c in candidates
+    ]
+
+
+def _unresolved(spoken_title: str, match: TitleMatch, titles: tuple[str, ...]) -> ToolMessage:
+    if match.ambiguous:
+        return message("account.ambiguous", options=_options(match.candidates))
+    if titles:
+        return message("account.not_found_with_options", title=spoken_title, titles=titles)
+    return message("account.not_found", title=spoken_title)
+
+
+async def resolve_account_title(user_id: str, spoken_title: str) -> tuple[Optional[TitleMatch], Optional[ToolMessage]]:
+    """The id and title of the account meant by `spoken_title`, or None and what to tell the caller."""
+    index = await get_account_title_index(user_id)
+    match = index.resolve(spoken_title)
+    if match.account_id is None:
+        return None, _unresolved(spoken_title, match, index.titles)
+    return match, None
+
+
+async def find_account(user_id: str, spoken_title: str) -> tuple[Optional[BankAccount], Optional[ToolMessage]]:
+    """The account meant by `spoken_title`, or None and what to tell the caller."""
+    index = await get_account_title_index(user_id)
+    match = index.resolve(spoken_title)
+    if match.account_id is None:
+        return None, _unresolved(spoken_title, match, index.titles)
+
+    account = await get_account_by_id(match.account_id)
+    if account is None or account.user_id != user_id:
+        # Deleted since the index was built
+        return None, message("account.not_found", title=spoken_title)
+    return account, None
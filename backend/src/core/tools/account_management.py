@@ -1,39 +1,46 @@
+import asyncio
 from decimal import Decimal
-from num2words import num2words
-import re
 
-from entrypoints.api.serializers import (
+from core.tools.account_lookup import find_account, resolve_account_title
+from core.tools.messages import Digits, Lines, ToolMessage, enum_label, message
+from core.tools.spoken_numbers import amount_to_words, amounts_to_words, number_to_words, spell_digits
+from entrypoints.api.tool_parameters import (
+    CheckBalanceToolCallParameters,
+    ListAccountsToolCallParameters,
     OpenAccountToolCallParameters,
     CloseAccountToolCallParameters,
     FreezeAccountToolCallParameters,
     UnfreezeAccountToolCallParameters,
 )
+from infrastructure.account_titles import CONFUSABLE_CONFIDENCE
 from infrastructure.models import AccountStatus
 from infrastructure.repositories import (
+    AccountCursor,
+    AccountListing,
     create_account,
     close_account,
     update_account_status,
-    get_account_by_title_and_user,
-    get_accounts_by_user,
+    get_account_title_index,
+    get_account_balances,
+    get_account_summary,
+    get_accounts_page,
     generate_account_number,
-    transfer_money_between_accounts,
 )
 
+DEFAULT_PAGE_SIZE = 5
+MAX_PAGE_SIZE = 20
+
 
 async def open_account(
     user_id: str,
     tool_parameters: OpenAccountToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Open a new bank account"""
-    # Check if account with same title already exists
-    existing_account = await get_account_by_title_and_user(
-        tool_parameters.account_title, user_id
-    )
-
-    if existing_account:
-        return (
-            f"An account with the name '{tool_parameters.account_title}' already exists"
-        )
+    # Check if an account with the same title, or one that sounds the same, already exists
+    index = await get_account_title_index(user_id)
+    existing = index.resolve(tool_parameters.account_title)
+    if existing.confidence >= CONFUSABLE_CONFIDENCE:
+        return message("account.exists", title=existing.title or existing.candidates[0].title)
 
     # Generate unique account number
     account_number = await generate_account_number()
@@ -46,156 +53,209 @@ async def open_account(
         initial_balance=Decimal("0.00"),
     )
 
-    return f"Successfully opened account '{tool_parameters.account_title}' with account number {account_number}"
+    return message("account.opened", title=tool_parameters.account_title, account_number=Digits(account_number))
 
 
 async def close_account_tool(
     call_id: int,
     user_id: str,
     tool_parameters: CloseAccountToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Close a bank account"""
     # Find the account to close
-    account = await get_account_by_title_and_user(
-        tool_parameters.account_title, user_id
-    )
-
-    if not account:
-        return f"Account '{tool_parameters.account_title}' not found"
+    account, problem = await find_account(user_id, tool_parameters.account_title)
+    if problem:
+        return problem
 
     if account.status == AccountStatus.CLOSED:
-        return f"Account '{tool_parameters.account_title}' is already closed"
+        return message("account.already_closed", title=account.title)
 
     # Check if there's a balance that needs to be transferred
     transfer_to_account = None
     if account.balance > 0:
         if not tool_parameters.transfer_to_account_title:
-            return f"Account has a balance of {account.balance}. Please specify an account to transfer the remaining funds to."
+            return message("account.close_needs_destination", balance=account.balance)
 
-        transfer_to_account = await get_account_by_title_and_user(
-            tool_parameters.transfer_to_account_title, user_id
-        )
-
-        if not transfer_to_account:
-            return f"Transfer destination account '{tool_parameters.transfer_to_account_title}' not found"
+        transfer_to_account, problem = await find_account(user_id, tool_parameters.transfer_to_account_title)
+        if problem:
+            return message("account.close_destination_problem", problem=problem)
 
         if transfer_to_account.status != AccountStatus.ACTIVE:
-            return f"Transfer destination account '{tool_parameters.transfer_to_account_title}' is not active"
+            return message("account.close_destination_not_active", title=transfer_to_account.title)
 
         if transfer_to_account.id == account.id:
-            return "Cannot transfer funds to the same account being closed"
-
-        # Transfer the remaining balance
-        await transfer_money_between_accounts(
-            account.id,
-            transfer_to_account.id,
-            account.balance,
-            call_id=call_id,
-        )
+            return message("account.close_same_destination")
 
-    # Close the account
+    # Close the account, sweeping the remaining balance in the same transaction
     transfer_to_id = transfer_to_account.id if transfer_to_account else None
-    closed_account = await close_account(account.id, transfer_to_id)
+    closed_account = await close_account(account.id, transfer_to_id, call_id=call_id)
 
     if not closed_account:
-        return "Failed to close the account"
+        return message("account.close_failed")
 
     if transfer_to_account:
-        return f"Successfully closed account '{tool_parameters.account_title}' and transferred {account.balance} to '{tool_parameters.transfer_to_account_title}'"
+        return message(
+            "account.closed_with_transfer",
+            title=account.title,
+            balance=account.balance,
+            to_title=transfer_to_account.title,
+        )
     else:
-        return f"Successfully closed account '{tool_parameters.account_title}'"
+        return message("account.closed_ok", title=account.title)
 
 
 async def freeze_account(
     call_id: int,
     user_id: str,
     tool_parameters: FreezeAccountToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Freeze a bank account"""
-    account = await get_account_by_title_and_user(
-        tool_parameters.account_title, user_id
-    )
-
-    if not account:
-        return f"Account '{tool_parameters.account_title}' not found"
+    account, problem = await find_account(user_id, tool_parameters.account_title)
+    if problem:
+        return problem
 
     if account.status == AccountStatus.CLOSED:
-        return f"Cannot freeze a closed account"
+        return message("account.freeze_closed")
 
     if account.status == AccountStatus.SUSPENDED:
-        return f"Account '{tool_parameters.account_title}' is already frozen"
+        return message("account.already_frozen", title=account.title)
 
     updated_account = await update_account_status(account.id, AccountStatus.SUSPENDED)
 
     if not updated_account:
-        return "Failed to freeze the account"
+        return message("account.freeze_failed")
 
-    return f"Successfully froze account '{tool_parameters.account_title}'"
+    return message("account.frozen", title=account.title)
 
 
 async def unfreeze_account(
     user_id: str,
     tool_parameters: UnfreezeAccountToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Unfreeze a bank account"""
-    account = await get_account_by_title_and_user(
-        tool_parameters.account_title, user_id
-    )
-
-    if not account:
-        return f"Account '{tool_parameters.account_title}' not found"
+    account, problem = await find_account(user_id, tool_parameters.account_title)
+    if problem:
+        return problem
 
     if account.status == AccountStatus.CLOSED:
-        return f"Cannot unfreeze a closed account"
+        return message("account.unfreeze_closed")
 
     if account.status == AccountStatus.ACTIVE:
-        return f"Account '{tool_parameters.account_title}' is not frozen"
+        return message("account.not_frozen", title=account.title)
 
     updated_account = await update_account_status(account.id, AccountStatus.ACTIVE)
 
     if not updated_account:
-        return "Failed to unfreeze the account"
-
-    return f"Successfully unfroze account '{tool_parameters.account_title}'"
-
+        return message("account.unfreeze_failed")
 
-def numbers_to_words(text: str, lang="en") -> str:
-    def replace(match):
-        number = match.group(0)
-        # handle integers and decimals
-        if "." in number:
-            whole, frac = number.split(".")
-            return f"{num2words(int(whole), lang=lang)} point {' '.join(num2words(int(d), lang=lang) for d in frac)}"
-        return num2words(int(number), lang=lang)
+    return message("account.unfrozen", title=account.title)
 
-    return re.sub(r"\b\d+(\.\d+)?\b", replace, text)
 
+def _describe_accounts(accounts: list[AccountListing], language: str) -> Lines:
+    balances = amounts_to_words([account.balance for account in accounts], language)
+    return Lines(
+        message(
+            "accounts.item",
+            title=account.title,
+            # Read digit by digit, the way account numbers are said
+            account_number=spell_digits(account.account_number, language),
+            balance=balance_text,
+            status=enum_label(account.status),
+        )
+        for account, balance_text in zip(accounts, balances)
+    )
 
-def ringgit_to_words(amount: float) -> str:
-    ringgit = int(amount)
-    sen = int(round((amount - ringgit) * 100))
 
-    if sen:
-        return f"{num2words(ringgit)} ringgit and {num2words(sen)} sen"
-    return f"{num2words(ringgit)} ringgit"
+def _more_accounts(next_cursor: AccountCursor | None) -> ToolMessage | str:
+    return message("accounts.more", cursor=next_cursor.encode()) if next_cursor else ""
 
 
-async def list_accounts(user_id: str) -> str:
-    accounts = await get_accounts_by_user(user_id)
+async def list_accounts(
+    user_id: str,
+    tool_parameters: ListAccountsToolCallParameters,
+    language: str = "en",
+) -> ToolMessage:
+    """
+    Accounts, largest balance first, one page at a time.
+
+    When they don't fit on the first page, it opens with the number and total
+    balance of the accounts per status, aggregated by the database.
+    """
+    try:
+        cursor = AccountCursor.decode(tool_parameters.cursor) if tool_parameters.cursor else None
+    except ValueError:
+        return message("accounts.invalid_cursor")
+
+    limit = min(max(tool_parameters.limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    if cursor:
+        accounts, next_cursor = await get_accounts_page(user_id, limit, cursor)
+        if not accounts:
+            return message("accounts.no_more")
+        return message(
+            "accounts.page",
+            items=_describe_accounts(accounts, language),
+            more=_more_accounts(next_cursor),
+        )
 
+    summary, (accounts, next_cursor) = await asyncio.gather(
+        get_account_summary(user_id),
+        get_accounts_page(user_id, limit),
+    )
     if not accounts:
-        return "You don't have any bank accounts yet. Would you like to open one?"
+        return message("account.none")
+    items = _describe_accounts(accounts, language)
+    if not next_cursor:
+        return message("accounts.list", count=number_to_words(len(accounts), language), items=items)
+
+    totals = amounts_to_words([status.total for status in summary], language)
+    statuses = Lines(
+        message(
+            "accounts.status_summary",
+            status=enum_label(status.status),
+            count=number_to_words(status.count, language),
+            total=total_text,
+        )
+        for status, total_text in zip(summary, totals)
+    )
+    return message(
+        "accounts.summary",
+        count=number_to_words(sum(status.count for status in summary), language),
+        total=amount_to_words(sum(status.total for status in summary), language),
+        statuses=statuses,
+        shown=number_to_words(len(accounts), language),
+        items=items,
+        more=_more_accounts(next_cursor),
+    )
 
-    account_list = []
-    for account in accounts:
-        status_text = account.status.value
-        balance_text = ringgit_to_words(account.balance)
-        account_number_text = numbers_to_words(str(account.account_number))
 
-        account_list.append(
-            f"- {account.title}: Account number {account_number_text}, "
-            f"Balance: {balance_text}, Status: {status_text}"
+async def check_balance(
+    user_id: str,
+    tool_parameters: CheckBalanceToolCallParameters,
+    language: str = "en",
+) -> ToolMessage:
+    """Balance of one account, or of all of them"""
+    # Usually served from the in-process balance cache
+    balances = await get_account_balances(user_id)
+
+    if tool_parameters.account_title:
+        match, problem = await resolve_account_title(user_id, tool_parameters.account_title)
+        if problem:
+            return problem
+        balances = [b for b in balances if b.id == match.account_id]
+        if not balances:
+            return message("account.closed", title=match.title)
+    elif not balances:
+        return message("account.none")
+
+    lines = [
+        dict(
+            title=balance.title,
+            frozen=message("balance.frozen") if balance.status == AccountStatus.SUSPENDED else "",
+            amount=amount_to_words(balance.balance, language),
         )
+        for balance in balances
+    ]
 
-    header = f"You have {num2words(len(accounts))} accounts:\n"
-    return header + "\n".join(account_list)
\ No newline at end of file
+    if len(lines) == 1:
+        return message("balance.one", **lines[0])
+    return message("balance.list", items=Lines(message("balance.item", **line) for line in lines))
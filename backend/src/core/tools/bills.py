@@ -1,90 +1,208 @@
-from decimal import Decimal
-from datetime import datetime
-
-from entrypoints.api.serializers import PayBillToolCallParameters
-from infrastructure.models import AccountStatus, BillType, BillStatus, TransactionType
+import asyncio
+
+from core.tools.account_lookup import resolve_account_title
+from core.tools.messages import Lines, ToolMessage, enum_label, message
+from core.tools.spoken_numbers import amount_to_words, amounts_to_words, number_to_words
+from entrypoints.api.tool_parameters import (
+    ListBillsToolCallParameters,
+    PayAllBillsToolCallParameters,
+    PayBillToolCallParameters,
+)
+from infrastructure.models import AccountStatus, BillType
 from infrastructure.repositories import (
-    get_account_by_title_and_user,
-    get_outstanding_bills,
-    get_outstanding_bill_by_type,
-    pay_bill,
-    create_transaction,
-    update_account_balance,
+    BillCursor,
+    OutstandingBill,
+    get_outstanding_bill_summary,
+    get_outstanding_bills_page,
+    pay_outstanding_bills,
 )
 
+DEFAULT_PAGE_SIZE = 5
+MAX_PAGE_SIZE = 20
+
+
+def _describe(bill: OutstandingBill, amount: str) -> ToolMessage:
+    item = dict(
+        type=enum_label(bill.type),
+        amount=amount,
+        due_date=bill.due_date.strftime("%Y-%m-%d"),
+        status=enum_label(bill.status),
+    )
+    if bill.description:
+        return message("bills.item_described", description=bill.description, **item)
+    return message("bills.item", **item)
+
+
+def _describe_bills(bills: list[OutstandingBill], language: str) -> Lines:
+    amounts = amounts_to_words([bill.amount for bill in bills], language)
+    return Lines(_describe(bill, amount) for bill, amount in zip(bills, amounts))
+
+
+def _more(next_cursor: BillCursor | None) -> ToolMessage | str:
+    return message("bills.more", cursor=next_cursor.encode()) if next_cursor else ""
+
 
 async def list_outstanding_bills(
     user_id: str,
-) -> str:
-    """List all outstanding bills for the user"""
-    bills = await get_outstanding_bills(user_id)
-
+    tool_parameters: ListBillsToolCallParameters,
+    language: str = "en",
+) -> ToolMessage:
+    """
+    Outstanding bills, soonest due first, one page at a time.
+
+    When they don't fit on the first page, it opens with the count, total and
+    earliest due date per type, aggregated by the database, so a portfolio of
+    hundreds of bills is summed up in a few lines.
+    """
+    try:
+        cursor = BillCursor.decode(tool_parameters.cursor) if tool_parameters.cursor else None
+    except ValueError:
+        return message("bills.invalid_cursor")
+
+    limit = min(max(tool_parameters.limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    if cursor:
+        bills, next_cursor = await get_outstanding_bills_page(user_id, limit, cursor)
+        if not bills:
+            return message("bills.no_more")
+        return message("bills.page", items=_describe_bills(bills, language), more=_more(next_cursor))
+
+    summary, (bills, next_cursor) = await asyncio.gather(
+        get_outstanding_bill_summary(user_id),
+        get_outstanding_bills_page(user_id, limit),
+    )
     if not bills:
-        return "You have no outstanding bills."
-
-    bill_list = []
-    for bill in bills:
-        status_text = "overdue" if bill.status == BillStatus.OVERDUE else "pending"
-        description = f" - {bill.description}" if bill.description else ""
-        due_date_str = bill.due_date.strftime("%Y-%m-%d")
-        bill_list.append(
-            f"- {bill.type.value.capitalize()}{description}: {bill.amount} (due: {due_date_str}, {status_text})"
+        return message("bills.none")
+    items = _describe_bills(bills, language)
+    if not next_cursor:
+        return message("bills.list", count=number_to_words(len(bills), language), items=items)
+
+    types = []
+    totals = amounts_to_words([bill_type.total for bill_type in summary], language)
+    for bill_type, total_text in zip(summary, totals):
+        item = dict(
+            type=enum_label(bill_type.type),
+            count=number_to_words(bill_type.count, language),
+            total=total_text,
+            due_date=bill_type.earliest_due_date.strftime("%Y-%m-%d"),
         )
-
-    header = f"You have {len(bills)} outstanding bill(s):\n"
-    return header + "\n".join(bill_list)
+        if bill_type.overdue:
+            overdue = number_to_words(bill_type.overdue, language)
+            types.append(message("bills.type_summary_overdue", overdue=overdue, **item))
+        else:
+            types.append(message("bills.type_summary", **item))
+
+    return message(
+        "bills.summary",
+        count=number_to_words(sum(bill_type.count for bill_type in summary), language),
+        total=amount_to_words(sum(bill_type.total for bill_type in summary), language),
+        types=Lines(types),
+        shown=number_to_words(len(bills), language),
+        items=items,
+        more=_more(next_cursor),
+    )
 
 
 async def pay_outstanding_bill(
     call_id: int,
     user_id: str,
     tool_parameters: PayBillToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Pay an outstanding bill of a specific type"""
     # Validate bill type
     try:
-        bill_type = BillType(tool_parameters.bill_type.lower())
+        bill_type = BillType(tool_parameters.bill_type.upper())
     except ValueError:
-        valid_types = ", ".join([t.value for t in BillType])
-        return f"Invalid bill type '{tool_parameters.bill_type}'. Valid types are: {valid_types}"
-
-    # Get the user's account
-    from_account = await get_account_by_title_and_user(
-        tool_parameters.from_account_title, user_id
+        # The values the tool takes, so they aren't translated
+        valid_types = [t.value.lower() for t in BillType]
+        return message("bills.invalid_type", bill_type=tool_parameters.bill_type, valid_types=valid_types)
+
+    account, problem = await resolve_account_title(user_id, tool_parameters.from_account_title)
+    if problem:
+        return problem
+    account_title = account.title
+
+    # Locks the bill, debits the account, records the transaction and marks
+    # the bill paid in one statement
+    payment = await pay_outstanding_bills(
+        user_id,
+        account.account_id,
+        bill_types=[bill_type],
+        limit=1,
+        call_id=call_id,
     )
 
-    if not from_account:
-        return f"Account '{tool_parameters.from_account_title}' not found"
+    if payment is None:
+        return message("bills.retry")
 
-    if from_account.status != AccountStatus.ACTIVE:
-        return f"Account '{tool_parameters.from_account_title}' is not active"
+    if not payment.account_found:
+        return message("account.not_found", title=account_title)
 
-    # Find the outstanding bill
-    bill = await get_outstanding_bill_by_type(user_id, bill_type)
+    if payment.account_status != AccountStatus.ACTIVE:
+        return message("account.not_active", title=account_title)
 
-    if not bill:
-        return f"No outstanding {bill_type.value} bill found"
+    if not payment.bills:
+        return message("bills.none_of_type", bill_type=enum_label(bill_type))
 
-    # Check sufficient balance
-    if from_account.balance < bill.amount:
-        return f"Insufficient balance. Bill amount: {bill.amount}, Available: {from_account.balance}"
+    if not payment.paid:
+        return message("bills.insufficient", total=payment.total, available=payment.available)
 
-    # Deduct from account
-    new_balance = from_account.balance - bill.amount
-    await update_account_balance(from_account.id, new_balance)
+    return message("bills.paid", bill_type=enum_label(bill_type), total=payment.total, title=account_title)
 
-    # Create transaction record
-    transaction = await create_transaction(
-        reference=f"BILL-{bill_type.value.upper()}-{bill.id}-{datetime.utcnow().timestamp()}",
-        amount=bill.amount,
-        transaction_type=TransactionType.WITHDRAWAL,
-        from_account_id=from_account.id,
-        to_account_id=None,
-        description=f"Payment for {bill_type.value} bill",
+
+async def pay_all_outstanding_bills(
+    call_id: int,
+    user_id: str,
+    tool_parameters: PayAllBillsToolCallParameters,
+) -> ToolMessage:
+    """Pay every outstanding bill (or those of the given types) in one payment"""
+    bill_types = None
+    if tool_parameters.bill_types:
+        try:
+            bill_types = [BillType(bill_type.upper()) for bill_type in tool_parameters.bill_types]
+        except ValueError:
+            valid_types = [t.value.lower() for t in BillType]
+            return message("bills.invalid_types", bill_types=tool_parameters.bill_types, valid_types=valid_types)
+
+    account, problem = await resolve_account_title(user_id, tool_parameters.from_account_title)
+    if problem:
+        return problem
+    account_title = account.title
+
+    # The total is checked once and every bill is settled in one statement
+    payment = await pay_outstanding_bills(
+        user_id,
+        account.account_id,
+        bill_types=bill_types,
         call_id=call_id,
     )
 
-    # Mark bill as paid
-    await pay_bill(bill.id, from_account.id, transaction.id)
+    if payment is None:
+        return message("bills.retry")
 
-    return f"Successfully paid {bill_type.value} bill of {bill.amount} Malaysian Ringgit from {tool_parameters.from_account_title}"
+    if not payment.account_found:
+        return message("account.not_found", title=account_title)
+
+    if payment.account_status != AccountStatus.ACTIVE:
+        return message("account.not_active", title=account_title)
+
+    if not payment.bills:
+        if bill_types:
+            return message("bills.none_of_types", bill_types=[enum_label(t) for t in bill_types])
+        return message("bills.none")
+
+    if not payment.paid:
+        return message(
+            "bills.insufficient_all",
+            count=len(payment.bills),
+            total=payment.total,
+            available=payment.available,
+        )
+
+    paid = [message("bills.paid_item", bill_type=enum_label(bill.type), amount=bill.amount) for bill in payment.bills]
+    return message(
+        "bills.paid_all",
+        count=len(payment.bills),
+        total=payment.total,
+        title=account_title,
+        paid=paid,
+    )
@@ -0,0 +1,15 @@
+"""
+Tool response templates per language, keyed by message.
+
+English is the reference catalog: every message exists there, and other
+catalogs may leave messages out to fall back to it. Templates use str.format
+fields without format specs; see core.tools.messages.
+"""
+from core.tools.catalogs import en, ms, zh
+
+# Codes as in core.calls.build_payload.SupportedLanguage
+CATALOGS: dict[str, dict[str, str]] = {
+    "en": en.MESSAGES,
+    "ms": ms.MESSAGES,
+    "zh": zh.MESSAGES,
+}
@@ -0,0 +1,140 @@
+MESSAGES = {
+    # Accounts named by the caller
+    "account.not_found": "Account '{title}' not found",
+    "account.not_found_with_options": "Account '{title}' not found. Your accounts are: {titles}",
+    "account.ambiguous": "Which account do you mean: {options}?",
+    "account.ambiguous_option": "'{title}' ending in {digits}",
+    "account.not_active": "Account '{title}' is not active",
+    "account.closed": "Account '{title}' is closed",
+    "account.none": "You don't have any bank accounts yet. Would you like to open one?",
+    "balance.insufficient": "Insufficient balance. Available: {available}",
+    # Transfers
+    "transfer.failed": "Failed to transfer money",
+    "transfer.completed": "Successfully transferred {amount} from {from_title} to {to_title}",
+    "transfer.completed_to_user": "Successfully transferred {amount} to {recipient}",
+    "recipient.not_found": "Recipient '{recipient}' not found",
+    "recipient.no_active_account": "Recipient '{recipient}' has no active account",
+    "transfer.request_failed": "Failed to create transfer request",
+    "transfer.otp_issued": (
+        "Transaction ready: Transfer {amount} from {from_title} to {to_title}. An OTP has been generated. "
+        "Your OTP is {otp}. Please provide this OTP to confirm the transaction."
+    ),
+    "transfer.otp_issued_to_user": (
+        "Transaction ready: Transfer {amount} to {recipient}. An OTP has been generated. "
+        "Your OTP is {otp}. Please provide this OTP to confirm the transaction."
+    ),
+    "transfer.retry": "The transfer could not be completed. Please try again.",
+    "otp.invalid": "Invalid or expired OTP. Please request a new transfer.",
+    "otp.no_transaction": "No pending transaction found for this OTP.",
+    "transfer.not_pending": "Transaction is no longer pending. Current status: {status}",
+    "transfer.accounts_missing": "Transaction accounts not found.",
+    "transfer.same_account": "The transfer could not be completed: the source and destination accounts are the same.",
+    "transfer.confirmed": "Transaction confirmed! Successfully transferred {amount} from {from_title} to {to_title}.",
+    # Bills
+    "bills.none": "You have no outstanding bills.",
+    "bills.list": "You have {count} outstanding bill(s):\n{items}",
+    "bills.item": "- {type}: {amount} (due: {due_date}, {status})",
+    "bills.item_described": "- {type} - {description}: {amount} (due: {due_date}, {status})",
+    "bills.summary": (
+        "You have {count} outstanding bills totalling {total}:\n{types}\nThe {shown} due soonest:\n{items}{more}"
+    ),
+    "bills.type_summary": "- {type}: {count} bill(s) totalling {total}, earliest due {due_date}",
+    "bills.type_summary_overdue": (
+        "- {type}: {count} bill(s) totalling {total}, earliest due {due_date}, {overdue} overdue"
+    ),
+    "bills.page": "More outstanding bills:\n{items}{more}",
+    "bills.more": "\nThere are more bills. To read them, call list_bills again with cursor {cursor}.",
+    "bills.no_more": "There are no more outstanding bills.",
+    "bills.invalid_cursor": (
+        "Invalid cursor. Call list_bills without a cursor to start from the bills due soonest."
+    ),
+    "bills.invalid_type": "Invalid bill type '{bill_type}'. Valid types are: {valid_types}",
+    "bills.invalid_types": "Invalid bill type in {bill_types}. Valid types are: {valid_types}",
+    "bills.retry": "The payment could not be completed. Please try again.",
+    "bills.none_of_type": "No outstanding {bill_type} bill found",
+    "bills.none_of_types": "No outstanding {bill_types} bills found",
+    "bills.insufficient": "Insufficient balance. Bill amount: {total}, Available: {available}",
+    "bills.paid": "Successfully paid {bill_type} bill of {total} Malaysian Ringgit from {title}",
+    "bills.insufficient_all": (
+        "Insufficient balance to pay {count} bill(s). Total: {total}, Available: {available}. No bills were paid."
+    ),
+    "bills.paid_all": "Successfully paid {count} bill(s) totalling {total} Malaysian Ringgit from {title}: {paid}",
+    "bills.paid_item": "{bill_type} {amount}",
+    # Account management
+    "account.exists": "An account with the name '{title}' already exists",
+    "account.opened": "Successfully opened account '{title}' with account number {account_number}",
+    "account.already_closed": "Account '{title}' is already closed",
+    "account.close_needs_destination": (
+        "Account has a balance of {balance}. Please specify an account to transfer the remaining funds to."
+    ),
+    "account.close_destination_problem": "Transfer destination: {problem}",
+    "account.close_destination_not_active": "Transfer destination account '{title}' is not active",
+    "account.close_same_destination": "Cannot transfer funds to the same account being closed",
+    "account.close_failed": "Failed to close the account",
+    "account.closed_with_transfer": "Successfully closed account '{title}' and transferred {balance} to '{to_title}'",
+    "account.closed_ok": "Successfully closed account '{title}'",
+    "account.freeze_closed": "Cannot freeze a closed account",
+    "account.already_frozen": "Account '{title}' is already frozen",
+    "account.freeze_failed": "Failed to freeze the account",
+    "account.frozen": "Successfully froze account '{title}'",
+    "account.unfreeze_closed": "Cannot unfreeze a closed account",
+    "account.not_frozen": "Account '{title}' is not frozen",
+    "account.unfreeze_failed": "Failed to unfreeze the account",
+    "account.unfrozen": "Successfully unfroze account '{title}'",
+    "accounts.list": "You have {count} accounts:\n{items}",
+    "accounts.item": "- {title}: Account number {account_number}, Balance: {balance}, Status: {status}",
+    "accounts.summary": (
+        "You have {count} accounts with {total} in total:\n{statuses}\n"
+        "The {shown} with the largest balances:\n{items}{more}"
+    ),
+    "accounts.status_summary": "- {status}: {count}, {total}",
+    "accounts.page": "More accounts:\n{items}{more}",
+    "accounts.more": "\nThere are more accounts. To read them, call list_accounts again with cursor {cursor}.",
+    "accounts.no_more": "There are no more accounts.",
+    "accounts.invalid_cursor": (
+        "Invalid cursor. Call list_accounts without a cursor to start from the largest balances."
+    ),
+    "balance.one": "The balance of {title}{frozen}: {amount}",
+    "balance.list": "Your balances:\n{items}",
+    "balance.item": "- {title}{frozen}: {amount}",
+    "balance.frozen": " (frozen)",
+    # History
+    "history.transfer": "Transfer of {amount} from {source} to {target}",
+    "history.payment": "{amount} paid from {source}",
+    "history.payment_described": "{amount} paid from {source} ({description})",
+    "history.sent": "Sent {amount} from {source}",
+    "history.received": "Received {amount} in {target}",
+    "history.line": "- {date}: {text}",
+    "history.line_status": "- {date}: {text}, {status}",
+    "history.no_accounts": "You have no accounts.",
+    "history.invalid_date": "Invalid date. Please use the format YYYY-MM-DD.",
+    "history.invalid_cursor": (
+        "Invalid cursor. Call get_history without a cursor to start from the most recent transactions."
+    ),
+    "history.no_older": "There are no older transactions.",
+    "history.none": "No transactions found.",
+    "history.recent": "Most recent transactions:\n{items}{more}",
+    "history.older": "Older transactions:\n{items}{more}",
+    "history.more": "\nThere are older transactions. To read them, call get_history again with cursor {cursor}.",
+    # Webhook
+    "tool.unsupported": "Operation not supported at the moment",
+    "tool.invalid_arguments": "Invalid arguments for {tool}: {problems}",
+    # Enum labels, see core.tools.messages.enum_label
+    "BillType.ELECTRICITY": "electricity",
+    "BillType.WATER": "water",
+    "BillType.GAS": "gas",
+    "BillType.INTERNET": "internet",
+    "BillType.TV": "TV",
+    "BillType.PHONE": "phone",
+    "BillType.PARKING": "parking",
+    "BillType.OTHER": "other",
+    "BillStatus.PENDING": "pending",
+    "BillStatus.PAID": "paid",
+    "BillStatus.OVERDUE": "overdue",
+    "AccountStatus.ACTIVE": "active",
+    "AccountStatus.SUSPENDED": "frozen",
+    "AccountStatus.CLOSED": "closed",
+    "TransactionStatus.PENDING": "pending",
+    "TransactionStatus.COMPLETED": "completed",
+    "TransactionStatus.FAILED": "failed",
+}
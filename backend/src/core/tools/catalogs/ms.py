@@ -0,0 +1,147 @@
+MESSAGES = {
+    # Accounts named by the caller
+    "account.not_found": "Akaun '{title}' tidak dijumpai",
+    "account.not_found_with_options": "Akaun '{title}' tidak dijumpai. Akaun anda ialah: {titles}",
+    "account.ambiguous": "Akaun yang mana satu anda maksudkan: {options}?",
+    "account.ambiguous_option": "'{title}' yang berakhir dengan {digits}",
+    "account.not_active": "Akaun '{title}' tidak aktif",
+    "account.closed": "Akaun '{title}' telah ditutup",
+    "account.none": "Anda belum mempunyai sebarang akaun bank. Adakah anda ingin membuka satu?",
+    "balance.insufficient": "Baki tidak mencukupi. Baki tersedia: {available}",
+    # Transfers
+    "transfer.failed": "Pemindahan wang gagal",
+    "transfer.completed": "Berjaya memindahkan {amount} dari {from_title} ke {to_title}",
+    "transfer.completed_to_user": "Berjaya memindahkan {amount} kepada {recipient}",
+    "recipient.not_found": "Penerima '{recipient}' tidak dijumpai",
+    "recipient.no_active_account": "Penerima '{recipient}' tiada akaun aktif",
+    "transfer.request_failed": "Permintaan pemindahan tidak dapat dibuat",
+    "transfer.otp_issued": (
+        "Transaksi sedia: Pindahan {amount} dari {from_title} ke {to_title}. OTP telah dijana. "
+        "OTP anda ialah {otp}. Sila berikan OTP ini untuk mengesahkan transaksi."
+    ),
+    "transfer.otp_issued_to_user": (
+        "Transaksi sedia: Pindahan {amount} kepada {recipient}. OTP telah dijana. "
+        "OTP anda ialah {otp}. Sila berikan OTP ini untuk mengesahkan transaksi."
+    ),
+    "transfer.retry": "Pemindahan tidak dapat diselesaikan. Sila cuba lagi.",
+    "otp.invalid": "OTP tidak sah atau telah tamat tempoh. Sila buat permintaan pemindahan baharu.",
+    "otp.no_transaction": "Tiada transaksi tertunda untuk OTP ini.",
+    "transfer.not_pending": "Transaksi ini tidak lagi tertunda. Status semasa: {status}",
+    "transfer.accounts_missing": "Akaun transaksi tidak dijumpai.",
+    "transfer.same_account": "Pemindahan tidak dapat diselesaikan: akaun sumber dan akaun destinasi adalah sama.",
+    "transfer.confirmed": "Transaksi disahkan! Berjaya memindahkan {amount} dari {from_title} ke {to_title}.",
+    # Bills
+    "bills.none": "Anda tiada bil tertunggak.",
+    "bills.list": "Anda mempunyai {count} bil tertunggak:\n{items}",
+    "bills.item": "- {type}: {amount} (tarikh akhir: {due_date}, {status})",
+    "bills.item_described": "- {type} - {description}: {amount} (tarikh akhir: {due_date}, {status})",
+    "bills.summary": (
+        "Anda mempunyai {count} bil tertunggak berjumlah {total}:\n{types}\n"
+        "Berikut {shown} bil yang paling hampir tarikh akhir:\n{items}{more}"
+    ),
+    "bills.type_summary": "- {type}: {count} bil berjumlah {total}, tarikh akhir terawal {due_date}",
+    "bills.type_summary_overdue": (
+        "- {type}: {count} bil berjumlah {total}, tarikh akhir terawal {due_date}, {overdue} lewat bayar"
+    ),
+    "bills.page": "Bil tertunggak seterusnya:\n{items}{more}",
+    "bills.more": "\nMasih ada bil lain. Untuk membacanya, panggil list_bills sekali lagi dengan kursor {cursor}.",
+    "bills.no_more": "Tiada lagi bil tertunggak.",
+    "bills.invalid_cursor": (
+        "Kursor tidak sah. Panggil list_bills tanpa kursor untuk bermula dari bil yang paling hampir tarikh akhir."
+    ),
+    "bills.invalid_type": "Jenis bil '{bill_type}' tidak sah. Jenis yang sah ialah: {valid_types}",
+    "bills.invalid_types": "Jenis bil tidak sah dalam {bill_types}. Jenis yang sah ialah: {valid_types}",
+    "bills.retry": "Pembayaran tidak dapat diselesaikan. Sila cuba lagi.",
+    "bills.none_of_type": "Tiada bil {bill_type} tertunggak",
+    "bills.none_of_types": "Tiada bil {bill_types} tertunggak",
+    "bills.insufficient": "Baki tidak mencukupi. Jumlah bil: {total}, Baki tersedia: {available}",
+    "bills.paid": "Berjaya membayar bil {bill_type} sebanyak {total} Ringgit Malaysia dari {title}",
+    "bills.insufficient_all": (
+        "Baki tidak mencukupi untuk membayar {count} bil. Jumlah: {total}, Baki tersedia: {available}. "
+        "Tiada bil dibayar."
+    ),
+    "bills.paid_all": "Berjaya membayar {count} bil berjumlah {total} Ringgit Malaysia dari {title}: {paid}",
+    "bills.paid_item": "{bill_type} {amount}",
+    # Account management
+    "account.exists": "Akaun dengan nama '{title}' sudah wujud",
+    "account.opened": "Berjaya membuka akaun '{title}' dengan nombor akaun {account_number}",
+    "account.already_closed": "Akaun '{title}' sudah ditutup",
+    "account.close_needs_destination": (
+        "Akaun ini mempunyai baki {balance}. Sila nyatakan akaun untuk menerima baki dana tersebut."
+    ),
+    "account.close_destination_problem": "Akaun destinasi: {problem}",
+    "account.close_destination_not_active": "Akaun destinasi '{title}' tidak aktif",
+    "account.close_same_destination": "Dana tidak boleh dipindahkan ke akaun yang sedang ditutup",
+    "account.close_failed": "Akaun tidak dapat ditutup",
+    "account.closed_with_transfer": "Berjaya menutup akaun '{title}' dan memindahkan {balance} ke '{to_title}'",
+    "account.closed_ok": "Berjaya menutup akaun '{title}'",
+    "account.freeze_closed": "Akaun yang telah ditutup tidak boleh dibekukan",
+    "account.already_frozen": "Akaun '{title}' sudah dibekukan",
+    "account.freeze_failed": "Akaun tidak dapat dibekukan",
+    "account.frozen": "Berjaya membekukan akaun '{title}'",
+    "account.unfreeze_closed": "Akaun yang telah ditutup tidak boleh dinyahbekukan",
+    "account.not_frozen": "Akaun '{title}' tidak dibekukan",
+    "account.unfreeze_failed": "Akaun tidak dapat dinyahbekukan",
+    "account.unfrozen": "Berjaya menyahbekukan akaun '{title}'",
+    "accounts.list": "Anda mempunyai {count} akaun:\n{items}",
+    "accounts.item": "- {title}: Nombor akaun {account_number}, Baki: {balance}, Status: {status}",
+    "accounts.summary": (
+        "Anda mempunyai {count} akaun dengan jumlah {total}:\n{statuses}\n"
+        "Berikut {shown} akaun dengan baki tertinggi:\n{items}{more}"
+    ),
+    "accounts.status_summary": "- {status}: {count}, {total}",
+    "accounts.page": "Akaun seterusnya:\n{items}{more}",
+    "accounts.more": (
+        "\nMasih ada akaun lain. Untuk membacanya, panggil list_accounts sekali lagi dengan kursor {cursor}."
+    ),
+    "accounts.no_more": "Tiada lagi akaun.",
+    "accounts.invalid_cursor": (
+        "Kursor tidak sah. Panggil list_accounts tanpa kursor untuk bermula dari baki tertinggi."
+    ),
+    "balance.one": "Baki {title}{frozen}: {amount}",
+    "balance.list": "Baki anda:\n{items}",
+    "balance.item": "- {title}{frozen}: {amount}",
+    "balance.frozen": " (dibekukan)",
+    # History
+    "history.transfer": "Pindahan {amount} dari {source} ke {target}",
+    "history.payment": "{amount} dibayar dari {source}",
+    "history.payment_described": "{amount} dibayar dari {source} ({description})",
+    "history.sent": "{amount} dihantar dari {source}",
+    "history.received": "{amount} diterima ke dalam {target}",
+    "history.line": "- {date}: {text}",
+    "history.line_status": "- {date}: {text}, {status}",
+    "history.no_accounts": "Anda tiada akaun.",
+    "history.invalid_date": "Tarikh tidak sah. Sila gunakan format YYYY-MM-DD.",
+    "history.invalid_cursor": (
+        "Kursor tidak sah. Panggil get_history tanpa kursor untuk bermula dari transaksi terkini."
+    ),
+    "history.no_older": "Tiada transaksi yang lebih lama.",
+    "history.none": "Tiada transaksi dijumpai.",
+    "history.recent": "Transaksi terkini:\n{items}{more}",
+    "history.older": "Transaksi lebih lama:\n{items}{more}",
+    "history.more": (
+        "\nTerdapat transaksi yang lebih lama. Untuk membacanya, panggil get_history sekali lagi "
+        "dengan kursor {cursor}."
+    ),
+    # Webhook
+    "tool.unsupported": "Operasi ini tidak disokong buat masa ini",
+    "tool.invalid_arguments": "Argumen tidak sah untuk {tool}: {problems}",
+    # Enum labels
+    "BillType.ELECTRICITY": "elektrik",
+    "BillType.WATER": "air",
+    "BillType.GAS": "gas",
+    "BillType.INTERNET": "internet",
+    "BillType.TV": "TV",
+    "BillType.PHONE": "telefon",
+    "BillType.PARKING": "letak kereta",
+    "BillType.OTHER": "lain-lain",
+    "BillStatus.PENDING": "belum dibayar",
+    "BillStatus.PAID": "dibayar",
+    "BillStatus.OVERDUE": "lewat bayar",
+    "AccountStatus.ACTIVE": "aktif",
+    "AccountStatus.SUSPENDED": "dibekukan",
+    "AccountStatus.CLOSED": "ditutup",
+    "TransactionStatus.PENDING": "tertunda",
+    "TransactionStatus.COMPLETED": "selesai",
+    "TransactionStatus.FAILED": "gagal",
+}
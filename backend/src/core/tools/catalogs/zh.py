@@ -0,0 +1,123 @@
+MESSAGES = {
+    # Accounts named by the caller
+    "account.not_found": "找不到账户“{title}”",
+    "account.not_found_with_options": "找不到账户“{title}”。您的账户有：{titles}",
+    "account.ambiguous": "您指的是哪个账户：{options}？",
+    "account.ambiguous_option": "尾号为{digits}的'{title}'",
+    "account.not_active": "账户“{title}”当前不可用",
+    "account.closed": "账户“{title}”已关闭",
+    "account.none": "您还没有任何银行账户。需要为您开一个吗？",
+    "balance.insufficient": "余额不足。可用余额：{available}",
+    # Transfers
+    "transfer.failed": "转账失败",
+    "transfer.completed": "已成功从{from_title}转账{amount}到{to_title}",
+    "transfer.completed_to_user": "已成功向{recipient}转账{amount}",
+    "recipient.not_found": "找不到收款人“{recipient}”",
+    "recipient.no_active_account": "收款人“{recipient}”没有可用的账户",
+    "transfer.request_failed": "无法创建转账请求",
+    "transfer.otp_issued": (
+        "交易已准备好：从{from_title}转账{amount}到{to_title}。已生成一次性验证码，"
+        "您的验证码是{otp}。请提供此验证码以确认交易。"
+    ),
+    "transfer.otp_issued_to_user": (
+        "交易已准备好：向{recipient}转账{amount}。已生成一次性验证码，"
+        "您的验证码是{otp}。请提供此验证码以确认交易。"
+    ),
+    "transfer.retry": "转账未能完成，请重试。",
+    "otp.invalid": "验证码无效或已过期，请重新发起转账。",
+    "otp.no_transaction": "没有找到与此验证码对应的待处理交易。",
+    "transfer.not_pending": "该交易已不再处于待处理状态。当前状态：{status}",
+    "transfer.accounts_missing": "找不到交易相关的账户。",
+    "transfer.same_account": "转账未能完成：转出账户和转入账户相同。",
+    "transfer.confirmed": "交易已确认！已成功从{from_title}转账{amount}到{to_title}。",
+    # Bills
+    "bills.none": "您没有未付账单。",
+    "bills.list": "您有{count}张未付账单：\n{items}",
+    "bills.item": "- {type}：{amount}（到期日：{due_date}，{status}）",
+    "bills.item_described": "- {type} - {description}：{amount}（到期日：{due_date}，{status}）",
+    "bills.summary": "您有{count}张未付账单，共计{total}：\n{types}\n最快到期的{shown}张：\n{items}{more}",
+    "bills.type_summary": "- {type}：{count}张，共计{total}，最早到期日{due_date}",
+    "bills.type_summary_overdue": "- {type}：{count}张，共计{total}，最早到期日{due_date}，其中{overdue}张逾期",
+    "bills.page": "更多未付账单：\n{items}{more}",
+    "bills.more": "\n还有更多账单。如需查看，请使用游标{cursor}再次调用list_bills。",
+    "bills.no_more": "没有更多未付账单了。",
+    "bills.invalid_cursor": "游标无效。请不带游标调用list_bills，从最快到期的账单开始。",
+    "bills.invalid_type": "账单类型“{bill_type}”无效。有效类型为：{valid_types}",
+    "bills.invalid_types": "{bill_types}中有无效的账单类型。有效类型为：{valid_types}",
+    "bills.retry": "付款未能完成，请重试。",
+    "bills.none_of_type": "没有未付的{bill_type}账单",
+    "bills.none_of_types": "没有未付的{bill_types}账单",
+    "bills.insufficient": "余额不足。账单金额：{total}，可用余额：{available}",
+    "bills.paid": "已成功从{title}支付{bill_type}账单，金额为{total}马来西亚令吉",
+    "bills.insufficient_all": "余额不足，无法支付{count}张账单。总额：{total}，可用余额：{available}。没有支付任何账单。",
+    "bills.paid_all": "已成功从{title}支付{count}张账单，共计{total}马来西亚令吉：{paid}",
+    "bills.paid_item": "{bill_type}{amount}",
+    # Account management
+    "account.exists": "名为“{title}”的账户已存在",
+    "account.opened": "已成功开立账户“{title}”，账号为{account_number}",
+    "account.already_closed": "账户“{title}”已关闭",
+    "account.close_needs_destination": "该账户余额为{balance}。请指定一个账户来接收剩余资金。",
+    "account.close_destination_problem": "转入账户：{problem}",
+    "account.close_destination_not_active": "转入账户“{title}”当前不可用",
+    "account.close_same_destination": "不能将资金转入正在关闭的账户",
+    "account.close_failed": "关闭账户失败",
+    "account.closed_with_transfer": "已成功关闭账户“{title}”，并将{balance}转入“{to_title}”",
+    "account.closed_ok": "已成功关闭账户“{title}”",
+    "account.freeze_closed": "无法冻结已关闭的账户",
+    "account.already_frozen": "账户“{title}”已被冻结",
+    "account.freeze_failed": "冻结账户失败",
+    "account.frozen": "已成功冻结账户“{title}”",
+    "account.unfreeze_closed": "无法解冻已关闭的账户",
+    "account.not_frozen": "账户“{title}”未被冻结",
+    "account.unfreeze_failed": "解冻账户失败",
+    "account.unfrozen": "已成功解冻账户“{title}”",
+    "accounts.list": "您有{count}个账户：\n{items}",
+    "accounts.item": "- {title}：账号{account_number}，余额：{balance}，状态：{status}",
+    "accounts.summary": "您有{count}个账户，共计{total}：\n{statuses}\n余额最高的{shown}个：\n{items}{more}",
+    "accounts.status_summary": "- {status}：{count}个，{total}",
+    "accounts.page": "更多账户：\n{items}{more}",
+    "accounts.more": "\n还有更多账户。如需查看，请使用游标{cursor}再次调用list_accounts。",
+    "accounts.no_more": "没有更多账户了。",
+    "accounts.invalid_cursor": "游标无效。请不带游标调用list_accounts，从余额最高的账户开始。",
+    "balance.one": "{title}{frozen}的余额：{amount}",
+    "balance.list": "您的余额：\n{items}",
+    "balance.item": "- {title}{frozen}：{amount}",
+    "balance.frozen": "（已冻结）",
+    # History
+    "history.transfer": "从{source}转账{amount}到{target}",
+    "history.payment": "从{source}支付{amount}",
+    "history.payment_described": "从{source}支付{amount}（{description}）",
+    "history.sent": "从{source}转出{amount}",
+    "history.received": "{target}收到{amount}",
+    "history.line": "- {date}：{text}",
+    "history.line_status": "- {date}：{text}，{status}",
+    "history.no_accounts": "您没有账户。",
+    "history.invalid_date": "日期无效，请使用YYYY-MM-DD格式。",
+    "history.invalid_cursor": "游标无效。请不带游标调用get_history，从最近的交易开始。",
+    "history.no_older": "没有更早的交易了。",
+    "history.none": "没有找到交易记录。",
+    "history.recent": "最近的交易：\n{items}{more}",
+    "history.older": "更早的交易：\n{items}{more}",
+    "history.more": "\n还有更早的交易。如需查看，请使用游标{cursor}再次调用get_history。",
+    # Webhook
+    "tool.unsupported": "目前不支持此操作",
+    "tool.invalid_arguments": "{tool}的参数无效：{problems}",
+    # Enum labels
+    "BillType.ELECTRICITY": "电费",
+    "BillType.WATER": "水费",
+    "BillType.GAS": "燃气费",
+    "BillType.INTERNET": "网络费",
+    "BillType.TV": "电视费",
+    "BillType.PHONE": "电话费",
+    "BillType.PARKING": "停车费",
+    "BillType.OTHER": "其他",
+    "BillStatus.PENDING": "待付",
+    "BillStatus.PAID": "已付",
+    "BillStatus.OVERDUE": "逾期",
+    "AccountStatus.ACTIVE": "正常",
+    "AccountStatus.SUSPENDED": "已冻结",
+    "AccountStatus.CLOSED": "已关闭",
+    "TransactionStatus.PENDING": "待处理",
+    "TransactionStatus.COMPLETED": "已完成",
+    "TransactionStatus.FAILED": "失败",
+}
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+from core.tools.account_lookup import resolve_account_title
+from core.tools.messages import Lines, ToolMessage, enum_label, message
+from entrypoints.api.tool_parameters import GetHistoryToolCallParameters
+from infrastructure.models import Transaction, TransactionStatus
+from infrastructure.repositories import (
+    HistoryCursor,
+    get_accounts_by_user,
+    get_transaction_history,
+)
+
+DEFAULT_PAGE_SIZE = 5
+MAX_PAGE_SIZE = 20
+
+
+def _describe(transaction: Transaction, titles: dict[int, str]) -> ToolMessage:
+    source = titles.get(transaction.from_account_id)
+    target = titles.get(transaction.to_account_id)
+    amount = transaction.amount
+
+    if source and target:
+        text = message("history.transfer", amount=amount, source=source, target=target)
+    elif source and transaction.to_account_id is None:
+        if transaction.description:
+            text = message(
+                "history.payment_described", amount=amount, source=source, description=transaction.description
+            )
+        else:
+            text = message("history.payment", amount=amount, source=source)
+    elif source:
+        text = message("history.sent", amount=amount, source=source)
+    else:
+        text = message("history.received", amount=amount, target=target)
+
+    date = transaction.created_at.strftime("%Y-%m-%d")
+    if transaction.status != TransactionStatus.COMPLETED:
+        return message("history.line_status", date=date, text=text, status=enum_label(transaction.status))
+    return message("history.line", date=date, text=text)
+
+
+async def get_history(
+    user_id: str,
+    tool_parameters: GetHistoryToolCallParameters,
+) -> ToolMessage:
+    """List the user's transactions, newest first, one page at a time"""
+    accounts = await get_accounts_by_user(user_id)
+    titles = {account.id: account.title for account in accounts}
+
+    if tool_parameters.account_title:
+        match, problem = await resolve_account_title(user_id, tool_parameters.account_title)
+        if problem:
+            return problem
+        selected = [account for account in accounts if account.id == match.account_id]
+    else:
+        selected = accounts
+
+    if not selected:
+        return message("history.no_accounts")
+
+    try:
+        since = datetime.strptime(tool_parameters.from_date, "%Y-%m-%d") if tool_parameters.from_date else None
+        # to_date is inclusive
+        until = (
+            datetime.strptime(tool_parameters.to_date, "%Y-%m-%d") + timedelta(days=1)
+            if tool_parameters.to_date
+            else None
+        )
+    except ValueError:
+        return message("history.invalid_date")
+
+    try:
+        cursor = HistoryCursor.decode(tool_parameters.cursor) if tool_parameters.cursor else None
+    except ValueError:
+        return message("history.invalid_cursor")
+
+    limit = min(max(tool_parameters.limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    transactions, next_cursor = await get_transaction_history(
+        [account.id for account in selected], limit, cursor=cursor, since=since, until=until
+    )
+
+    if not transactions:
+        if cursor:
+            return message("history.no_older")
+        return message("history.none")
+
+    return message(
+        "history.older" if cursor else "history.recent",
+        items=Lines(_describe(transaction, titles) for transaction in transactions),
+        more=message("history.more", cursor=next_cursor.encode()) if next_cursor else "",
+    )
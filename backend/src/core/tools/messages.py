@@ -0,0 +1,126 @@
+"""
+Tool responses in the call's language.
+
+Handlers return a ToolMessage, a stable key from the catalogs in
+core.tools.catalogs plus its parameters, and the webhook renders it in the
+call's language, so the model can read the result out as is instead of
+translating it on every turn.
+
+Catalogs are compiled once, on import (the API imports this module at
+startup): each template is split into literal text and field names, and a
+translation may only use fields its English template has. Keys a language
+doesn't translate fall back to English.
+
+Parameter values that are ToolMessages, such as enum labels or nested
+problems, are rendered in the same language, and Digits are read one by
+one in it. Lines are rendered one per line, and other lists and tuples
+comma-separated.
+"""
+from enum import Enum
+from string import Formatter
+from typing import Any, NamedTuple, Optional, Union
+
+from loguru import logger
+
+from core.tools.catalogs import CATALOGS
+from core.tools.spoken_numbers import spell_digits
+
+DEFAULT_LANGUAGE = "en"
+
+# Literal text followed by the field rendered after it, if any
+_Template = tuple[tuple[str, Optional[str]], ...]
+
+
+class ToolMessage(NamedTuple):
+    key: str
+    params: dict[str, Any] = {}
+
+
+class Lines(tuple):
+    """Values rendered one per line."""
+
+
+class Digits(str):
+    """An identifier, such as part of an account number, read digit by digit."""
+
+
+def message(key: str, **params: Any) -> ToolMessage:
+    return ToolMessage(key, params)
+
+
+def enum_label(value: Enum) -> ToolMessage:
+    """The spoken label of an enum member, e.g. BillType.WATER -> "water"."""
+    return ToolMessage(f"{type(value).__name__}.{value.value}")
+
+
+def _compile(key: str, template: str) -> _Template:
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if spec or conversion:
+            raise ValueError(f"Message {key!r}: format specs and conversions aren't supported")
+        if field is not None and not field.isidentifier():
+            raise ValueError(f"Message {key!r}: field {field!r} must be a plain name")
+        parts.append((literal, field))
+    return tuple(parts)
+
+
+def _fields(template: _Template) -> set[str]:
+    return {field for _, field in template if field is not None}
+
+
+def compile_catalogs(catalogs: dict[str, dict[str, str]]) -> dict[str, dict[str, _Template]]:
+    english = {key: _compile(key, template) for key, template in catalogs[DEFAULT_LANGUAGE].items()}
+    compiled = {DEFAULT_LANGUAGE: english}
+    for language, messages in catalogs.items():
+        if language == DEFAULT_LANGUAGE:
+            continue
+        unknown = set(messages) - set(english)
+        if unknown:
+            raise ValueError(f"Catalog {language!r} has messages English doesn't: {sorted(unknown)}")
+
+        table = dict(english)
+        for key, template in messages.items():
+            table[key] = _compile(key, template)
+            extra = _fields(table[key]) - _fields(english[key])
+            if extra:
+                raise ValueError(f"Message {key!r} in {language!r} uses unknown fields {sorted(extra)}")
+        missing = set(english) - set(messages)
+        if missing:
+            logger.warning(f"Catalog {language!r} falls back to English for: {sorted(missing)}")
+        compiled[language] = table
+    return compiled
+
+
+_COMPILED = compile_catalogs(CATALOGS)
+
+
+def _catalog(language: Optional[str]) -> dict[str, _Template]:
+    code = (language or DEFAULT_LANGUAGE).lower().replace("_", "-").split("-")[0]
+    return _COMPILED.get(code, _COMPILED[DEFAULT_LANGUAGE])
+
+
+def _render_value(value: Any, catalog: dict[str, _Template], language: Optional[str]) -> str:
+    if isinstance(value, ToolMessage):
+        return _render(value, catalog, language)
+    if isinstance(value, Digits):
+        return spell_digits(value, language)
+    if isinstance(value, Lines):
+        return "\n".join(_render_value(item, catalog, language) for item in value)
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_render_value(item, catalog, language) for item in value)
+    return str(value)
+
+
+def _render(tool_message: ToolMessage, catalog: dict[str, _Template], language: Optional[str]) -> str:
+    params = tool_message.params
+    return "".join(
+        literal + (_render_value(params[field], catalog, language) if field is not None else "")
+        for literal, field in catalog[tool_message.key]
+    )
+
+
+def render(result: Union[ToolMessage, str], language: Optional[str]) -> str:
+    """A tool result as text in `language` (a call's language code)."""
+    if isinstance(result, str):
+        return result
+    return _render(result, _catalog(language), language)
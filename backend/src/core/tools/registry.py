@@ -0,0 +1,229 @@
+"""
+Registry of the tools the voice agent can call.
+
+Tool definitions sent to the LLM and the validation done by the webhook are
+both derived from the ``*ToolCallParameters`` models, so the schema the model
+is given can't drift from what the server accepts. The registry is built once
+at import time and shared by every language config.
+"""
+import types
+import typing
+from dataclasses import dataclass
+from functools import cache
+from typing import Any, Mapping
+
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+from entrypoints.api.tool_parameters import (
+    CheckBalanceToolCallParameters,
+    CloseAccountToolCallParameters,
+    ConfirmTransferOTPToolCallParameters,
+    FreezeAccountToolCallParameters,
+    GetHistoryToolCallParameters,
+    ListAccountsToolCallParameters,
+    ListBillsToolCallParameters,
+    OpenAccountToolCallParameters,
+    PayAllBillsToolCallParameters,
+    PayBillToolCallParameters,
+    TransferMoneyOwnAccountsToolCallParameters,
+    TransferMoneyToUserToolCallParameters,
+    UnfreezeAccountToolCallParameters,
+)
+from infrastructure.models import ToolType
+
+
+_JSON_TYPES = {str: "string", float: "number", int: "integer", bool: "boolean", list: "array"}
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    tool_type: ToolType
+    description: str
+    parameters: type[BaseModel]
+    # Offered to the LLM; tools that aren't are still accepted by the webhook
+    advertised: bool = True
+
+    @property
+    def name(self) -> str:
+        return self.tool_type.value
+
+
+def _field_schema(field: FieldInfo) -> dict:
+    annotation = field.annotation
+    nullable = False
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        nullable = len(args) < len(typing.get_args(annotation))
+        (annotation,) = args
+
+    items = None
+    if typing.get_origin(annotation) is list:
+        (item_annotation,) = typing.get_args(annotation)
+        items = {"type": _JSON_TYPES.get(item_annotation)}
+        annotation = list
+
+    json_type = _JSON_TYPES.get(annotation)
+    if json_type is None or (items and items["type"] is None):
+        raise TypeError(f"No JSON schema type for tool parameter annotation {field.annotation!r}")
+
+    schema: dict[str, Any] = {"type": [json_type, "null"] if nullable else json_type}
+    if items:
+        schema["items"] = items
+    if isinstance(field.json_schema_extra, dict):
+        schema.update(field.json_schema_extra)
+    if field.description:
+        schema["description"] = field.description
+    return schema
+
+
+def _parameters_schema(model: type[BaseModel]) -> dict:
+    """
+    Strict-mode JSON schema for a parameters model.
+
+    Strict function calling requires every property to be listed as required,
+    so optional fields are expressed as nullable instead.
+    """
+    properties = {
+        field.alias or name: _field_schema(field) for name, field in model.model_fields.items()
+    }
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def _definition(spec: ToolSpec) -> dict:
+    return {
+        "type": "function",
+        "function": {
+            "name": spec.name,
+            "strict": True,
+            "description": spec.description,
+            "parameters": _parameters_schema(spec.parameters),
+        },
+    }
+
+
+_SPECS = (
+    # OTP-based transfer tools (secure flow)
+    ToolSpec(
+        ToolType.REQUEST_TRANSFER_OWN_ACCOUNTS,
+        "Request a transfer between the user's own accounts. This will generate an OTP that the user must provide to confirm the transaction.",
+        TransferMoneyOwnAccountsToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.REQUEST_TRANSFER_TO_USER,
+        "Request a transfer to another user by their phone number. This will generate an OTP that the user must provide to confirm the transaction.",
+        TransferMoneyToUserToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.CONFIRM_TRANSFER_OTP,
+        "Confirm a pending transfer transaction using the OTP code provided by the user",
+        ConfirmTransferOTPToolCallParameters,
+    ),
+    # Other banking tools
+    ToolSpec(
+        ToolType.PAY_BILL,
+        "Pay an outstanding bill (electricity, water, gas, internet, phone, parking, etc.)",
+        PayBillToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.PAY_ALL_BILLS,
+        "Pay all of the user's outstanding bills, or only the given types, from one account in a single payment",
+        PayAllBillsToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.LIST_BILLS,
+        "Summarize the user's outstanding bills by type and list the ones due soonest, a page at a time",
+        ListBillsToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.CHECK_BALANCE,
+        "Get the current balance of one of the user's accounts, or of all of them",
+        CheckBalanceToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.LIST_ACCOUNTS,
+        "Summarize the user's bank accounts and list the ones with the largest balances, with their titles, "
+        "account numbers, balances, and status, a page at a time",
+        ListAccountsToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.GET_HISTORY,
+        "Get the user's recent transactions, newest first, for one account or all of them, optionally within a date range",
+        GetHistoryToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.OPEN_ACCOUNT,
+        "Open a new bank account with a specified name/label",
+        OpenAccountToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.CLOSE_ACCOUNT,
+        "Close an existing bank account. If the account has a balance, specify where to transfer the remaining funds.",
+        CloseAccountToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.FREEZE_ACCOUNT,
+        "Freeze/suspend a bank account to prevent any transactions",
+        FreezeAccountToolCallParameters,
+    ),
+    ToolSpec(
+        ToolType.UNFREEZE_ACCOUNT,
+        "Unfreeze/reactivate a previously frozen bank account",
+        UnfreezeAccountToolCallParameters,
+    ),
+    # Direct transfers without an OTP, superseded by the request/confirm flow
+    ToolSpec(
+        ToolType.TRANSFER_MONEY_OWN_ACCOUNTS,
+        "Transfer money between the user's own accounts by account name/label",
+        TransferMoneyOwnAccountsToolCallParameters,
+        advertised=False,
+    ),
+    ToolSpec(
+        ToolType.TRANSFER_MONEY_TO_USER,
+        "Transfer money to another user by their name or phone number",
+        TransferMoneyToUserToolCallParameters,
+        advertised=False,
+    ),
+)
+
+TOOL_REGISTRY: Mapping[ToolType, ToolSpec] = types.MappingProxyType(
+    {spec.tool_type: spec for spec in _SPECS}
+)
+
+_DEFINITIONS: Mapping[ToolType, dict] = types.MappingProxyType(
+    {spec.tool_type: _definition(spec) for spec in _SPECS}
+)
+
+
+def tool_definition(tool_type: ToolType) -> dict:
+    """The LLM tool definition for a tool. Shared, don't mutate it."""
+    return _DEFINITIONS[tool_type]
+
+
+@cache
+def banking_tool_definitions() -> tuple[dict, ...]:
+    """Definitions of every advertised tool, in registry order."""
+    return tuple(_DEFINITIONS[spec.tool_type] for spec in _SPECS if spec.advertised)
+
+
+def parse_tool_arguments(tool_type: ToolType, arguments: dict | str) -> BaseModel:
+    """
+    Validate the arguments of a tool call against its parameters model.
+
+    Args:
+        tool_type: The tool that was called
+        arguments: Arguments as sent by the provider, either decoded or as a JSON string
+
+    Raises:
+        KeyError: The tool isn't in the registry
+        pydantic.ValidationError: The arguments don't match the schema
+    """
+    parameters = TOOL_REGISTRY[tool_type].parameters
+    if isinstance(arguments, str):
+        return parameters.model_validate_json(arguments or "{}")
+    return parameters.model_validate(arguments)
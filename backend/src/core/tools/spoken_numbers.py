@@ -0,0 +1,211 @@
+"""
+Numbers and amounts written out for text-to-speech, in the call's language.
+
+Tool results are read aloud, so digits are turned into words before they
+reach the voice provider. Digits and numbers below 100 come from per-language
+tables built on first use; larger numbers and whole amounts are memoized,
+since a listing repeats the same few values (and the same balances from one
+call to the next). Malay and Mandarin, which num2words doesn't cover, are
+converted natively; other languages go through num2words, and languages it
+doesn't know fall back to English.
+"""
+import re
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+from typing import Callable, Iterable
+
+# Codes as in core.calls.build_payload.SupportedLanguage
+DEFAULT_LANGUAGE = "en"
+
+# Digit groups joined by "-" or "/" (card and phone numbers, references) or
+# by more than one ".", runs with a leading zero and runs too long for an
+# amount are identifiers, read digit by digit; anything else is a number,
+# possibly with a fraction. Digits inside a word, like "v1", are left alone
+_NUMBER = re.compile(
+    r"(?<![\w.])"
+    r"(?:(?P<identifier>\d+(?:[-/]\d+)+|\d+(?:\.\d+){2,}|0\d+|\d{10,})|(?P<whole>\d+)(?:\.(?P<fraction>\d+))?)"
+    r"(?![\w]|\.\d)"
+)
+_CENT = Decimal("0.01")
+
+_MALAY_DIGITS = ("kosong", "satu", "dua", "tiga", "empat", "lima", "enam", "tujuh", "lapan", "sembilan")
+_MANDARIN_DIGITS = "零一二三四五六七八九"
+
+# Words around an amount: currency, minor unit, "and", decimal point, minus
+_AMOUNT_WORDS = {
+    "en": ("ringgit", "sen", "and", "point", "minus"),
+    "ms": ("ringgit", "sen", "dan", "perpuluhan", "negatif"),
+    "id": ("ringgit", "sen", "dan", "koma", "minus"),
+    "zh": ("令吉", "仙", "", "点", "负"),
+    "fr": ("ringgit", "sen", "et", "virgule", "moins"),
+    "es": ("ringgit", "sen", "y", "coma", "menos"),
+    "de": ("Ringgit", "Sen", "und", "Komma", "minus"),
+    "pt": ("ringgit", "sen", "e", "vírgula", "menos"),
+    "ar": ("رينغيت", "سين", "و", "فاصلة", "سالب"),
+    "th": ("ริงกิต", "เซน", "และ", "จุด", "ลบ"),
+}
+# Languages written without spaces between words
+_UNSPACED = frozenset({"zh", "th"})
+
+
+def _malay(number: int) -> str:
+    if number < 10:
+        return _MALAY_DIGITS[number]
+    if number == 10:
+        return "sepuluh"
+    if number == 11:
+        return "sebelas"
+    if number < 20:
+        return f"{_MALAY_DIGITS[number - 10]} belas"
+    if number < 100:
+        tens, units = divmod(number, 10)
+        return f"{_MALAY_DIGITS[tens]} puluh" + (f" {_MALAY_DIGITS[units]}" if units else "")
+    for scale, name in ((10**9, "bilion"), (10**6, "juta"), (1000, "ribu"), (100, "ratus")):
+        if number >= scale:
+            count, rest = divmod(number, scale)
+            # "seratus", "seribu", but "satu juta"
+            head = f"se{name}" if count == 1 and scale <= 1000 else f"{_malay(count)} {name}"
+            return head + (f" {_malay(rest)}" if rest else "")
+    raise AssertionError(number)
+
+
+def _mandarin_section(number: int) -> str:
+    """0 < number < 10000"""
+    text, zero = "", False
+    for value, unit in ((1000, "千"), (100, "百"), (10, "十"), (1, "")):
+        digit, number = divmod(number, value)
+        if digit:
+            if zero:
+                text += "零"
+                zero = False
+            text += _MANDARIN_DIGITS[digit] + unit
+        elif text:
+            zero = True
+    return text
+
+
+def _mandarin(number: int) -> str:
+    if number == 0:
+        return "零"
+    sections = []
+    while number:
+        number, section = divmod(number, 10000)
+        sections.append(section)
+    text, skipped = "", False
+    for position in range(len(sections) - 1, -1, -1):
+        section = sections[position]
+        if not section:
+            skipped = bool(text)
+            continue
+        if text and (skipped or section < 1000):
+            text += "零"
+        text += _mandarin_section(section) + ("", "万", "亿", "万亿")[position]
+        skipped = False
+    # 10-19 are read 十, 十一, ... rather than 一十, 一十一
+    return text[1:] if text.startswith("一十") else text
+
+
+def _num2words_converter(language: str) -> Callable[[int], str]:
+    # num2words loads every locale on import, so defer it until a number is spoken
+    from num2words import num2words
+
+    return lambda number: num2words(number, lang=language)
+
+
+@lru_cache(maxsize=None)
+def _converter(language: str) -> Callable[[int], str]:
+    if language == "ms":
+        return _malay
+    if language == "zh":
+        return _mandarin
+    from num2words import CONVERTER_CLASSES
+
+    return _num2words_converter(language if language in CONVERTER_CLASSES else DEFAULT_LANGUAGE)
+
+
+@lru_cache(maxsize=None)
+def _small_numbers(language: str) -> tuple[str, ...]:
+    """Words for 0-99; the first ten double as the digit table."""
+    convert = _converter(language)
+    return tuple(convert(number) for number in range(100))
+
+
+def spoken_language(language: str) -> str:
+    """The language numbers are spoken in for a call's language code, e.g. "ms" or "en-US"."""
+    code = (language or DEFAULT_LANGUAGE).lower().replace("_", "-").split("-")[0]
+    return code if code in _AMOUNT_WORDS else DEFAULT_LANGUAGE
+
+
+@lru_cache(maxsize=4096)
+def _large_number_to_words(number: int, language: str) -> str:
+    return _converter(language)(number)
+
+
+def number_to_words(number: int, language: str = DEFAULT_LANGUAGE) -> str:
+    language = spoken_language(language)
+    if number < 0:
+        return f"{_AMOUNT_WORDS[language][4]} {number_to_words(-number, language)}"
+    if number < 100:
+        return _small_numbers(language)[number]
+    return _large_number_to_words(number, language)
+
+
+def spell_digits(text: str, language: str = DEFAULT_LANGUAGE) -> str:
+    """Digits read one by one, as for account numbers; other characters are kept."""
+    digits = _small_numbers(spoken_language(language))
+    separator = "" if spoken_language(language) in _UNSPACED else " "
+    return separator.join(digits[int(char)] if char.isdigit() else char for char in text)
+
+
+@lru_cache(maxsize=4096)
+def _amount_to_words(amount: Decimal, language: str) -> str:
+    currency, cents_name, conjunction, _, minus = _AMOUNT_WORDS[language]
+    if amount < 0:
+        return f"{minus} {_amount_to_words(-amount, language)}"
+    ringgit, sen = divmod(int(amount.quantize(_CENT, rounding=ROUND_HALF_UP) * 100), 100)
+    if language in _UNSPACED:
+        text = f"{number_to_words(ringgit, language)}{currency}"
+        return text + (f"{number_to_words(sen, language)}{cents_name}" if sen else "")
+    text = f"{number_to_words(ringgit, language)} {currency}"
+    return text + (f" {conjunction} {number_to_words(sen, language)} {cents_name}" if sen else "")
+
+
+def amount_to_words(amount, language: str = DEFAULT_LANGUAGE) -> str:
+    """A ringgit amount, e.g. "twelve ringgit and fifty sen"."""
+    return _amount_to_words(Decimal(str(amount)), spoken_language(language))
+
+
+def amounts_to_words(amounts: Iterable, language: str = DEFAULT_LANGUAGE) -> list[str]:
+    """amount_to_words over a list, rendering each distinct amount once."""
+    language = spoken_language(language)
+    rendered: dict[Decimal, str] = {}
+    words = []
+    for amount in amounts:
+        amount = Decimal(str(amount))
+        if amount not in rendered:
+            rendered[amount] = _amount_to_words(amount, language)
+        words.append(rendered[amount])
+    return words
+
+
+def numbers_to_words(text: str, language: str = DEFAULT_LANGUAGE) -> str:
+    """
+    Every number in free text written out; decimals are read digit by digit after the point.
+
+    Identifiers such as "1234-5678" are spelled digit by digit, but pass
+    account numbers and references through spell_digits rather than relying
+    on them being told apart here.
+    """
+    language = spoken_language(language)
+    point = _AMOUNT_WORDS[language][3]
+    separator = "" if language in _UNSPACED else " "
+
+    def replace(match: re.Match) -> str:
+        if match["identifier"]:
+            return spell_digits(match["identifier"], language)
+        words = number_to_words(int(match["whole"]), language)
+        if match["fraction"]:
+            words = separator.join((words, point, spell_digits(match["fraction"], language)))
+        return words
+
+    return _NUMBER.sub(replace, text)
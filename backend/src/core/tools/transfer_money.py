@@ -1,23 +1,22 @@
-from datetime import datetime
 from decimal import Decimal
 
-from entrypoints.api.serializers import (
+from core.tools.account_lookup import find_account
+from core.tools.messages import Digits, ToolMessage, enum_label, message
+from entrypoints.api.tool_parameters import (
     TransferMoneyOwnAccountsToolCallParameters,
     TransferMoneyToUserToolCallParameters,
     ConfirmTransferOTPToolCallParameters,
 )
 from infrastructure.models import AccountStatus, TransactionStatus, TransactionType
+from infrastructure.references import transaction_references
 from infrastructure.repositories import (
+    InsufficientFunds,
+    confirm_transfer,
     create_otp,
     create_transaction,
-    get_account_by_title_and_user,
     get_default_account_for_user,
-    get_transaction_by_id,
     get_user_by_phone_number,
     transfer_money_between_accounts,
-    update_account_balance,
-    update_transaction_status,
-    verify_and_use_otp,
 )
 
 
@@ -25,89 +24,94 @@ async def transfer_money_between_own_accounts(
     call_id: int,
     user_id: str,
     tool_parameters: TransferMoneyOwnAccountsToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Transfer money between own accounts"""
-    from_account = await get_account_by_title_and_user(
-        tool_parameters.from_account_title, user_id
-    )
-    to_account = await get_account_by_title_and_user(
-        tool_parameters.to_account_title, user_id
-    )
+    from_account, problem = await find_account(user_id, tool_parameters.from_account_title)
+    if problem:
+        return problem
 
-    if not from_account:
-        return f"Account '{tool_parameters.from_account_title}' not found"
-
-    if not to_account:
-        return f"Account '{tool_parameters.to_account_title}' not found"
+    to_account, problem = await find_account(user_id, tool_parameters.to_account_title)
+    if problem:
+        return problem
 
     if from_account.status != AccountStatus.ACTIVE:
-        return f"Account '{tool_parameters.from_account_title}' is not active"
+        return message("account.not_active", title=from_account.title)
 
     if to_account.status != AccountStatus.ACTIVE:
-        return f"Account '{tool_parameters.to_account_title}' is not active"
+        return message("account.not_active", title=to_account.title)
 
     amount = Decimal(str(tool_parameters.amount))
     if from_account.balance < amount:
-        return f"Insufficient balance. Available: {from_account.balance}"
-
-    transaction = await transfer_money_between_accounts(
-        from_account.id,
-        to_account.id,
-        amount,
-        call_id=call_id,
-    )
+        return message("balance.insufficient", available=from_account.balance)
+
+    try:
+        transaction = await transfer_money_between_accounts(
+            from_account.id,
+            to_account.id,
+            amount,
+            call_id=call_id,
+        )
+    except InsufficientFunds as e:
+        return message("balance.insufficient", available=e.available)
 
     if not transaction:
-        return "Failed to transfer money"
+        return message("transfer.failed")
 
-    return f"Successfully transferred {tool_parameters.amount} from {tool_parameters.from_account_title} to {tool_parameters.to_account_title}"
+    return message(
+        "transfer.completed",
+        amount=tool_parameters.amount,
+        from_title=from_account.title,
+        to_title=to_account.title,
+    )
 
 
 async def transfer_money_to_user(
     call_id: int,
     user_id: str,
     tool_parameters: TransferMoneyToUserToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Transfer money to another user by name or phone number"""
-    from_account = await get_account_by_title_and_user(
-        tool_parameters.from_account_title, user_id
-    )
-
-    if not from_account:
-        return f"Account '{tool_parameters.from_account_title}' not found"
+    from_account, problem = await find_account(user_id, tool_parameters.from_account_title)
+    if problem:
+        return problem
 
     if from_account.status != AccountStatus.ACTIVE:
-        return f"Account '{tool_parameters.from_account_title}' is not active"
+        return message("account.not_active", title=from_account.title)
 
     amount = Decimal(str(tool_parameters.amount))
     if from_account.balance < amount:
-        return f"Insufficient balance. Available: {from_account.balance}"
+        return message("balance.insufficient", available=from_account.balance)
 
     # Try to find recipient by phone number
     recipient_identifier = tool_parameters.recipient_identifier
     recipient_user_id = await get_user_by_phone_number(recipient_identifier)
 
     if not recipient_user_id:
-        return f"Recipient '{recipient_identifier}' not found"
+        return message("recipient.not_found", recipient=Digits(recipient_identifier))
 
     # Get recipient's default account
     recipient_account = await get_default_account_for_user(recipient_user_id)
 
     if not recipient_account:
-        return f"Recipient '{recipient_identifier}' has no active account"
-
-    transaction = await transfer_money_between_accounts(
-        from_account.id,
-        recipient_account.id,
-        amount,
-        call_id=call_id,
-    )
+        return message("recipient.no_active_account", recipient=Digits(recipient_identifier))
+
+    try:
+        transaction = await transfer_money_between_accounts(
+            from_account.id,
+            recipient_account.id,
+            amount,
+            call_id=call_id,
+        )
+    except InsufficientFunds as e:
+        return message("balance.insufficient", available=e.available)
 
     if not transaction:
-        return "Failed to transfer money"
+        return message("transfer.failed")
 
-    return (
-        f"Successfully transferred {tool_parameters.amount} to {recipient_identifier}"
+    return message(
+        "transfer.completed_to_user",
+        amount=tool_parameters.amount,
+        recipient=Digits(recipient_identifier),
     )
 
 
@@ -115,53 +119,49 @@ async def request_transfer_own_accounts(
     call_id: int,
     user_id: str,
     tool_parameters: TransferMoneyOwnAccountsToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Request a transfer between own accounts - creates pending transaction and OTP"""
-    from_account = await get_account_by_title_and_user(
-        tool_parameters.from_account_title, user_id
-    )
-    to_account = await get_account_by_title_and_user(
-        tool_parameters.to_account_title, user_id
-    )
-
-    if not from_account:
-        return f"Account '{tool_parameters.from_account_title}' not found"
+    from_account, problem = await find_account(user_id, tool_parameters.from_account_title)
+    if problem:
+        return problem
 
-    if not to_account:
-        return f"Account '{tool_parameters.to_account_title}' not found"
+    to_account, problem = await find_account(user_id, tool_parameters.to_account_title)
+    if problem:
+        return problem
 
     if from_account.status != AccountStatus.ACTIVE:
-        return f"Account '{tool_parameters.from_account_title}' is not active"
+        return message("account.not_active", title=from_account.title)
 
     if to_account.status != AccountStatus.ACTIVE:
-        return f"Account '{tool_parameters.to_account_title}' is not active"
+        return message("account.not_active", title=to_account.title)
 
     amount = Decimal(str(tool_parameters.amount))
     if from_account.balance < amount:
-        return f"Insufficient balance. Available: {from_account.balance}"
+        return message("balance.insufficient", available=from_account.balance)
 
     # Create pending transaction
-    reference = f"TRANSFER-{from_account.account_number}-{to_account.account_number}-{amount}-{datetime.utcnow().timestamp()}"
     transaction = await create_transaction(
-        reference=reference,
+        reference=await transaction_references.next_reference(),
         amount=amount,
         transaction_type=TransactionType.TRANSFER,
         from_account_id=from_account.id,
         to_account_id=to_account.id,
-        description=f"Pending transfer from {tool_parameters.from_account_title} to {tool_parameters.to_account_title}",
+        description=f"Pending transfer from {from_account.title} to {to_account.title}",
         call_id=call_id,
     )
 
     if not transaction:
-        return "Failed to create transfer request"
+        return message("transfer.request_failed")
 
     # Create OTP for this transaction
     otp = await create_otp(user_id=user_id, transaction_id=transaction.id)
 
-    return (
-        f"Transaction ready: Transfer {tool_parameters.amount} from {tool_parameters.from_account_title} "
-        f"to {tool_parameters.to_account_title}. An OTP has been generated. "
-        f"Your OTP is {otp.token}. Please provide this OTP to confirm the transaction."
+    return message(
+        "transfer.otp_issued",
+        amount=tool_parameters.amount,
+        from_title=from_account.title,
+        to_title=to_account.title,
+        otp=Digits(otp.token),
     )
 
 
@@ -169,39 +169,35 @@ async def request_transfer_to_user(
     call_id: int,
     user_id: str,
     tool_parameters: TransferMoneyToUserToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Request a transfer to another user - creates pending transaction and OTP"""
-    from_account = await get_account_by_title_and_user(
-        tool_parameters.from_account_title, user_id
-    )
-
-    if not from_account:
-        return f"Account '{tool_parameters.from_account_title}' not found"
+    from_account, problem = await find_account(user_id, tool_parameters.from_account_title)
+    if problem:
+        return problem
 
     if from_account.status != AccountStatus.ACTIVE:
-        return f"Account '{tool_parameters.from_account_title}' is not active"
+        return message("account.not_active", title=from_account.title)
 
     amount = Decimal(str(tool_parameters.amount))
     if from_account.balance < amount:
-        return f"Insufficient balance. Available: {from_account.balance}"
+        return message("balance.insufficient", available=from_account.balance)
 
     # Try to find recipient by phone number
     recipient_identifier = tool_parameters.recipient_identifier
     recipient_user_id = await get_user_by_phone_number(recipient_identifier)
 
     if not recipient_user_id:
-        return f"Recipient '{recipient_identifier}' not found"
+        return message("recipient.not_found", recipient=Digits(recipient_identifier))
 
     # Get recipient's default account
     recipient_account = await get_default_account_for_user(recipient_user_id)
 
     if not recipient_account:
-        return f"Recipient '{recipient_identifier}' has no active account"
+        return message("recipient.no_active_account", recipient=Digits(recipient_identifier))
 
     # Create pending transaction
-    reference = f"TRANSFER-{from_account.account_number}-{recipient_account.account_number}-{amount}-{datetime.utcnow().timestamp()}"
     transaction = await create_transaction(
-        reference=reference,
+        reference=await transaction_references.next_reference(),
         amount=amount,
         transaction_type=TransactionType.TRANSFER,
         from_account_id=from_account.id,
@@ -211,15 +207,16 @@ async def request_transfer_to_user(
     )
 
     if not transaction:
-        return "Failed to create transfer request"
+        return message("transfer.request_failed")
 
     # Create OTP for this transaction
     otp = await create_otp(user_id=user_id, transaction_id=transaction.id)
 
-    return (
-        f"Transaction ready: Transfer {tool_parameters.amount} to {recipient_identifier}. "
-        f"An OTP has been generated. Your OTP is {otp.token}. "
-        f"Please provide this OTP to confirm the transaction."
+    return message(
+        "transfer.otp_issued_to_user",
+        amount=tool_parameters.amount,
+        recipient=Digits(recipient_identifier),
+        otp=Digits(otp.token),
     )
 
 
@@ -227,52 +224,35 @@ async def confirm_transfer_otp(
     call_id: int,
     user_id: str,
     tool_parameters: ConfirmTransferOTPToolCallParameters,
-) -> str:
+) -> ToolMessage:
     """Confirm a pending transfer using OTP"""
-    otp_token = tool_parameters.otp_token
-    
-    # Verify and use the OTP
-    otp = await verify_and_use_otp(user_id=user_id, token=otp_token)
-    
-    if not otp:
-        return "Invalid or expired OTP. Please request a new transfer."
-    
-    if not otp.transaction_id:
-        return "No pending transaction found for this OTP."
-    
-    # Get the pending transaction
-    transaction = await get_transaction_by_id(otp.transaction_id)
-    
-    if not transaction:
-        return "Transaction not found."
-    
-    if transaction.status != TransactionStatus.PENDING:
-        return f"Transaction is no longer pending. Current status: {transaction.status.value}"
-    
-    # Execute the transfer - update balances
-    from_account = transaction.from_account
-    to_account = transaction.to_account
-    
-    if not from_account or not to_account:
-        await update_transaction_status(transaction.id, TransactionStatus.FAILED)
-        return "Transaction accounts not found."
-    
-    # Re-check balance
-    if from_account.balance < transaction.amount:
-        await update_transaction_status(transaction.id, TransactionStatus.FAILED)
-        return f"Insufficient balance. Available: {from_account.balance}"
-    
-    # Update balances
-    new_from_balance = from_account.balance - transaction.amount
-    new_to_balance = to_account.balance + transaction.amount
-    
-    await update_account_balance(from_account.id, new_from_balance)
-    await update_account_balance(to_account.id, new_to_balance)
-    
-    # Mark transaction as completed
-    await update_transaction_status(transaction.id, TransactionStatus.COMPLETED)
-    
-    return (
-        f"Transaction confirmed! Successfully transferred {transaction.amount} "
-        f"from {from_account.title} to {to_account.title}."
+    # Consumes the OTP and settles its transaction in one statement
+    confirmation = await confirm_transfer(user_id=user_id, token=tool_parameters.otp_token)
+
+    if confirmation is None:
+        return message("transfer.retry")
+
+    if not confirmation.otp_found:
+        return message("otp.invalid")
+
+    if not confirmation.transaction_id:
+        return message("otp.no_transaction")
+
+    if confirmation.previous_status != TransactionStatus.PENDING:
+        return message("transfer.not_pending", status=enum_label(confirmation.previous_status))
+
+    if not confirmation.from_account_title or not confirmation.to_account_title:
+        return message("transfer.accounts_missing")
+
+    if confirmation.from_account_id == confirmation.to_account_id:
+        return message("transfer.same_account")
+
+    if not confirmation.completed:
+        return message("balance.insufficient", available=confirmation.available)
+
+    return message(
+        "transfer.confirmed",
+        amount=confirmation.amount,
+        from_title=confirmation.from_account_title,
+        to_title=confirmation.to_account_title,
     )
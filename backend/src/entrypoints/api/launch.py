@@ -0,0 +1,27 @@
+"""
+Production launcher for the API.
+
+Unlike running server.py directly there is no reloader process watching the
+source tree, and the app is imported once per worker from precompiled
+bytecode (see the Dockerfile).
+
+    python -m entrypoints.api.launch
+"""
+import uvicorn
+
+from settings import settings
+
+
+def main():
+    uvicorn.run(
+        "entrypoints.api.server:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=settings.API_WORKERS,
+        reload=False,
+        log_level="debug" if settings.DEBUG else "info",
+    )
+
+
+if __name__ == "__main__":
+    main()
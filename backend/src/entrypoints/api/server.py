@@ -2,19 +2,26 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
 from loguru import logger
+from pydantic import ValidationError
 from starlette.requests import Request
 
 from core.tools.account_management import close_account_tool
 from core.tools import (
     list_outstanding_bills,
     pay_outstanding_bill,
+    pay_all_outstanding_bills,
     open_account,
     freeze_account,
     unfreeze_account,
     list_accounts,
+    check_balance,
+    get_history,
 )
+from core.tools.messages import ToolMessage, message, render
+from core.tools.registry import TOOL_REGISTRY, parse_tool_arguments
+from infrastructure.db import engine, warm_up_pool
 from infrastructure.models import ToolType
-from infrastructure.repositories import get_call_by_phone_number
+from infrastructure.repositories import get_call_by_phone_number, get_call_by_sid
 from core.tools.transfer_money import (
     transfer_money_between_own_accounts,
     transfer_money_to_user,
@@ -27,14 +34,6 @@ from entrypoints.api.serializers import (
     ToolCallsMessage,
     ToolCallResult,
     ToolCallsResponse,
-    TransferMoneyOwnAccountsToolCallParameters,
-    TransferMoneyToUserToolCallParameters,
-    ConfirmTransferOTPToolCallParameters,
-    PayBillToolCallParameters,
-    OpenAccountToolCallParameters,
-    CloseAccountToolCallParameters,
-    FreezeAccountToolCallParameters,
-    UnfreezeAccountToolCallParameters,
 )
 from settings import settings
 
@@ -43,8 +42,15 @@ from settings import settings
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     logger.info("🚀 Starting application...")
+    # Uvicorn only accepts connections once startup finishes, so warm up first
+    try:
+        opened = await warm_up_pool(settings.DB_WARMUP_CONNECTIONS)
+        logger.info(f"Opened {opened} database connection(s)")
+    except Exception as e:
+        logger.opt(exception=e).warning("Database warm-up failed, connecting lazily")
     yield
     logger.info("👋 Shutting down application...")
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -81,106 +87,138 @@ async def webhook_handler(
     tool_calls_msg: ToolCallsMessage = payload.message
     print(tool_calls_msg.model_dump())
 
-    phone_number = payload.message.call.customer.number
-    call = await get_call_by_phone_number(phone_number.replace("+", ""))
+    call = None
+    if payload.message.call.id:
+        call = await get_call_by_sid(payload.message.call.id)
+    if not call:
+        phone_number = payload.message.call.customer.number
+        call = await get_call_by_phone_number(phone_number)
 
-    tool_name = ToolType(tool_calls_msg.tool_calls[0].function.name)
+    tool_call = tool_calls_msg.tool_calls[0]
+    try:
+        tool_name = ToolType(tool_call.function.name)
+    except ValueError:
+        tool_name = None
+
+    language = call.language if call else None
+    if tool_name not in TOOL_REGISTRY:
+        return _tool_result(tool_call.id, message("tool.unsupported"), language)
+
+    try:
+        tool_parameters = parse_tool_arguments(tool_name, tool_call.function.arguments)
+    except ValidationError as e:
+        # Tell the model exactly what to fix instead of failing the request
+        problems = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'arguments'}: {error['msg']}"
+            for error in e.errors()
+        )
+        return _tool_result(
+            tool_call.id,
+            message("tool.invalid_arguments", tool=tool_name.value, problems=problems),
+            language,
+        )
 
     result = None
     if tool_name == ToolType.TRANSFER_MONEY_OWN_ACCOUNTS:
         result = await transfer_money_between_own_accounts(
             call_id=call.id,
             user_id=call.user_id,
-            tool_parameters=TransferMoneyOwnAccountsToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments
-            ),
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.TRANSFER_MONEY_TO_USER:
         result = await transfer_money_to_user(
             call_id=call.id,
             user_id=call.user_id,
-            tool_parameters=TransferMoneyToUserToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments
-            ),
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.LIST_BILLS:
         result = await list_outstanding_bills(
             user_id=call.user_id,
+            tool_parameters=tool_parameters,
+            language=call.language,
         )
     elif tool_name == ToolType.LIST_ACCOUNTS:
         result = await list_accounts(
             user_id=call.user_id,
+            tool_parameters=tool_parameters,
+            language=call.language,
+        )
+    elif tool_name == ToolType.CHECK_BALANCE:
+        result = await check_balance(
+            user_id=call.user_id,
+            tool_parameters=tool_parameters,
+            language=call.language,
+        )
+    elif tool_name == ToolType.GET_HISTORY:
+        result = await get_history(
+            user_id=call.user_id,
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.PAY_BILL:
         result = await pay_outstanding_bill(
             call_id=call.id,
             user_id=call.user_id,
-            tool_parameters=PayBillToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments
-            ),
+            tool_parameters=tool_parameters,
+        )
+    elif tool_name == ToolType.PAY_ALL_BILLS:
+        result = await pay_all_outstanding_bills(
+            call_id=call.id,
+            user_id=call.user_id,
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.OPEN_ACCOUNT:
         result = await open_account(
             user_id=call.user_id,
-            tool_parameters=OpenAccountToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments,
-            ),
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.CLOSE_ACCOUNT:
         result = await close_account_tool(
             call_id=call.id,
             user_id=call.user_id,
-            tool_parameters=CloseAccountToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments,
-            ),
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.FREEZE_ACCOUNT:
         result = await freeze_account(
             call_id=call.id,
             user_id=call.user_id,
-            tool_parameters=FreezeAccountToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments,
-            ),
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.UNFREEZE_ACCOUNT:
         result = await unfreeze_account(
             user_id=call.user_id,
-            tool_parameters=UnfreezeAccountToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments,
-            ),
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.REQUEST_TRANSFER_OWN_ACCOUNTS:
         result = await request_transfer_own_accounts(
             call_id=call.id,
             user_id=call.user_id,
-            tool_parameters=TransferMoneyOwnAccountsToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments
-            ),
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.REQUEST_TRANSFER_TO_USER:
         result = await request_transfer_to_user(
             call_id=call.id,
             user_id=call.user_id,
-            tool_parameters=TransferMoneyToUserToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments
-            ),
+            tool_parameters=tool_parameters,
         )
     elif tool_name == ToolType.CONFIRM_TRANSFER_OTP:
         result = await confirm_transfer_otp(
             call_id=call.id,
             user_id=call.user_id,
-            tool_parameters=ConfirmTransferOTPToolCallParameters(
-                **tool_calls_msg.tool_calls[0].function.arguments
-            ),
+            tool_parameters=tool_parameters,
         )
     else:
-        result = "Operation not supported at the moment"
+        result = message("tool.unsupported")
+
+    return _tool_result(tool_call.id, result, language)
+
 
+def _tool_result(tool_call_id: str, result: ToolMessage | str, language: str | None) -> ToolCallsResponse:
     return ToolCallsResponse(
         results=[
             ToolCallResult(
-                tool_call_id=tool_calls_msg.tool_calls[0].id,
-                result=result,
+                tool_call_id=tool_call_id,
+                # Rendered from the catalogs compiled on import, in the call's language
+                result=render(result, language),
             )
         ]
     )
@@ -189,4 +227,5 @@ async def webhook_handler(
 if __name__ == "__main__":
     import uvicorn
 
+    # Development server; production runs entrypoints.api.launch
     uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
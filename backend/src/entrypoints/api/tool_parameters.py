@@ -0,0 +1,177 @@
+"""
+Tool call parameters.
+
+These models are the single source of truth for the tool schemas sent to the
+LLM (see core.tools.registry): aliases are the argument names the model sees
+and field descriptions become the schema descriptions. They're kept apart
+from the webhook payload models in serializers, which the call worker, as it
+builds tool definitions but never parses webhooks, doesn't import.
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from infrastructure.models import BillType
+
+
+class TransferMoneyOwnAccountsToolCallParameters(BaseModel):
+    """Parameters for transfer money between own accounts tool"""
+    amount: float = Field(..., description="How much money to transfer")
+    to_account_title: str = Field(
+        ..., alias="account_name_to", description="The name/label of the account to transfer to"
+    )
+    from_account_title: str = Field(
+        ..., alias="account_name_from", description="The name/label of the account to transfer from"
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class TransferMoneyToUserToolCallParameters(BaseModel):
+    """Parameters for transfer money to another user tool"""
+    amount: float = Field(..., description="How much money to transfer")
+    from_account_title: str = Field(
+        ..., alias="account_name_from", description="The name/label of your account to transfer from"
+    )
+    recipient_identifier: str = Field(
+        ..., alias="recipient_phone_number", description="The phone number of the user to transfer to"
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class PayBillToolCallParameters(BaseModel):
+    """Parameters for pay bill tool"""
+    bill_type: str = Field(
+        ...,
+        alias="bill_type",
+        description="The type of bill to pay",
+        json_schema_extra={"enum": [bill_type.value.lower() for bill_type in BillType]},
+    )
+    from_account_title: str = Field(
+        ..., alias="account_name_from", description="The name/label of the account to pay from"
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class PayAllBillsToolCallParameters(BaseModel):
+    """Parameters for pay all bills tool"""
+    from_account_title: str = Field(
+        ..., alias="account_name_from", description="The name/label of the account to pay from"
+    )
+    bill_types: Optional[List[str]] = Field(
+        None,
+        alias="bill_types",
+        description="Only pay outstanding bills of these types; null pays every outstanding bill",
+        json_schema_extra={
+            "items": {"type": "string", "enum": [bill_type.value.lower() for bill_type in BillType]}
+        },
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ListBillsToolCallParameters(BaseModel):
+    """Parameters for list bills tool"""
+    limit: Optional[int] = Field(
+        None, alias="limit", description="How many bills to read out (default 5, at most 20)"
+    )
+    cursor: Optional[str] = Field(
+        None,
+        alias="cursor",
+        description="The cursor from the previous result to get more bills; null to start from the bills due soonest",
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class CheckBalanceToolCallParameters(BaseModel):
+    """Parameters for check balance tool"""
+    account_title: Optional[str] = Field(
+        None,
+        alias="account_title",
+        description="The name/label of the account; null gives the balance of every account",
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ListAccountsToolCallParameters(BaseModel):
+    """Parameters for list accounts tool"""
+    limit: Optional[int] = Field(
+        None, alias="limit", description="How many accounts to read out (default 5, at most 20)"
+    )
+    cursor: Optional[str] = Field(
+        None,
+        alias="cursor",
+        description="The cursor from the previous result to get more accounts; null to start from the largest balances",
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class OpenAccountToolCallParameters(BaseModel):
+    """Parameters for open account tool"""
+    account_title: str = Field(
+        ...,
+        alias="account_title",
+        description="The name/label for the new account (e.g., 'Savings', 'Travel Fund')",
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class CloseAccountToolCallParameters(BaseModel):
+    """Parameters for close account tool"""
+    account_title: str = Field(
+        ..., alias="account_title", description="The name/label of the account to close"
+    )
+    transfer_to_account_title: Optional[str] = Field(
+        None,
+        alias="transfer_to_account",
+        description="The name/label of the account to transfer remaining funds to (required if balance is non-zero)",
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class FreezeAccountToolCallParameters(BaseModel):
+    """Parameters for freeze account tool"""
+    account_title: str = Field(
+        ..., alias="account_title", description="The name/label of the account to freeze"
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class UnfreezeAccountToolCallParameters(BaseModel):
+    """Parameters for unfreeze account tool"""
+    account_title: str = Field(
+        ..., alias="account_title", description="The name/label of the account to unfreeze"
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class GetHistoryToolCallParameters(BaseModel):
+    """Parameters for transaction history tool"""
+    account_title: Optional[str] = Field(
+        None,
+        alias="account_title",
+        description="The name/label of the account; null covers all of the user's accounts",
+    )
+    from_date: Optional[str] = Field(
+        None, alias="from_date", description="Earliest date to include, as YYYY-MM-DD"
+    )
+    to_date: Optional[str] = Field(
+        None, alias="to_date", description="Latest date to include, as YYYY-MM-DD"
+    )
+    limit: Optional[int] = Field(
+        None, alias="limit", description="How many transactions to return (default 5, at most 20)"
+    )
+    cursor: Optional[str] = Field(
+        None,
+        alias="cursor",
+        description="The cursor from the previous result to get older transactions; null for the most recent",
+    )
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ConfirmTransferOTPToolCallParameters(BaseModel):
+    """Parameters for confirming a transfer with OTP"""
+    otp_token: str = Field(
+        ...,
+        alias="otp_code",
+        description="The 6-digit OTP code provided by the user to confirm the transaction",
+    )
+    model_config = ConfigDict(populate_by_name=True)
@@ -0,0 +1,88 @@
+import asyncio
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from loguru import logger
+
+
+@dataclass
+class WorkerStats:
+    """Live state of the call worker, reported by the health endpoint."""
+
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    last_cycle_at: Optional[datetime] = None
+    last_cycle_seconds: Optional[float] = None
+    backlog: int = 0
+    oldest_due_at: Optional[datetime] = None
+    in_flight: int = 0
+    draining: bool = False
+    # Latest MaintenanceReport per maintenance job
+    maintenance: dict = field(default_factory=dict)
+
+    def is_live(self, stale_after_seconds: float) -> bool:
+        """Live while not draining and a cycle finished recently (or we just started)."""
+        if self.draining:
+            return False
+        reference = self.last_cycle_at or self.started_at
+        return (datetime.utcnow() - reference).total_seconds() <= stale_after_seconds
+
+    def snapshot(self, stale_after_seconds: float) -> dict:
+        now = datetime.utcnow()
+        return {
+            "status": "ok" if self.is_live(stale_after_seconds) else "unhealthy",
+            "draining": self.draining,
+            "last_cycle_at": self.last_cycle_at.isoformat() if self.last_cycle_at else None,
+            "last_cycle_seconds": self.last_cycle_seconds,
+            "backlog": self.backlog,
+            "oldest_due_age_seconds": (
+                (now - self.oldest_due_at).total_seconds() if self.oldest_due_at else 0.0
+            ),
+            "in_flight": self.in_flight,
+            "maintenance": {
+                name: {**asdict(report), "finished_at": report.finished_at.isoformat()}
+                for name, report in self.maintenance.items()
+            },
+        }
+
+
+async def start_health_server(
+    stats: WorkerStats,
+    host: str,
+    port: int,
+    stale_after_seconds: float,
+) -> asyncio.Server:
+    """
+    Serve the worker stats as JSON on every path.
+
+    Responds 200 while the worker is live and 503 once it is draining or its
+    loop has not completed a cycle within `stale_after_seconds`, so it can be
+    used directly as an orchestrator liveness probe.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            # Only the request line matters; drain headers up to the blank line
+            await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            body = json.dumps(stats.snapshot(stale_after_seconds)).encode()
+            status = "200 OK" if stats.is_live(stale_after_seconds) else "503 Service Unavailable"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.opt(exception=e).warning(f"Health request failed: {e}")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Worker health endpoint listening on {host}:{port}")
+    return server
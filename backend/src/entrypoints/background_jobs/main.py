@@ -1,34 +1,217 @@
 import asyncio
+import signal
+import time
+from datetime import datetime, timedelta
+
 from loguru import logger
 
-from core.calls.initiate_call import initiate_call
+from core.calls.assistants import sync_assistants
+from core.calls.build_payload import warm_payload_cache
+from core.calls.initiate_call import DialOutcome, initiate_call, missing_dial_settings
+from core.calls.prompt_budget import apply_trimmed_configs
+from core.calls.retry import compute_backoff
+from entrypoints.background_jobs.health import WorkerStats, start_health_server
+from entrypoints.background_jobs.maintenance import run_maintenance
 from infrastructure.models import Call, CallStatus
-from infrastructure.repositories import get_scheduled_calls, update_call_status
+from infrastructure.repositories import (
+    CallTransition,
+    apply_call_transitions,
+    claim_due_calls,
+    get_call_backlog_stats,
+    release_call_leases,
+)
+from settings import settings
+
+
+def to_transition(call: Call, outcome: DialOutcome) -> CallTransition:
+    """Turn a dial outcome into the status change to persist for the call."""
+    if outcome.succeeded:
+        return CallTransition(
+            call_id=call.id,
+            status=CallStatus.IN_PROGRESS,
+            call_sid=outcome.call_sid,
+            started_at=outcome.started_at,
+        )
+
+    attempts = (call.attempts or 0) + 1
+    if outcome.retryable and attempts < settings.CALL_MAX_ATTEMPTS:
+        delay = compute_backoff(attempts, outcome.retry_after)
+        logger.warning(
+            f"Dial attempt {attempts} failed for call {call.id}, retrying in {delay:.0f}s"
+        )
+        return CallTransition(
+            call_id=call.id,
+            status=CallStatus.SCHEDULED,
+            next_attempt_at=datetime.utcnow() + timedelta(seconds=delay),
+            last_error=outcome.error,
+        )
 
+    logger.error(f"Call {call.id} failed after {attempts} attempt(s): {outcome.error}")
+    return CallTransition(
+        call_id=call.id,
+        status=CallStatus.FAILED,
+        last_error=outcome.error,
+    )
 
-async def process_call(call: Call):
+
+async def process_call(call: Call, requested: set[int]) -> CallTransition | None:
     try:
-        await initiate_call(call)
-        await update_call_status(call.id, CallStatus.IN_PROGRESS)
+        outcome = await initiate_call(call, on_request=lambda: requested.add(call.id))
+        return to_transition(call, outcome)
     except Exception as e:
         logger.opt(exception=e).error(f"ERROR IN BACKGROUND JOB LOOP: {e}")
+        return None
 
 
 POLLING_INTERVAL = 15
 
+# Consider the worker stuck when no cycle completed for this long
+STALE_AFTER_SECONDS = POLLING_INTERVAL * 4
+
+stats = WorkerStats()
+
+
+async def wait_for_dials(
+    tasks: list[asyncio.Task], stopping: asyncio.Event
+) -> set[asyncio.Task]:
+    """
+    Wait for in-flight dials to finish.
+
+    Once shutdown is requested the remaining dials get at most
+    WORKER_DRAIN_TIMEOUT_SECONDS; whatever is still running after that is
+    returned to the caller.
+    """
+    pending = set(tasks)
+    stop_wait = asyncio.ensure_future(stopping.wait())
+    try:
+        while pending and not stopping.is_set():
+            await asyncio.wait(pending | {stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+            pending = {task for task in pending if not task.done()}
+    finally:
+        stop_wait.cancel()
+
+    if pending:
+        logger.info(f"Draining {len(pending)} in-flight dial(s)")
+        _, pending = await asyncio.wait(
+            pending, timeout=settings.WORKER_DRAIN_TIMEOUT_SECONDS
+        )
+    return pending
+
+
+async def run_cycle(stopping: asyncio.Event) -> int:
+    """Claim due calls, dial them concurrently and persist the outcomes."""
+    missing = missing_dial_settings()
+    if missing:
+        # Leave the calls scheduled rather than spend their attempts on a config error
+        logger.error(f"{', '.join(missing)} not configured, not dialing")
+        return 0
+    calls = await claim_due_calls(
+        settings.CALL_CLAIM_BATCH_SIZE, settings.CALL_LEASE_SECONDS
+    )
+    # Calls whose dial request has been sent
+    requested: set[int] = set()
+    tasks = [asyncio.create_task(process_call(call, requested)) for call in calls]
+    stats.in_flight = len(tasks)
+
+    def on_done(_: asyncio.Task):
+        stats.in_flight -= 1
+
+    for task in tasks:
+        task.add_done_callback(on_done)
+
+    pending = await wait_for_dials(tasks, stopping)
+
+    transitions = [
+        task.result()
+        for task in tasks
+        if task not in pending and not task.cancelled() and task.result()
+    ]
+
+    if pending:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        interrupted = [call.id for call, task in zip(calls, tasks) if task in pending]
+        await release_interrupted(interrupted, requested)
+
+    await apply_call_transitions(transitions)
+    return len(calls)
+
+
+async def release_interrupted(call_ids: list[int], requested: set[int]):
+    """
+    Hand back calls whose dial was cut off by shutdown, without counting an attempt.
+
+    A call whose request never went out is due again right away. One whose
+    request was sent may have been placed by the provider, so it keeps a
+    lease of CALL_INTERRUPTED_DIAL_HOLD_SECONDS rather than being redialed
+    by the next worker, and is logged for reconciliation.
+    """
+    unsent = [call_id for call_id in call_ids if call_id not in requested]
+    in_doubt = [call_id for call_id in call_ids if call_id in requested]
+    if unsent:
+        logger.warning(f"Releasing {len(unsent)} call(s) not yet dialed at shutdown")
+        await release_call_leases(unsent, last_error="Interrupted by worker shutdown before dialing")
+    if in_doubt:
+        logger.error(f"Dials cut off by shutdown, the provider may have placed them: calls {in_doubt}")
+        await release_call_leases(
+            in_doubt,
+            next_attempt_at=datetime.utcnow() + timedelta(seconds=settings.CALL_INTERRUPTED_DIAL_HOLD_SECONDS),
+            last_error="Interrupted by worker shutdown while dialing; check with the provider before redialing",
+        )
+
+
 async def main():
-    while True:
-        try:
-            calls = await get_scheduled_calls()
-            await asyncio.gather(*[
-                process_call(call) for call in calls
-            ], return_exceptions=True)
-            if not calls:
-                logger.info(f"No calls this cycle, waiting {POLLING_INTERVAL}")
-        except Exception as e:
-            logger.opt(exception=e).error(f"ERROR IN BACKGROUND JOB LOOP: {e}")
-        finally:
-            await asyncio.sleep(POLLING_INTERVAL)
+    if settings.VAPI_TRIMMED_ASSISTANTS:
+        logger.info(f"Using trimmed assistants for {apply_trimmed_configs()}")
+    warm_payload_cache()
+    if settings.VAPI_PERSISTENT_ASSISTANTS and settings.GROQ_PRIVATE_API_KEY:
+        await sync_assistants()
+    stopping = asyncio.Event()
+
+    def request_shutdown():
+        # Stop claiming new calls and fail the liveness probe while draining
+        logger.info("Shutdown requested, draining call worker")
+        stats.draining = True
+        stopping.set()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, request_shutdown)
+
+    health_server = await start_health_server(
+        stats,
+        settings.WORKER_HEALTH_HOST,
+        settings.WORKER_HEALTH_PORT,
+        STALE_AFTER_SECONDS,
+    )
+
+    maintenance = asyncio.create_task(run_maintenance(stopping, stats.maintenance))
+
+    try:
+        while not stopping.is_set():
+            try:
+                cycle_started = time.perf_counter()
+                dialed = await run_cycle(stopping)
+                stats.backlog, stats.oldest_due_at = await get_call_backlog_stats()
+                stats.last_cycle_seconds = time.perf_counter() - cycle_started
+                stats.last_cycle_at = datetime.utcnow()
+                if not dialed:
+                    logger.info(f"No calls this cycle, waiting {POLLING_INTERVAL}")
+            except Exception as e:
+                logger.opt(exception=e).error(f"ERROR IN BACKGROUND JOB LOOP: {e}")
+
+            try:
+                await asyncio.wait_for(stopping.wait(), POLLING_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        stats.draining = True
+        stopping.set()
+        await asyncio.gather(maintenance, return_exceptions=True)
+        health_server.close()
+        await health_server.wait_closed()
+        logger.info("Call worker stopped")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
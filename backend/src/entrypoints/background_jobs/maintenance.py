@@ -0,0 +1,139 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from infrastructure.repositories import (
+    expire_stale_otps,
+    fail_unconfirmed_transactions,
+    mark_overdue_bills,
+    post_opening_balances,
+    reconcile_ledger,
+    roll_balance_snapshots,
+)
+from settings import settings
+
+
+@dataclass(frozen=True)
+class MaintenanceJob:
+    """
+    A periodic set-based cleanup.
+
+    `run_batch` updates at most `batch_size` rows in its own transaction and
+    returns how many it touched; the job keeps calling it until a batch comes
+    back short, so locks are held for one chunk at a time.
+    """
+
+    name: str
+    interval_seconds: int
+    run_batch: Callable[[int], Awaitable[int]]
+
+
+@dataclass(frozen=True)
+class MaintenanceReport:
+    job: str
+    rows: int
+    batches: int
+    duration_seconds: float
+    finished_at: datetime
+
+
+async def _fail_unconfirmed_transactions(batch_size: int) -> int:
+    grace = timedelta(minutes=settings.PENDING_TRANSACTION_GRACE_MINUTES)
+    return await fail_unconfirmed_transactions(datetime.utcnow() - grace, batch_size)
+
+
+async def _roll_balance_snapshots(batch_size: int) -> int:
+    settled_before = datetime.utcnow() - timedelta(seconds=settings.LEDGER_SNAPSHOT_LAG_SECONDS)
+    return await roll_balance_snapshots(settled_before, batch_size)
+
+
+async def _reconcile_ledger(batch_size: int) -> int:
+    # A single set-based pass; discrepancies are reported, never repaired
+    reconciliation = await reconcile_ledger()
+    if not reconciliation.ok:
+        logger.error(
+            f"Ledger out of balance: {len(reconciliation.balance_mismatches)} account(s) "
+            f"differ from their ledger balance, {len(reconciliation.unbalanced_postings)} "
+            f"posting(s) don't sum to zero",
+            balance_mismatches=reconciliation.balance_mismatches[:20],
+            unbalanced_postings=reconciliation.unbalanced_postings[:20],
+        )
+    return 0
+
+
+MAINTENANCE_JOBS: list[MaintenanceJob] = [
+    MaintenanceJob("expire_otps", 60, expire_stale_otps),
+    MaintenanceJob("fail_unconfirmed_transactions", 300, _fail_unconfirmed_transactions),
+    MaintenanceJob("mark_overdue_bills", 3600, mark_overdue_bills),
+    MaintenanceJob("post_opening_balances", 60, post_opening_balances),
+    MaintenanceJob("roll_balance_snapshots", 60, _roll_balance_snapshots),
+    MaintenanceJob("reconcile_ledger", 3600, _reconcile_ledger),
+]
+
+
+def next_run_at(interval_seconds: int, now: float) -> float:
+    """Next wall-clock slot for a job, aligned to multiples of its interval like a cron entry."""
+    return (now // interval_seconds + 1) * interval_seconds
+
+
+async def run_job(job: MaintenanceJob) -> MaintenanceReport:
+    """Run a job in chunks until a batch updates fewer rows than the batch size."""
+    batch_size = settings.MAINTENANCE_BATCH_SIZE
+    started = time.perf_counter()
+    rows = batches = 0
+    while True:
+        touched = await job.run_batch(batch_size)
+        rows += touched
+        batches += 1
+        if touched < batch_size:
+            break
+
+    report = MaintenanceReport(
+        job=job.name,
+        rows=rows,
+        batches=batches,
+        duration_seconds=time.perf_counter() - started,
+        finished_at=datetime.utcnow(),
+    )
+    logger.info(
+        f"Maintenance job {job.name}: {rows} row(s) in {batches} batch(es), "
+        f"{report.duration_seconds:.3f}s",
+        job=job.name,
+        rows=rows,
+        batches=batches,
+        duration_seconds=report.duration_seconds,
+    )
+    return report
+
+
+async def run_maintenance(
+    stopping: asyncio.Event,
+    reports: dict[str, MaintenanceReport],
+    jobs: list[MaintenanceJob] = MAINTENANCE_JOBS,
+):
+    """
+    Run every job once at startup, then on its schedule until `stopping` is set.
+
+    The latest report of each job is stored in `reports`.
+    """
+    due = {job.name: time.time() for job in jobs}
+    while not stopping.is_set():
+        now = time.time()
+        for job in jobs:
+            if due[job.name] > now:
+                continue
+            try:
+                reports[job.name] = await run_job(job)
+            except Exception as e:
+                logger.opt(exception=e).error(f"ERROR IN MAINTENANCE JOB {job.name}: {e}")
+            due[job.name] = next_run_at(job.interval_seconds, time.time())
+
+        sleep_for = max(0.0, min(due.values()) - time.time())
+        try:
+            await asyncio.wait_for(stopping.wait(), sleep_for)
+        except asyncio.TimeoutError:
+            pass
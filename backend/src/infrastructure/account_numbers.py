@@ -0,0 +1,62 @@
+"""
+Account number allocation.
+
+Numbers are a 12-digit serial followed by a Luhn check digit, 13 digits in
+all, so they can't collide with the older 12-digit random numbers or the
+dashboard's ACC- numbers. Serials come from account_number_seq, whose
+increment is the block size: one nextval reserves a whole block for this
+process, which then hands numbers out from memory. Blocks never overlap
+across processes, so no number needs to be checked against the table, and
+opening an account only costs a round trip once per block. Numbers left in
+a block when the process exits are skipped, not reused.
+"""
+import asyncio
+from collections import deque
+
+from sqlalchemy import select
+
+from infrastructure.db import session_maker
+from infrastructure.models import ACCOUNT_NUMBER_SEQUENCE
+
+SERIAL_DIGITS = 12
+
+
+def luhn_check_digit(digits: str) -> str:
+    """Check digit that makes `digits` + it pass the Luhn check."""
+    total = 0
+    # Double every second digit from the right, starting with the last one
+    for position, digit in enumerate(reversed(digits)):
+        value = int(digit)
+        if position % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return str((10 - total % 10) % 10)
+
+
+def format_account_number(serial: int) -> str:
+    body = f"{serial:0{SERIAL_DIGITS}d}"
+    return body + luhn_check_digit(body)
+
+
+class AccountNumberAllocator:
+    def __init__(self):
+        self._serials: deque[int] = deque()
+        self._refill_lock = asyncio.Lock()
+
+    async def _reserve_block(self):
+        async with session_maker() as session:
+            start = await session.scalar(select(ACCOUNT_NUMBER_SEQUENCE.next_value()))
+        self._serials.extend(range(start, start + ACCOUNT_NUMBER_SEQUENCE.increment))
+
+    async def allocate(self) -> str:
+        while not self._serials:
+            async with self._refill_lock:
+                # Another caller may have refilled while this one waited
+                if not self._serials:
+                    await self._reserve_block()
+        return format_account_number(self._serials.popleft())
+
+
+account_number_allocator = AccountNumberAllocator()
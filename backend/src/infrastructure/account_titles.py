@@ -0,0 +1,258 @@
+"""
+Fuzzy resolution of spoken account titles.
+
+Speech-to-text hands tools titles like "saving", "savings account" or
+"travel fun" for accounts named "Savings" and "Travel Fund". Each user's
+titles are indexed under a normalized key (case, punctuation and filler
+words like "account" dropped, words singularized) and a phonetic key per
+word, and a spoken title is scored against every entry:
+
+    1.00  the exact title
+    0.99  the title up to case
+    0.95  same normalized key
+    0.85  same phonetic key
+    <0.9  similarity of the keys, or the words of one contained in the other
+
+A title resolves to an account when it is exact, or when its best score is
+at least MIN_CONFIDENCE and no other account scores within AMBIGUITY_MARGIN;
+otherwise the candidates are returned so the caller can ask which one was
+meant. Closed accounts only match up to case, so a fuzzy match never picks
+an account that can't be used. Titles aren't unique: when several accounts
+have the title as named, one that isn't closed wins over closed ones, and
+two that aren't closed are ambiguous.
+
+Indexes are built from one query per user and cached in process. Opening or
+closing an account invalidates its user's index; accounts opened from the
+dashboard are picked up after ACCOUNT_TITLE_INDEX_TTL_SECONDS.
+"""
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Iterable, NamedTuple, Optional
+
+from infrastructure.models import AccountStatus
+from settings import settings
+
+MIN_CONFIDENCE = 0.7
+# Score of a title that is the one named, up to case
+_NAMED = 0.99
+AMBIGUITY_MARGIN = 0.08
+# Titles a new account's title mustn't match this closely, so they stay distinguishable
+CONFUSABLE_CONFIDENCE = 0.95
+
+# Words that don't tell accounts apart; "akaun" is Malay for account
+_FILLER_WORDS = frozenset({"a", "an", "the", "my", "account", "accounts", "acct", "akaun"})
+_WORDS = re.compile(r"\w+")
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def _words(title: str) -> list[str]:
+    folded = unicodedata.normalize("NFKD", title).casefold()
+    return _WORDS.findall("".join(c for c in folded if not unicodedata.combining(c)))
+
+
+def _singular(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase words of a title without punctuation or filler words, singularized."""
+    words = _words(title)
+    meaningful = [word for word in words if word not in _FILLER_WORDS] or words
+    return " ".join(_singular(word) for word in meaningful)
+
+
+def _soundex(word: str) -> str:
+    """Soundex without the padding and truncation, so longer words keep their tail."""
+    if not word.isascii() or not word.isalpha():
+        return word
+    code = word[0]
+    previous = _SOUNDEX_CODES.get(word[0], "")
+    for char in word[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+        if char not in "hw":
+            previous = digit
+    return code
+
+
+def phonetic_key(title: str) -> str:
+    return " ".join(_soundex(word) for word in normalize_title(title).split())
+
+
+class _Entry(NamedTuple):
+    account_id: int
+    title: str
+    closed: bool
+    account_number: Optional[str]
+    folded: str
+    normalized: str
+    phonetic: str
+
+
+class TitleCandidate(NamedTuple):
+    account_id: int
+    title: str
+    account_number: Optional[str] = None
+
+
+class TitleMatch(NamedTuple):
+    """
+    Outcome of resolving a spoken title.
+
+    `account_id` and `title` are set when it resolved. Otherwise
+    `candidates` holds the accounts it could have meant (ambiguous), one per
+    account, or is empty if nothing came close.
+    """
+
+    account_id: Optional[int]
+    title: Optional[str]
+    confidence: float
+    candidates: tuple[TitleCandidate, ...] = ()
+
+    @property
+    def ambiguous(self) -> bool:
+        return self.account_id is None and len(self.candidates) > 1
+
+
+def _candidate(entry: _Entry) -> TitleCandidate:
+    return TitleCandidate(entry.account_id, entry.title, entry.account_number)
+
+
+class AccountTitleIndex:
+    def __init__(self, accounts: Iterable[tuple]):
+        """`accounts` are (id, title, status) or (id, title, status, account number) rows."""
+        self.entries = tuple(
+            _Entry(
+                account_id,
+                title,
+                status == AccountStatus.CLOSED,
+                rest[0] if rest else None,
+                title.casefold(),
+                normalize_title(title),
+                phonetic_key(title),
+            )
+            for account_id, title, status, *rest in accounts
+        )
+
+    @property
+    def titles(self) -> tuple[str, ...]:
+        """Distinct titles of the accounts that aren't closed."""
+        return tuple(dict.fromkeys(entry.title for entry in self.entries if not entry.closed))
+
+    @staticmethod
+    def _score(entry: _Entry, spoken: str, folded: str, normalized: str, phonetic: str) -> float:
+        if entry.title == spoken:
+            return 1.0
+        if entry.folded == folded:
+            return _NAMED
+        if entry.closed:
+            return 0.0
+        if entry.normalized == normalized:
+            return 0.95
+        if entry.phonetic == phonetic:
+            return 0.85
+        similarity = max(
+            SequenceMatcher(None, normalized, entry.normalized).ratio(),
+            SequenceMatcher(None, phonetic, entry.phonetic).ratio() * 0.95,
+        )
+        spoken_words, title_words = set(normalized.split()), set(entry.normalized.split())
+        if spoken_words and title_words and (spoken_words <= title_words or title_words <= spoken_words):
+            similarity = max(similarity, 0.8)
+        return similarity * 0.9
+
+    def resolve(self, spoken: str) -> TitleMatch:
+        spoken = spoken.strip()
+        keys = (spoken, spoken.casefold(), normalize_title(spoken), phonetic_key(spoken))
+        # Ties go to accounts that aren't closed
+        scored = sorted(
+            ((self._score(entry, *keys), entry) for entry in self.entries),
+            key=lambda scored_entry: (scored_entry[0], not scored_entry[1].closed),
+            reverse=True,
+        )
+        if not scored or scored[0][0] < MIN_CONFIDENCE:
+            return TitleMatch(None, None, scored[0][0] if scored else 0.0)
+
+        best_score, best = scored[0]
+        if best_score >= _NAMED:
+            named = [(score, entry) for score, entry in scored if score >= _NAMED]
+            usable = [(score, entry) for score, entry in named if not entry.closed]
+            if len(usable) > 1:
+                exact = [(score, entry) for score, entry in usable if score == 1.0]
+                if len(exact) != 1:
+                    return TitleMatch(None, None, best_score, tuple(_candidate(entry) for _, entry in usable))
+                usable = exact
+            # Only closed accounts have the title: the latest one, so the caller hears it is closed
+            score, chosen = usable[0] if usable else max(named, key=lambda scored_entry: scored_entry[1].account_id)
+            return TitleMatch(chosen.account_id, chosen.title, score, (_candidate(chosen),))
+
+        close = tuple(
+            _candidate(entry)
+            for score, entry in scored
+            if score >= MIN_CONFIDENCE and best_score - score < AMBIGUITY_MARGIN
+        )
+        if len(close) > 1:
+            return TitleMatch(None, None, best_score, close)
+        return TitleMatch(best.account_id, best.title, best_score, (_candidate(best),))
+
+
+class _CachedIndex(NamedTuple):
+    filled_at: float
+    index: AccountTitleIndex
+
+
+class AccountTitleIndexCache:
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._entries: OrderedDict[str, _CachedIndex] = OrderedDict()
+        # Moves on with every invalidation; an index built from a query that
+        # started before one isn't cached, as it may predate the change
+        self.generation = 0
+
+    def get(self, user_id: str) -> Optional[AccountTitleIndex]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.filled_at > self.ttl_seconds:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry.index
+
+    def put(self, user_id: str, generation: int, index: AccountTitleIndex):
+        if generation != self.generation:
+            return
+        self._entries[user_id] = _CachedIndex(time.monotonic(), index)
+        self._entries.move_to_end(user_id)
+        if len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def invalidate_users(self, *user_ids: str):
+        self.generation += 1
+        for user_id in user_ids:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+
+account_title_indexes = AccountTitleIndexCache(
+    settings.ACCOUNT_TITLE_INDEX_TTL_SECONDS,
+    settings.ACCOUNT_TITLE_INDEX_MAX_USERS,
+)
@@ -0,0 +1,104 @@
+"""
+In-process cache of account balances per user, for the balance tool.
+
+Entries are validated with a per-user version counter rather than expired on
+a schedule: every write path that changes a balance, status or the set of
+accounts invalidates the users it touched after committing, which moves
+their version on, and an entry is only served while its version is current.
+A reader takes the version before querying, so a write that commits while
+the query runs leaves the new entry stale instead of caching old data.
+
+Invalidation only reaches this process. Writes made by other API workers or
+by the dashboard are bounded by BALANCE_CACHE_TTL_SECONDS instead.
+"""
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, NamedTuple, Optional
+
+from infrastructure.models import AccountStatus
+from settings import settings
+
+
+class AccountBalance(NamedTuple):
+    id: int
+    title: str
+    balance: Decimal
+    status: AccountStatus
+
+
+@dataclass
+class BalanceCacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+
+class _Entry(NamedTuple):
+    version: int
+    filled_at: float
+    balances: tuple[AccountBalance, ...]
+
+
+class BalanceCache:
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self.stats = BalanceCacheStats()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # Versions come from one counter so they never repeat. Users without
+        # an explicit version are at the floor, which moves on whenever
+        # versions are forgotten so no in-flight read can match it again.
+        self._counter = itertools.count(1)
+        self._floor = 0
+        self._versions: dict[str, int] = {}
+
+    def version(self, user_id: str) -> int:
+        """Current version of a user; pass it to put() with the balances read after it."""
+        return self._versions.get(user_id, self._floor)
+
+    def get(self, user_id: str) -> Optional[tuple[AccountBalance, ...]]:
+        entry = self._entries.get(user_id)
+        if (
+            entry is None
+            or entry.version != self.version(user_id)
+            or time.monotonic() - entry.filled_at > self.ttl_seconds
+        ):
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.stats.hits += 1
+        return entry.balances
+
+    def put(self, user_id: str, version: int, balances: Iterable[AccountBalance]):
+        if version != self.version(user_id):
+            # Invalidated while the balances were being read
+            return
+        self._entries[user_id] = _Entry(version, time.monotonic(), tuple(balances))
+        self._entries.move_to_end(user_id)
+        if len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def invalidate_users(self, *user_ids: str):
+        for user_id in user_ids:
+            self._versions[user_id] = next(self._counter)
+            self.stats.invalidations += 1
+        if len(self._versions) > 2 * self.max_users:
+            self._forget_versions()
+
+    def _forget_versions(self):
+        """Drop the versions of users with no entry, so the map stays bounded by the cache size."""
+        floor = self._floor
+        self._floor = next(self._counter)
+        self._versions = {
+            user_id: self._versions.get(user_id, floor) for user_id in self._entries
+        }
+
+    def clear(self):
+        self._entries.clear()
+        self._forget_versions()
+
+
+balance_cache = BalanceCache(settings.BALANCE_CACHE_TTL_SECONDS, settings.BALANCE_CACHE_MAX_USERS)
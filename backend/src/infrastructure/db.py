@@ -1,6 +1,7 @@
+import asyncio
 from asyncio import current_task
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, func, text
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
     async_scoped_session,
@@ -27,6 +28,7 @@ class CustomBase(AsyncAttrs, DeclarativeBase):
 engine = create_async_engine(
     url=settings.ASYNC_DB_DSN,
     echo=settings.DEBUG,
+    pool_size=settings.DB_POOL_SIZE,
 )
 
 session_maker = async_scoped_session(
@@ -39,3 +41,42 @@ session_maker = async_scoped_session(
     ),
     scopefunc=current_task,
 )
+
+
+async def warm_up_pool(connections: int) -> int:
+    """
+    Open pool connections ahead of the first request.
+
+    Connects and round-trips a trivial query on up to `connections` pooled
+    connections at once, then returns them to the pool, so the first requests
+    don't pay for TCP/TLS setup and authentication.
+
+    Returns:
+        Number of connections that were opened
+    """
+    connections = min(connections, settings.DB_POOL_SIZE)
+    # Hold every connection until all are open, otherwise the pool hands the same one back
+    settled = asyncio.Event()
+    pending = connections
+
+    def settle():
+        nonlocal pending
+        pending -= 1
+        if not pending:
+            settled.set()
+
+    async def open_one():
+        try:
+            connection = await engine.connect()
+        except BaseException:
+            settle()
+            raise
+        async with connection:
+            try:
+                await connection.execute(text("SELECT 1"))
+            finally:
+                settle()
+            await settled.wait()
+
+    results = await asyncio.gather(*(open_one() for _ in range(connections)), return_exceptions=True)
+    return sum(1 for result in results if not isinstance(result, BaseException))
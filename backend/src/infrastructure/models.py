@@ -3,7 +3,7 @@ from decimal import Decimal
 from enum import Enum as PyEnum
 from typing import Optional, List
 
-from sqlalchemy import String, BigInteger, Numeric, DateTime, Text, ForeignKey, Index
+from sqlalchemy import String, BigInteger, Numeric, DateTime, Text, ForeignKey, Index, Sequence, CheckConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from infrastructure.db import CustomBase
@@ -60,6 +60,7 @@ class ToolType(PyEnum):
     REQUEST_TRANSFER_TO_USER = "request_transfer_to_user"
     CONFIRM_TRANSFER_OTP = "confirm_transfer_otp"
     PAY_BILL = "pay_bill"
+    PAY_ALL_BILLS = "pay_all_bills"
     LIST_BILLS = "list_bills"
     LIST_ACCOUNTS = "list_accounts"
     OPEN_ACCOUNT = "open_account"
@@ -76,6 +77,18 @@ class OTPStatus(PyEnum):
     EXPIRED = "EXPIRED"
 
 
+class LedgerEntryType(PyEnum):
+    OPENING_BALANCE = "OPENING_BALANCE"
+    TRANSFER = "TRANSFER"
+    BILL_PAYMENT = "BILL_PAYMENT"
+    ACCOUNT_CLOSURE = "ACCOUNT_CLOSURE"
+
+
+class PhoneNumberSource(PyEnum):
+    ONBOARDING = "ONBOARDING"
+    CALL = "CALL"
+
+
 # Models
 class BankAccount(CustomBase):
     __tablename__ = "bank_accounts"
@@ -89,6 +102,10 @@ class BankAccount(CustomBase):
 
     title: Mapped[str] = mapped_column(String(255))
 
+    # Bumped on every write; ORM updates are compare-and-swap on it, and a
+    # trigger bumps it for writes that don't go through the ORM
+    version: Mapped[int] = mapped_column(default=0, server_default="0")
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -104,6 +121,7 @@ class BankAccount(CustomBase):
     )
 
     __table_args__ = (Index("ix_account_user_status", "user_id", "status"),)
+    __mapper_args__ = {"version_id_col": version}
 
 
 class Transaction(CustomBase):
@@ -178,7 +196,18 @@ class Bill(CustomBase):
         foreign_keys=[paid_from_account_id]
     )
 
-    __table_args__ = (Index("ix_bill_user_status", "user_id", "status"),)
+    __table_args__ = (
+        Index("ix_bill_user_status", "user_id", "status"),
+        Index("ix_bill_status_due", "status", "due_date"),
+        # Summaries and soonest-due pages of a user's outstanding bills
+        Index(
+            "ix_bill_user_outstanding_due",
+            "user_id",
+            "due_date",
+            "id",
+            postgresql_where=text("status IN ('PENDING', 'OVERDUE')"),
+        ),
+    )
 
 
 class Call(CustomBase):
@@ -199,6 +228,11 @@ class Call(CustomBase):
     )
     duration_seconds: Mapped[Optional[int]] = mapped_column(nullable=True)
 
+    # Dial retry tracking
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0")
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     language: Mapped[str] = mapped_column(String(255))
     customer_name: Mapped[str] = mapped_column(String(255))
@@ -209,7 +243,10 @@ class Call(CustomBase):
     )
     transactions: Mapped[List["Transaction"]] = relationship(back_populates="call")
 
-    __table_args__ = (Index("ix_call_user_scheduled", "user_id", "scheduled_at"),)
+    __table_args__ = (
+        Index("ix_call_user_scheduled", "user_id", "scheduled_at"),
+        Index("ix_call_status_next_attempt", "status", "next_attempt_at"),
+    )
 
 
 class CallTranscription(CustomBase):
@@ -241,7 +278,10 @@ class OTP(CustomBase):
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     user_id: Mapped[str] = mapped_column(String(255), index=True)
-    token: Mapped[str] = mapped_column(String(6))
+    # Plaintext tokens of OTPs issued before hashing; no longer written
+    token: Mapped[Optional[str]] = mapped_column(String(6), nullable=True)
+    # HMAC of the token, see repositories.hash_otp_token
+    token_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     
     transaction_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("transactions.id"), nullable=True, index=True
@@ -264,4 +304,121 @@ class OTP(CustomBase):
     __table_args__ = (
         Index("ix_otp_user_status", "user_id", "status"),
         Index("ix_otp_user_pending", "user_id", "status", "expires_at"),
+        Index("ix_otp_status_expires", "status", "expires_at"),
+        # At most one pending OTP per user; issuance relies on it under concurrency
+        Index(
+            "ux_otp_user_pending",
+            "user_id",
+            unique=True,
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
+
+
+# Shared by the legs of one ledger posting
+LEDGER_POSTING_SEQUENCE = Sequence("ledger_postings_seq", metadata=CustomBase.metadata)
+
+# Each nextval reserves a block of `increment` account numbers for one process
+ACCOUNT_NUMBER_SEQUENCE = Sequence("account_number_seq", increment=100, metadata=CustomBase.metadata)
+
+
+class ReferenceWorkerLease(CustomBase):
+    """
+    One of the 1024 worker ids of transaction references (see
+    infrastructure.references), leased to a process until expires_at.
+    """
+
+    __tablename__ = "reference_worker_leases"
+
+    # The worker id itself
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    holder: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+class LedgerEntry(CustomBase):
+    """
+    One leg of a double-entry posting. Rows are immutable (enforced by a trigger).
+
+    The legs of a posting share a posting_id and sum to zero. A leg either
+    moves money on one of our accounts (account_id) or on an outside party
+    such as a biller (counterparty).
+    """
+
+    __tablename__ = "ledger_entries"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    posting_id: Mapped[int] = mapped_column(BigInteger, index=True)
+
+    account_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("bank_accounts.id"), nullable=True
+    )
+    counterparty: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    transaction_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("transactions.id"), nullable=True, index=True
+    )
+
+    # Signed: positive credits the account, negative debits it
+    amount: Mapped[Decimal] = mapped_column(Numeric(15, 2))
+    type: Mapped[LedgerEntryType] = mapped_column()
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        CheckConstraint(
+            "(account_id IS NULL) <> (counterparty IS NULL)", name="ck_ledger_entry_party"
+        ),
+        # Snapshot + delta reads scan the entries after an id for one account
+        Index("ix_ledger_account_id", "account_id", "id"),
+        Index("ix_ledger_created", "created_at"),
+    )
+
+
+class AccountBalanceSnapshot(CustomBase):
+    """Ledger balance of an account up to and including last_entry_id."""
+
+    __tablename__ = "account_balance_snapshots"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    account_id: Mapped[int] = mapped_column(ForeignKey("bank_accounts.id"), unique=True)
+    balance: Mapped[Decimal] = mapped_column(Numeric(15, 2))
+    last_entry_id: Mapped[int] = mapped_column(BigInteger)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class BalanceSnapshotCursor(CustomBase):
+    """
+    Highest ledger entry id folded into the balance snapshots; a single row.
+
+    Kept apart from the snapshots' own last_entry_id, which only moves for
+    entries that have an account: counterparty legs are consumed too.
+    """
+
+    __tablename__ = "balance_snapshot_cursor"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    last_entry_id: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class PhoneDirectoryEntry(CustomBase):
+    """
+    Which user a phone number belongs to, keyed by its E.164 form.
+
+    Filled by a trigger on calls and by dashboard onboarding. A number
+    registered at onboarding isn't taken over by calls or onboarding of
+    other users.
+    """
+
+    __tablename__ = "phone_directory"
+
+    phone_number: Mapped[str] = mapped_column(String(16), primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(255), index=True)
+    source: Mapped[PhoneNumberSource] = mapped_column()
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
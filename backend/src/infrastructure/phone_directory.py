@@ -0,0 +1,83 @@
+"""
+Phone numbers in E.164 form, and an in-process cache of the phone directory.
+
+Numbers reach us as typed into the dashboard, with the country code but no
+"+" from onboarding, and with a "+" from the provider's webhook. They are
+all normalized to E.164 ("+60123456789") before being stored in or looked
+up from phone_directory. The migration that creates the table defines the
+same rules as the normalize_phone_number() SQL function, which the calls
+trigger and the dashboard use; keep the two in sync.
+
+The cache maps numbers to user ids. Only hits are cached, so a number
+registered after a miss is found on the next lookup. A number that moves to
+another user is picked up after PHONE_DIRECTORY_CACHE_TTL_SECONDS.
+"""
+import re
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from settings import settings
+
+_SEPARATORS = re.compile(r"[^0-9+]")
+# Up to 15 digits with the country code, which never starts with 0
+_E164_DIGITS = re.compile(r"[1-9][0-9]{7,14}")
+
+
+def normalize_phone_number(phone_number: str, default_country_code: Optional[str] = None) -> Optional[str]:
+    """
+    E.164 form of a phone number, or None if it can't be one.
+
+    "+" and "00" prefixes are international; a single leading 0 is a local
+    number in `default_country_code` (PHONE_DEFAULT_COUNTRY_CODE); anything
+    else is taken to start with its country code.
+    """
+    if default_country_code is None:
+        default_country_code = settings.PHONE_DEFAULT_COUNTRY_CODE
+    cleaned = _SEPARATORS.sub("", phone_number or "")
+    if cleaned.startswith("+"):
+        digits = cleaned[1:]
+    elif cleaned.startswith("00"):
+        digits = cleaned[2:]
+    elif cleaned.startswith("0"):
+        digits = default_country_code + cleaned[1:]
+    else:
+        digits = cleaned
+    return f"+{digits}" if _E164_DIGITS.fullmatch(digits) else None
+
+
+class _Entry(NamedTuple):
+    user_id: str
+    filled_at: float
+
+
+class PhoneDirectoryCache:
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def get(self, phone_number: str) -> Optional[str]:
+        entry = self._entries.get(phone_number)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.filled_at > self.ttl_seconds:
+            del self._entries[phone_number]
+            return None
+        self._entries.move_to_end(phone_number)
+        return entry.user_id
+
+    def put(self, phone_number: str, user_id: str):
+        self._entries[phone_number] = _Entry(user_id, time.monotonic())
+        self._entries.move_to_end(phone_number)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+phone_directory_cache = PhoneDirectoryCache(
+    settings.PHONE_DIRECTORY_CACHE_TTL_SECONDS,
+    settings.PHONE_DIRECTORY_CACHE_MAX_ENTRIES,
+)
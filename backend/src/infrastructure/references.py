@@ -0,0 +1,144 @@
+"""
+Transaction references.
+
+References are snowflake-style 64-bit ids written as 16 hex digits:
+
+    41 bits  milliseconds since REFERENCE_EPOCH
+    10 bits  worker id
+    12 bits  sequence within the millisecond
+
+They are short, sort by creation time (so inserts land at the right edge of
+the unique index), and unique without any lookup: each process leases a
+worker id from reference_worker_leases on first use, and within a process
+the clock/sequence pair never repeats.
+
+A lease lasts REFERENCE_WORKER_LEASE_SECONDS and is renewed by the next id
+generated after half of that, so ids of processes that stopped become free
+again. A process whose lease lapsed and was taken by another one leases a
+new id before generating more. At most 1024 processes can hold a lease at
+once; the next one fails to generate references until an id frees up.
+"""
+import asyncio
+import math
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select, update
+
+from infrastructure.db import session_maker
+from infrastructure.models import ReferenceWorkerLease
+from settings import settings
+
+REFERENCE_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+# Ids a reserved block spans: one whole millisecond of one worker
+BLOCK_SIZE = 1 << SEQUENCE_BITS
+
+_EPOCH_MS = int(REFERENCE_EPOCH.timestamp() * 1000)
+
+
+def format_reference(reference_id: int) -> str:
+    return f"{reference_id:016x}"
+
+
+def reference_created_at(reference: str) -> datetime:
+    """When a reference was generated, to the millisecond."""
+    ms = (int(reference, 16) >> (WORKER_BITS + SEQUENCE_BITS)) + _EPOCH_MS
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+
+class ReferenceGenerator:
+    def __init__(self, worker_id: Optional[int] = None):
+        self._worker_id = worker_id
+        self._worker_lock = asyncio.Lock()
+        self._holder = uuid.uuid4().hex
+        # A configured worker id is never leased or renewed
+        self._renew_at = math.inf if worker_id is not None else -math.inf
+        self._last_ms = 0
+        self._sequence = 0
+
+    async def _lease_worker_id(self) -> int:
+        """Lease a worker id, or renew the one held if nobody took it after it lapsed."""
+        async with self._worker_lock:
+            if time.monotonic() < self._renew_at:
+                return self._worker_id
+            requested_at = time.monotonic()
+            lease_seconds = settings.REFERENCE_WORKER_LEASE_SECONDS
+            expires_at = func.now() + timedelta(seconds=lease_seconds)
+            async with session_maker() as session:
+                worker_id = None
+                if self._worker_id is not None:
+                    worker_id = await session.scalar(
+                        update(ReferenceWorkerLease)
+                        .where(
+                            ReferenceWorkerLease.id == self._worker_id,
+                            ReferenceWorkerLease.holder == self._holder,
+                        )
+                        .values(expires_at=expires_at)
+                        .returning(ReferenceWorkerLease.id)
+                    )
+                if worker_id is None:
+                    free = (
+                        select(ReferenceWorkerLease.id)
+                        .where(ReferenceWorkerLease.expires_at < func.now())
+                        .order_by(ReferenceWorkerLease.expires_at)
+                        .limit(1)
+                        .with_for_update(skip_locked=True)
+                        .scalar_subquery()
+                    )
+                    worker_id = await session.scalar(
+                        update(ReferenceWorkerLease)
+                        .where(ReferenceWorkerLease.id == free)
+                        .values(holder=self._holder, expires_at=expires_at)
+                        .returning(ReferenceWorkerLease.id)
+                    )
+                await session.commit()
+            if worker_id is None:
+                raise RuntimeError(f"All {1 << WORKER_BITS} reference worker ids are leased")
+            self._worker_id = worker_id
+            self._renew_at = requested_at + lease_seconds / 2
+            return worker_id
+
+    def _tick(self, whole_block: bool) -> tuple[int, int]:
+        """Next (millisecond, sequence); a whole block gets a millisecond to itself."""
+        # Never step back, even if the wall clock does
+        ms = max(int(time.time() * 1000) - _EPOCH_MS, self._last_ms)
+        if whole_block:
+            if ms == self._last_ms:
+                ms += 1
+            self._sequence = BLOCK_SIZE - 1
+        elif ms == self._last_ms:
+            self._sequence += 1
+            if self._sequence == BLOCK_SIZE:
+                # Sequence exhausted, borrow the next millisecond
+                ms += 1
+                self._sequence = 0
+        else:
+            self._sequence = 0
+        self._last_ms = ms
+        return ms, 0 if whole_block else self._sequence
+
+    async def next_id(self) -> int:
+        worker_id = self._worker_id if time.monotonic() < self._renew_at else await self._lease_worker_id()
+        ms, sequence = self._tick(whole_block=False)
+        return (ms << (WORKER_BITS + SEQUENCE_BITS)) | (worker_id << SEQUENCE_BITS) | sequence
+
+    async def next_reference(self) -> str:
+        return format_reference(await self.next_id())
+
+    async def reserve_block(self) -> int:
+        """
+        First id of BLOCK_SIZE consecutive ids reserved for the caller.
+
+        For set-based inserts, which add a row offset below BLOCK_SIZE to it
+        in SQL.
+        """
+        worker_id = self._worker_id if time.monotonic() < self._renew_at else await self._lease_worker_id()
+        ms, _ = self._tick(whole_block=True)
+        return (ms << (WORKER_BITS + SEQUENCE_BITS)) | (worker_id << SEQUENCE_BITS)
+
+
+transaction_references = ReferenceGenerator(settings.REFERENCE_WORKER_ID)
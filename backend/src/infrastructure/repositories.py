@@ -1,21 +1,63 @@
-from typing import Optional, List
-from datetime import datetime
+import asyncio
+import hashlib
+import hmac
+import random
+import secrets
+from dataclasses import dataclass
+from typing import Awaitable, Callable, NamedTuple, Optional, List, Sequence, TypeVar
+from datetime import datetime, timedelta
 from decimal import Decimal
-from sqlalchemy import select, and_, or_, desc
-from sqlalchemy.orm import selectinload
 
+from loguru import logger
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    String,
+    Text,
+    and_,
+    case,
+    cast,
+    column,
+    desc,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+
+from infrastructure.account_numbers import account_number_allocator
+from infrastructure.account_titles import AccountTitleIndex, account_title_indexes
+from infrastructure.balance_cache import AccountBalance, balance_cache
 from infrastructure.db import session_maker
+from infrastructure.phone_directory import normalize_phone_number, phone_directory_cache
+from infrastructure.references import BLOCK_SIZE as REFERENCE_BLOCK_SIZE, transaction_references
+from settings import settings
 from .models import (
+    LEDGER_POSTING_SEQUENCE,
+    AccountBalanceSnapshot,
+    BalanceSnapshotCursor,
     BankAccount,
     Bill,
     Call,
     CallTranscription,
+    LedgerEntry,
     OTP,
+    PhoneDirectoryEntry,
     Transaction,
     AccountStatus,
     BillStatus,
     BillType,
     CallStatus,
+    LedgerEntryType,
     OTPStatus,
     TransactionStatus,
     TransactionType,
@@ -41,24 +83,89 @@ async def get_call_by_id(call_id: int) -> Optional[Call]:
 
 
 async def get_call_by_phone_number(phone_number: str) -> Optional[Call]:
-    """Get a call by phone number."""
+    """
+    Get the latest call to a phone number, in any format.
+
+    The number is resolved to its user through the phone directory, and only
+    that user's calls are compared with it.
+    """
+    normalized = normalize_phone_number(phone_number)
+    user_id = await get_user_by_phone_number(phone_number)
+    if not user_id:
+        return None
     async with session_maker() as session:
-        stmt = select(Call).where(
-            Call.phone_number == phone_number,
-        ).order_by(Call.created_at.desc()).limit(1)
+        stmt = (
+            select(Call)
+            .where(
+                Call.user_id == user_id,
+                func.normalize_phone_number(Call.phone_number, settings.PHONE_DEFAULT_COUNTRY_CODE) == normalized,
+            )
+            .order_by(Call.created_at.desc())
+            .limit(1)
+        )
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
 
 
+def _due_calls_filter(now: datetime):
+    """Scheduled calls that are due and not backing off or leased by a worker."""
+    return and_(
+        Call.status.in_([CallStatus.SCHEDULED, CallStatus.SCHEDULED.value]),
+        Call.scheduled_at <= now,
+        or_(Call.next_attempt_at.is_(None), Call.next_attempt_at <= now),
+    )
+
+
 async def get_scheduled_calls() -> list[Call]:
+    """Get scheduled calls that are due, skipping calls backing off after a failed dial."""
     async with session_maker() as session:
-        stmt = select(Call).where(
-            Call.status.in_([CallStatus.SCHEDULED, CallStatus.SCHEDULED.value])
-        )
+        stmt = select(Call).where(_due_calls_filter(datetime.utcnow()))
         result = await session.execute(stmt)
         return list(result.scalars().all())
 
 
+async def claim_due_calls(limit: int, lease_seconds: float) -> list[Call]:
+    """
+    Claim up to `limit` due calls for dialing.
+
+    Claimed calls get a lease by pushing next_attempt_at forward, so other
+    workers (and later cycles) skip them until the lease runs out. Rows locked
+    by a concurrent claim are skipped rather than waited on.
+    """
+    now = datetime.utcnow()
+    due_ids = (
+        select(Call.id)
+        .where(_due_calls_filter(now))
+        .order_by(func.coalesce(Call.next_attempt_at, Call.scheduled_at))
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Call)
+        .where(Call.id.in_(due_ids))
+        .values(next_attempt_at=now + timedelta(seconds=lease_seconds))
+        .returning(Call)
+        .execution_options(synchronize_session=False)
+    )
+    async with session_maker() as session:
+        result = await session.execute(stmt)
+        calls = list(result.scalars().all())
+        await session.commit()
+        return calls
+
+
+async def get_call_backlog_stats() -> tuple[int, Optional[datetime]]:
+    """Count due, unclaimed calls and return when the oldest of them became due."""
+    async with session_maker() as session:
+        stmt = select(
+            func.count(Call.id),
+            func.min(func.coalesce(Call.next_attempt_at, Call.scheduled_at)),
+        ).where(_due_calls_filter(datetime.utcnow()))
+        result = await session.execute(stmt)
+        count, oldest_due_at = result.one()
+        return count, oldest_due_at
+
 
 async def get_calls_by_user(
     user_id: str, status: Optional[CallStatus] = None, limit: int = 50
@@ -127,29 +234,121 @@ async def update_call_status(
         return call
 
 
-# Bank Account Repository Functions
-
+class CallTransition(NamedTuple):
+    """Status change for one call, produced by a scheduler cycle."""
+
+    call_id: int
+    status: CallStatus
+    call_sid: Optional[str] = None
+    started_at: Optional[datetime] = None
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
+async def apply_call_transitions(transitions: Sequence[CallTransition]) -> int:
+    """
+    Apply a scheduler cycle's status changes in a single statement.
+
+    Runs one UPDATE ... FROM (VALUES ...) that sets status, call_sid,
+    started_at and retry bookkeeping, and bumps the attempt counter. Only
+    calls that are still SCHEDULED are touched, so a call cancelled while it
+    was being dialed keeps its status.
+
+    Returns:
+        Number of calls updated
+    """
+    if not transitions:
+        return 0
+
+    rows = values(
+        column("id", BigInteger),
+        column("status", String),
+        column("call_sid", String),
+        column("started_at", DateTime),
+        column("next_attempt_at", DateTime),
+        column("last_error", Text),
+        name="transitions",
+    ).data(
+        [
+            (
+                t.call_id,
+                t.status.value,
+                t.call_sid,
+                t.started_at,
+                t.next_attempt_at,
+                t.last_error,
+            )
+            for t in transitions
+        ]
+    )
+
+    stmt = (
+        update(Call)
+        .where(Call.id == rows.c.id)
+        .where(Call.status == CallStatus.SCHEDULED)
+        .values(
+            # Casts keep all-NULL VALUES columns from being typed as text
+            status=cast(rows.c.status, Call.__table__.c.status.type),
+            call_sid=func.coalesce(cast(rows.c.call_sid, String), Call.call_sid),
+            started_at=func.coalesce(cast(rows.c.started_at, DateTime), Call.started_at),
+            next_attempt_at=cast(rows.c.next_attempt_at, DateTime),
+            last_error=cast(rows.c.last_error, Text),
+            attempts=Call.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
 
-async def get_account_by_id(account_id: int) -> Optional[BankAccount]:
-    """Get a bank account by ID."""
     async with session_maker() as session:
-        return await session.get(BankAccount, account_id)
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount
+
+
+async def release_call_leases(
+    call_ids: Sequence[int],
+    next_attempt_at: Optional[datetime] = None,
+    last_error: Optional[str] = None,
+) -> int:
+    """
+    End or move the lease on claimed calls without counting a dial attempt.
+
+    For calls whose dial was abandoned rather than attempted, e.g. at worker
+    shutdown: next_attempt_at None makes them due again right away, a time in
+    the future holds them until then. Only SCHEDULED calls are touched.
+
+    Returns:
+        Number of calls updated
+    """
+    if not call_ids:
+        return 0
+
+    stmt = (
+        update(Call)
+        .where(Call.id.in_(call_ids), Call.status == CallStatus.SCHEDULED)
+        .values(next_attempt_at=next_attempt_at, last_error=last_error)
+        .execution_options(synchronize_session=False)
+    )
+    async with session_maker() as session:
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount
 
 
-async def get_account_by_title(title: str) -> Optional[BankAccount]:
-    """Get a bank account by title."""
+async def get_call_by_sid(call_sid: str) -> Optional[Call]:
+    """Get a call by its provider call id."""
     async with session_maker() as session:
-        stmt = select(BankAccount).where(BankAccount.title == title)
+        stmt = select(Call).where(Call.call_sid == call_sid)
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
 
 
-async def get_account_by_number(account_number: str) -> Optional[BankAccount]:
-    """Get a bank account by account number."""
+# Bank Account Repository Functions
+
+
+async def get_account_by_id(account_id: int) -> Optional[BankAccount]:
+    """Get a bank account by ID."""
     async with session_maker() as session:
-        stmt = select(BankAccount).where(BankAccount.account_number == account_number)
-        result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+        return await session.get(BankAccount, account_id)
 
 
 async def get_accounts_by_user(
@@ -166,6 +365,123 @@ async def get_accounts_by_user(
         return list(result.scalars().all())
 
 
+# Closed accounts stay in the table, for their history, but aren't the user's any more
+_OPEN_ACCOUNT_STATUSES = (AccountStatus.ACTIVE, AccountStatus.SUSPENDED)
+
+
+async def get_account_balances(user_id: str) -> tuple[AccountBalance, ...]:
+    """Balances of a user's open accounts, from the balance cache or one query on ix_account_user_status."""
+    cached = balance_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    version = balance_cache.version(user_id)
+    stmt = (
+        select(BankAccount.id, BankAccount.title, BankAccount.balance, BankAccount.status)
+        .where(
+            BankAccount.user_id == user_id,
+            BankAccount.status.in_(_OPEN_ACCOUNT_STATUSES),
+        )
+        .order_by(BankAccount.id)
+    )
+    async with session_maker() as session:
+        result = await session.execute(stmt)
+        balances = tuple(AccountBalance(*row) for row in result.all())
+    balance_cache.put(user_id, version, balances)
+    return balances
+
+
+class AccountStatusSummary(NamedTuple):
+    status: AccountStatus
+    count: int
+    total: Decimal
+
+
+class AccountListing(NamedTuple):
+    id: int
+    title: str
+    account_number: str
+    balance: Decimal
+    status: AccountStatus
+
+
+class AccountCursor(NamedTuple):
+    """Keyset position in a user's accounts: the last (balance, id) returned."""
+
+    balance: Decimal
+    id: int
+
+    def encode(self) -> str:
+        return f"{self.balance}-{self.id}"
+
+    @classmethod
+    def decode(cls, token: str) -> "AccountCursor":
+        """Raises ValueError for a token that encode() didn't produce."""
+        # rpartition, as the balance may be negative
+        balance, _, account_id = token.strip().rpartition("-")
+        try:
+            return cls(Decimal(balance), int(account_id))
+        except ArithmeticError as e:
+            raise ValueError(f"Invalid account cursor {token!r}") from e
+
+
+async def get_account_summary(user_id: str) -> tuple[AccountStatusSummary, ...]:
+    """Number and total balance of a user's open accounts per status, in one GROUP BY on ix_account_user_status."""
+    stmt = (
+        select(BankAccount.status, func.count(), func.coalesce(func.sum(BankAccount.balance), 0))
+        .where(BankAccount.user_id == user_id, BankAccount.status.in_(_OPEN_ACCOUNT_STATUSES))
+        .group_by(BankAccount.status)
+        .order_by(BankAccount.status)
+    )
+    async with session_maker() as session:
+        result = await session.execute(stmt)
+        return tuple(AccountStatusSummary(*row) for row in result.all())
+
+
+async def get_accounts_page(
+    user_id: str,
+    limit: int,
+    cursor: Optional[AccountCursor] = None,
+) -> tuple[List[AccountListing], Optional[AccountCursor]]:
+    """
+    A user's open accounts, largest balance first, one page at a time.
+
+    Balances aren't indexed, as they change with every transfer, so the
+    database sorts the user's rows found on ix_account_user_status and only
+    the page is sent back. An account whose balance changes between two pages
+    may move across the cursor.
+
+    Returns:
+        The page, and the cursor of the next page or None if this is the last one
+    """
+    stmt = (
+        select(
+            BankAccount.id,
+            BankAccount.title,
+            BankAccount.account_number,
+            BankAccount.balance,
+            BankAccount.status,
+        )
+        .where(BankAccount.user_id == user_id, BankAccount.status.in_(_OPEN_ACCOUNT_STATUSES))
+        .order_by(desc(BankAccount.balance), BankAccount.id)
+        # One extra row tells whether there is a next page
+        .limit(limit + 1)
+    )
+    if cursor:
+        stmt = stmt.where(
+            BankAccount.balance <= cursor.balance,
+            or_(BankAccount.balance < cursor.balance, BankAccount.id > cursor.id),
+        )
+    async with session_maker() as session:
+        result = await session.execute(stmt)
+        accounts = [AccountListing(*row) for row in result.all()]
+
+    if len(accounts) <= limit:
+        return accounts, None
+    accounts = accounts[:limit]
+    return accounts, AccountCursor(accounts[-1].balance, accounts[-1].id)
+
+
 async def create_account(
     account_number: str,
     user_id: str,
@@ -182,25 +498,74 @@ async def create_account(
             title=title,
         )
         session.add(account)
+        await session.flush()
+        if initial_balance:
+            await _post_ledger(
+                session,
+                LedgerEntryType.OPENING_BALANCE,
+                [
+                    LedgerLeg(initial_balance, account_id=account.id),
+                    LedgerLeg(-initial_balance, counterparty=OPENING_BALANCE_COUNTERPARTY),
+                ],
+            )
         await session.commit()
+        balance_cache.invalidate_users(user_id)
+        account_title_indexes.invalidate_users(user_id)
         await session.refresh(account)
         return account
 
 
-async def update_account_balance(
-    account_id: int, new_balance: Decimal
-) -> Optional[BankAccount]:
-    """Update account balance."""
-    async with session_maker() as session:
-        account = await session.get(BankAccount, account_id)
-        if not account:
-            return None
+class InsufficientFunds(Exception):
+    """The account balance doesn't cover the amount as of the write."""
 
-        account.balance = new_balance
-        account.updated_at = datetime.utcnow()
-        await session.commit()
-        await session.refresh(account)
-        return account
+    def __init__(self, available: Decimal):
+        super().__init__(f"Insufficient balance. Available: {available}")
+        self.available = available
+
+
+@dataclass
+class BalanceUpdateStats:
+    attempts: int = 0
+    conflicts: int = 0
+    exhausted: int = 0
+
+
+balance_update_stats = BalanceUpdateStats()
+
+T = TypeVar("T")
+
+
+async def _retry_on_version_conflict(
+    operation: Callable[[], Awaitable[Optional[T]]], description: str
+) -> Optional[T]:
+    """
+    Run a balance-changing DB transaction until it commits without a conflict.
+
+    BankAccount writes are compare-and-swap on its version column, so a flush
+    raises StaleDataError when another writer changed the account after it
+    was read. The whole transaction is then re-run from a fresh read, with a
+    short jittered pause, up to BALANCE_UPDATE_MAX_ATTEMPTS times. Returns
+    None when every attempt conflicted.
+    """
+    for attempt in range(settings.BALANCE_UPDATE_MAX_ATTEMPTS):
+        balance_update_stats.attempts += 1
+        try:
+            return await operation()
+        except StaleDataError:
+            balance_update_stats.conflicts += 1
+            delay = settings.BALANCE_UPDATE_RETRY_BASE_SECONDS * 2**attempt
+            await asyncio.sleep(random.uniform(0, delay))
+
+    balance_update_stats.exhausted += 1
+    logger.warning(f"Gave up on {description} after {settings.BALANCE_UPDATE_MAX_ATTEMPTS} conflicting attempts")
+    return None
+
+
+async def _load_accounts(session, account_ids: Sequence[int]) -> dict[int, BankAccount]:
+    result = await session.execute(
+        select(BankAccount).where(BankAccount.id.in_(set(account_ids)))
+    )
+    return {account.id: account for account in result.scalars()}
 
 
 async def transfer_money_between_accounts(
@@ -208,28 +573,76 @@ async def transfer_money_between_accounts(
     to_account_id: int,
     amount: Decimal,
     call_id: Optional[int] = None,
+    transaction_id: Optional[int] = None,
 ) -> Optional[Transaction]:
-    """Transfer money between accounts."""
-    async with session_maker() as session:
-        from_account = await session.get(BankAccount, from_account_id)
-        to_account = await session.get(BankAccount, to_account_id)
+    """
+    Move money between two accounts and post it to the ledger, in one DB transaction.
+
+    Settles the pending transaction `transaction_id` when given, otherwise
+    records a new completed transfer. No row locks are taken up front: the
+    balance writes are compare-and-swap on the account versions and the
+    transfer is retried on a conflict. Returns None if an account is missing,
+    the pending transaction was already settled, or the accounts stayed
+    contended.
+
+    Raises:
+        InsufficientFunds: The source balance doesn't cover `amount` as of the write
+    """
+
+    async def attempt() -> Optional[Transaction]:
+        now = datetime.utcnow()
+        async with session_maker() as session:
+            accounts = await _load_accounts(session, [from_account_id, to_account_id])
+            from_account = accounts.get(from_account_id)
+            to_account = accounts.get(to_account_id)
+            if not from_account or not to_account:
+                return None
+            if from_account.balance < amount:
+                raise InsufficientFunds(from_account.balance)
+
+            if transaction_id:
+                transaction = await session.get(Transaction, transaction_id)
+                if not transaction or transaction.status != TransactionStatus.PENDING:
+                    return None
+            else:
+                transaction = Transaction(
+                    reference=await transaction_references.next_reference(),
+                    from_account_id=from_account_id,
+                    to_account_id=to_account_id,
+                    amount=amount,
+                    type=TransactionType.TRANSFER,
+                    description=f"Transfer from {from_account.account_number} to {to_account.account_number}",
+                    call_id=call_id,
+                )
+                session.add(transaction)
+
+            await _post_opening_balances(session, accounts)
+            from_account.balance -= amount
+            to_account.balance += amount
+            from_account.updated_at = now
+            to_account.updated_at = now
+            transaction.status = TransactionStatus.COMPLETED
+            transaction.completed_at = now
+            # Raises StaleDataError if either account changed since it was read
+            await session.flush()
+
+            await _post_ledger(
+                session,
+                LedgerEntryType.TRANSFER,
+                [
+                    LedgerLeg(-amount, account_id=from_account_id),
+                    LedgerLeg(amount, account_id=to_account_id),
+                ],
+                transaction_id=transaction.id,
+            )
+            await session.commit()
+            balance_cache.invalidate_users(from_account.user_id, to_account.user_id)
+            await session.refresh(transaction)
+            return transaction
 
-        from_account.balance -= amount
-        to_account.balance += amount
-        from_account.updated_at = datetime.utcnow()
-        to_account.updated_at = datetime.utcnow()
-        await session.commit()
-        await session.refresh(from_account)
-        await session.refresh(to_account)
-        return await create_transaction(
-            reference=f"TRANSFER-{from_account.account_number}-{to_account.account_number}-{amount}-{datetime.utcnow().timestamp()}",
-            amount=amount,
-            transaction_type=TransactionType.TRANSFER,
-            from_account_id=from_account_id,
-            to_account_id=to_account_id,
-            description=f"Transfer from {from_account.account_number} to {to_account.account_number}",
-            call_id=call_id,
-        )
+    return await _retry_on_version_conflict(
+        attempt, f"transfer from account {from_account_id} to {to_account_id}"
+    )
 
 
 # Transaction Repository Functions
@@ -278,6 +691,115 @@ async def get_account_transactions(
         return list(result.scalars().all())
 
 
+class HistoryCursor(NamedTuple):
+    """Keyset position in a transaction history: the last (created_at, id) returned."""
+
+    created_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        return f"{self.created_at.strftime('%Y%m%d%H%M%S%f')}-{self.id}"
+
+    @classmethod
+    def decode(cls, token: str) -> "HistoryCursor":
+        """Raises ValueError for a token that encode() didn't produce."""
+        stamp, _, transaction_id = token.strip().partition("-")
+        return cls(datetime.strptime(stamp, "%Y%m%d%H%M%S%f"), int(transaction_id))
+
+
+def _history_branch(
+    account_column,
+    account_id: int,
+    limit: int,
+    cursor: Optional[HistoryCursor],
+    since: Optional[datetime],
+    until: Optional[datetime],
+):
+    """Newest-first range scan of one (account column, account) pair, on its (account, created_at) index."""
+    stmt = select(Transaction).where(account_column == account_id)
+    if since:
+        stmt = stmt.where(Transaction.created_at >= since)
+    if until:
+        stmt = stmt.where(Transaction.created_at < until)
+    if cursor:
+        # The first bound is what the index scan starts from, the second breaks ties
+        stmt = stmt.where(
+            Transaction.created_at <= cursor.created_at,
+            or_(
+                Transaction.created_at < cursor.created_at,
+                Transaction.id < cursor.id,
+            ),
+        )
+    return stmt.order_by(desc(Transaction.created_at), desc(Transaction.id)).limit(limit)
+
+
+def _transaction_history_statement(
+    account_ids: Sequence[int],
+    limit: int,
+    cursor: Optional[HistoryCursor],
+    since: Optional[datetime],
+    until: Optional[datetime],
+):
+    branches = []
+    for account_id in account_ids:
+        branches.append(
+            _history_branch(Transaction.from_account_id, account_id, limit, cursor, since, until)
+        )
+        branches.append(
+            _history_branch(Transaction.to_account_id, account_id, limit, cursor, since, until).where(
+                or_(
+                    Transaction.from_account_id.is_(None),
+                    Transaction.from_account_id.not_in(list(account_ids)),
+                )
+            )
+        )
+    history = union_all(*branches).subquery("history")
+    entry = aliased(Transaction, history)
+    return select(entry).order_by(desc(entry.created_at), desc(entry.id)).limit(limit)
+
+
+async def get_transaction_history(
+    account_ids: Sequence[int],
+    limit: int = 10,
+    cursor: Optional[HistoryCursor] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> tuple[List[Transaction], Optional[HistoryCursor]]:
+    """
+    Newest-first page of the transactions touching any of `account_ids`.
+
+    Built as a UNION ALL of one LIMITed range scan per account and direction
+    instead of `from_account_id = x OR to_account_id = x`, so every branch
+    reads at most `limit` rows off ix_transaction_from_created /
+    ix_transaction_to_created however large the table is. A transfer between
+    two of the given accounts is only taken from its outgoing side.
+
+    Args:
+        account_ids: Accounts whose history to read, e.g. all of a user's
+        limit: Page size
+        cursor: Position returned with the previous page; None for the first page
+        since: Only transactions created at or after this time
+        until: Only transactions created before this time
+
+    Returns:
+        The page, and the cursor of the next page or None if this is the last one
+    """
+    if not account_ids:
+        return [], None
+
+    # One extra row tells whether there is a next page
+    stmt = _transaction_history_statement(account_ids, limit + 1, cursor, since, until)
+    async with session_maker() as session:
+        result = await session.execute(stmt)
+        transactions = list(result.scalars().all())
+
+    if len(transactions) <= limit:
+        return transactions, None
+    transactions = transactions[:limit]
+    last = transactions[-1]
+    return transactions, HistoryCursor(last.created_at, last.id)
+
+
 async def create_transaction(
     reference: str,
     amount: Decimal,
@@ -327,6 +849,264 @@ async def update_transaction_status(
         return transaction
 
 
+# Ledger Repository Functions
+#
+# bank_accounts.balance stays the balance every read and debit uses: the
+# compare-and-swap on the account version guards it, and the balance cache
+# is filled from it. The ledger is an audit trail of the same writes, and
+# reconcile_ledger checks the two against each other using the snapshots.
+
+OPENING_BALANCE_COUNTERPARTY = "OPENING_BALANCE"
+
+# pg advisory lock key serializing snapshot roll-ups across worker replicas
+_SNAPSHOT_ROLL_LOCK_KEY = 0x1ED6E5
+# The one row of balance_snapshot_cursor
+_SNAPSHOT_CURSOR_ID = 1
+
+
+class LedgerLeg(NamedTuple):
+    # Signed: positive credits the account, negative debits it
+    amount: Decimal
+    account_id: Optional[int] = None
+    counterparty: Optional[str] = None
+
+
+class LedgerReconciliation(NamedTuple):
+    # (account id, bank_accounts.balance, ledger balance)
+    balance_mismatches: list[tuple[int, Decimal, Decimal]]
+    # Postings whose legs don't sum to zero
+    unbalanced_postings: list[int]
+
+    @property
+    def ok(self) -> bool:
+        return not self.balance_mismatches and not self.unbalanced_postings
+
+
+async def _post_ledger(
+    session,
+    entry_type: LedgerEntryType,
+    legs: Sequence[LedgerLeg],
+    transaction_id: Optional[int] = None,
+) -> int:
+    """Append one balanced posting inside the caller's DB transaction. Returns its posting id."""
+    if sum(leg.amount for leg in legs) != 0:
+        raise ValueError(f"Unbalanced ledger posting: {legs}")
+
+    posting_id = await session.scalar(select(LEDGER_POSTING_SEQUENCE.next_value()))
+    now = datetime.utcnow()
+    await session.execute(
+        insert(LedgerEntry),
+        [
+            {
+                "posting_id": posting_id,
+                "account_id": leg.account_id,
+                "counterparty": leg.counterparty,
+                "transaction_id": transaction_id,
+                "amount": leg.amount,
+                "type": entry_type,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for leg in legs
+        ],
+    )
+    return posting_id
+
+
+def _opening_balances_insert(accounts):
+    """
+    INSERT posting an opening balance for every account in the `accounts` CTE.
+
+    Each account gets its own posting: a credit on the account and the
+    matching debit on the opening-balance counterparty.
+    """
+    now = datetime.utcnow()
+    entry_type = literal(LedgerEntryType.OPENING_BALANCE, LedgerEntry.__table__.c.type.type)
+    columns = ["posting_id", "account_id", "counterparty", "amount", "type", "created_at", "updated_at"]
+    account_legs = select(
+        accounts.c.posting_id,
+        accounts.c.id,
+        literal(None, String),
+        accounts.c.balance,
+        entry_type,
+        literal(now),
+        literal(now),
+    )
+    counter_legs = select(
+        accounts.c.posting_id,
+        literal(None, BigInteger),
+        literal(OPENING_BALANCE_COUNTERPARTY),
+        -accounts.c.balance,
+        entry_type,
+        literal(now),
+        literal(now),
+    )
+    return insert(LedgerEntry).from_select(columns, account_legs.union_all(counter_legs))
+
+
+def _unledgered_accounts():
+    """Accounts with a balance that have never been posted to the ledger."""
+    return select(
+        BankAccount.id,
+        BankAccount.balance,
+        LEDGER_POSTING_SEQUENCE.next_value().label("posting_id"),
+    ).where(
+        BankAccount.balance != 0,
+        ~select(LedgerEntry.id).where(LedgerEntry.account_id == BankAccount.id).exists(),
+    )
+
+
+async def _post_opening_balances(session, accounts: dict[int, BankAccount]):
+    """
+    Post opening balances for locked accounts that aren't in the ledger yet.
+
+    Accounts created outside the backend (e.g. by the dashboard) start with a
+    balance but no entries; posting it before the first movement keeps their
+    ledger balance equal to the account balance.
+    """
+    unledgered = _unledgered_accounts().where(BankAccount.id.in_(list(accounts))).cte("accounts")
+    await session.execute(_opening_balances_insert(unledgered))
+
+
+async def post_opening_balances(batch_size: int) -> int:
+    """Post opening balances for up to `batch_size` accounts missing from the ledger. Returns accounts posted."""
+    unledgered = (
+        _unledgered_accounts()
+        .order_by(BankAccount.id)
+        .limit(batch_size)
+        .with_for_update(of=BankAccount, skip_locked=True)
+        .cte("accounts")
+    )
+    async with session_maker() as session:
+        result = await session.execute(_opening_balances_insert(unledgered))
+        await session.commit()
+        return result.rowcount // 2
+
+
+async def roll_balance_snapshots(settled_before: datetime, batch_size: int) -> int:
+    """
+    Fold up to `batch_size` more ledger entries into the balance snapshots.
+
+    Entries are consumed in id order from the balance snapshot cursor, and
+    only up to the newest entry created before `settled_before`, so an entry
+    whose transaction is still open is never skipped. The cursor moves past
+    every consumed entry, counterparty legs included, in the same
+    transaction as the snapshots. Returns entries consumed.
+    """
+    horizon = (
+        select(func.max(LedgerEntry.id))
+        .where(LedgerEntry.created_at <= settled_before)
+        .scalar_subquery()
+    )
+
+    async with session_maker() as session:
+        if not await session.scalar(select(func.pg_try_advisory_xact_lock(_SNAPSHOT_ROLL_LOCK_KEY))):
+            return 0
+
+        cursor = await session.scalar(
+            select(BalanceSnapshotCursor.last_entry_id).where(
+                BalanceSnapshotCursor.id == _SNAPSHOT_CURSOR_ID
+            )
+        )
+        batch = (
+            select(LedgerEntry.id)
+            .where(LedgerEntry.id > (cursor or 0), LedgerEntry.id <= horizon)
+            .order_by(LedgerEntry.id)
+            .limit(batch_size)
+            .subquery()
+        )
+        bounds = (await session.execute(select(func.count(), func.min(batch.c.id), func.max(batch.c.id)))).one()
+        consumed, first_id, last_id = bounds
+        if not consumed:
+            return 0
+
+        now = datetime.utcnow()
+        # The per-account last_entry_id check makes re-reading a range harmless
+        deltas = (
+            select(
+                LedgerEntry.account_id,
+                func.sum(LedgerEntry.amount),
+                func.max(LedgerEntry.id),
+                literal(now),
+                literal(now),
+            )
+            .outerjoin(
+                AccountBalanceSnapshot,
+                AccountBalanceSnapshot.account_id == LedgerEntry.account_id,
+            )
+            .where(
+                LedgerEntry.id.between(first_id, last_id),
+                LedgerEntry.account_id.is_not(None),
+                LedgerEntry.id > func.coalesce(AccountBalanceSnapshot.last_entry_id, 0),
+            )
+            .group_by(LedgerEntry.account_id)
+        )
+        stmt = pg_insert(AccountBalanceSnapshot).from_select(
+            ["account_id", "balance", "last_entry_id", "created_at", "updated_at"], deltas
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AccountBalanceSnapshot.account_id],
+            set_={
+                "balance": AccountBalanceSnapshot.balance + stmt.excluded.balance,
+                "last_entry_id": stmt.excluded.last_entry_id,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await session.execute(stmt)
+
+        advance = pg_insert(BalanceSnapshotCursor).values(
+            id=_SNAPSHOT_CURSOR_ID, last_entry_id=last_id, created_at=now, updated_at=now
+        )
+        advance = advance.on_conflict_do_update(
+            index_elements=[BalanceSnapshotCursor.id],
+            set_={"last_entry_id": advance.excluded.last_entry_id, "updated_at": advance.excluded.updated_at},
+        )
+        await session.execute(advance)
+        await session.commit()
+        return consumed
+
+
+async def reconcile_ledger() -> LedgerReconciliation:
+    """
+    Set-based consistency check of the ledger.
+
+    Compares every account balance with its ledger balance (snapshot plus
+    later entries, aggregated in one pass) and finds postings whose legs
+    don't sum to zero.
+    """
+    deltas = (
+        select(LedgerEntry.account_id, func.sum(LedgerEntry.amount).label("delta"))
+        .outerjoin(
+            AccountBalanceSnapshot,
+            AccountBalanceSnapshot.account_id == LedgerEntry.account_id,
+        )
+        .where(
+            LedgerEntry.account_id.is_not(None),
+            LedgerEntry.id > func.coalesce(AccountBalanceSnapshot.last_entry_id, 0),
+        )
+        .group_by(LedgerEntry.account_id)
+        .subquery()
+    )
+    ledger_balance = func.coalesce(AccountBalanceSnapshot.balance, 0) + func.coalesce(deltas.c.delta, 0)
+    mismatches = (
+        select(BankAccount.id, BankAccount.balance, ledger_balance)
+        .outerjoin(AccountBalanceSnapshot, AccountBalanceSnapshot.account_id == BankAccount.id)
+        .outerjoin(deltas, deltas.c.account_id == BankAccount.id)
+        .where(BankAccount.balance != ledger_balance)
+        .order_by(BankAccount.id)
+    )
+    unbalanced = (
+        select(LedgerEntry.posting_id)
+        .group_by(LedgerEntry.posting_id)
+        .having(func.sum(LedgerEntry.amount) != 0)
+        .order_by(LedgerEntry.posting_id)
+    )
+    async with session_maker() as session:
+        balance_mismatches = [tuple(row) for row in (await session.execute(mismatches)).all()]
+        unbalanced_postings = list((await session.execute(unbalanced)).scalars().all())
+        return LedgerReconciliation(balance_mismatches, unbalanced_postings)
+
+
 # Call Transcription Repository Functions
 
 
@@ -411,25 +1191,105 @@ async def get_outstanding_bills(user_id: str) -> List[Bill]:
         return list(result.scalars().all())
 
 
-async def get_outstanding_bill_by_type(
-    user_id: str, bill_type: BillType
-) -> Optional[Bill]:
-    """Get an outstanding bill of a specific type for a user."""
+class OutstandingBill(NamedTuple):
+    id: int
+    type: BillType
+    amount: Decimal
+    due_date: datetime
+    status: BillStatus
+    description: Optional[str] = None
+
+
+# Spelled as ix_bill_user_outstanding_due's predicate: with bound values, a
+# prepared statement's generic plan couldn't prove it implies the predicate
+_OUTSTANDING_BILL = text("bills.status IN ('PENDING', 'OVERDUE')")
+
+
+class BillTypeSummary(NamedTuple):
+    type: BillType
+    count: int
+    total: Decimal
+    earliest_due_date: datetime
+    overdue: int
+
+
+class BillCursor(NamedTuple):
+    """Keyset position in a user's outstanding bills: the last (due_date, id) returned."""
+
+    due_date: datetime
+    id: int
+
+    def encode(self) -> str:
+        return f"{self.due_date.strftime('%Y%m%d%H%M%S%f')}-{self.id}"
+
+    @classmethod
+    def decode(cls, token: str) -> "BillCursor":
+        """Raises ValueError for a token that encode() didn't produce."""
+        stamp, _, bill_id = token.strip().partition("-")
+        return cls(datetime.strptime(stamp, "%Y%m%d%H%M%S%f"), int(bill_id))
+
+
+async def get_outstanding_bill_summary(user_id: str) -> tuple[BillTypeSummary, ...]:
+    """
+    Count, total and earliest due date of a user's outstanding bills per type,
+    soonest due first.
+
+    Aggregated in one GROUP BY over ix_bill_user_outstanding_due, so the cost
+    of a summary doesn't grow with the rows sent back however many bills the
+    user has.
+    """
+    earliest_due_date = func.min(Bill.due_date)
+    stmt = (
+        select(
+            Bill.type,
+            func.count(),
+            func.sum(Bill.amount),
+            earliest_due_date,
+            func.count().filter(Bill.status == BillStatus.OVERDUE),
+        )
+        .where(Bill.user_id == user_id, _OUTSTANDING_BILL)
+        .group_by(Bill.type)
+        .order_by(earliest_due_date, Bill.type)
+    )
     async with session_maker() as session:
-        stmt = (
-            select(Bill)
-            .where(Bill.user_id == user_id)
-            .where(Bill.type == bill_type)
-            .where(
-                or_(
-                    Bill.status == BillStatus.PENDING, Bill.status == BillStatus.OVERDUE
-                )
-            )
-            .order_by(Bill.due_date)
-            .limit(1)
+        result = await session.execute(stmt)
+        return tuple(BillTypeSummary(*row) for row in result.all())
+
+
+async def get_outstanding_bills_page(
+    user_id: str,
+    limit: int,
+    cursor: Optional[BillCursor] = None,
+) -> tuple[List[OutstandingBill], Optional[BillCursor]]:
+    """
+    A user's outstanding bills, soonest due first, one page at a time.
+
+    A range scan of ix_bill_user_outstanding_due that stops after `limit`
+    rows, starting after `cursor`.
+
+    Returns:
+        The page, and the cursor of the next page or None if this is the last one
+    """
+    stmt = (
+        select(Bill.id, Bill.type, Bill.amount, Bill.due_date, Bill.status, Bill.description)
+        .where(Bill.user_id == user_id, _OUTSTANDING_BILL)
+        .order_by(Bill.due_date, Bill.id)
+        # One extra row tells whether there is a next page
+        .limit(limit + 1)
+    )
+    if cursor:
+        stmt = stmt.where(
+            Bill.due_date >= cursor.due_date,
+            or_(Bill.due_date > cursor.due_date, Bill.id > cursor.id),
         )
+    async with session_maker() as session:
         result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+        bills = [OutstandingBill(*row) for row in result.all()]
+
+    if len(bills) <= limit:
+        return bills, None
+    bills = bills[:limit]
+    return bills, BillCursor(bills[-1].due_date, bills[-1].id)
 
 
 async def create_bill(
@@ -455,49 +1315,289 @@ async def create_bill(
         return bill
 
 
-async def pay_bill(
-    bill_id: int,
-    from_account_id: int,
-    transaction_id: int,
-) -> Optional[Bill]:
-    """Mark a bill as paid."""
-    async with session_maker() as session:
-        bill = await session.get(Bill, bill_id)
-        if not bill:
-            return None
+class BillPayment(NamedTuple):
+    """What pay_outstanding_bills found and did; fields it didn't get to are None."""
 
-        bill.status = BillStatus.PAID
-        bill.paid_from_account_id = from_account_id
-        bill.transaction_id = transaction_id
-        bill.paid_at = datetime.utcnow()
-        bill.updated_at = datetime.utcnow()
+    account_found: bool
+    account_status: Optional[AccountStatus] = None
+    # Balance the payment was checked against, before any debit
+    available: Optional[Decimal] = None
+    bills: tuple[OutstandingBill, ...] = ()
+    paid: bool = False
 
-        await session.commit()
-        await session.refresh(bill)
-        return bill
+    @property
+    def total(self) -> Decimal:
+        return sum((bill.amount for bill in self.bills), Decimal("0.00"))
+
+
+def _pay_bills_statement(
+    user_id: str,
+    account_id: int,
+    bill_types: Optional[Sequence[BillType]],
+    limit: Optional[int],
+    call_id: Optional[int],
+    now: datetime,
+    reference_base: int,
+):
+    """
+    Bill payment as one data-modifying CTE.
+
+    Locks the selected outstanding bills, debits their total from the account
+    if it covers it, records a completed withdrawal per bill, marks the bills
+    paid and posts one ledger posting per bill against its biller. The debit
+    is compare-and-swap on the account version read in the statement's
+    snapshot, like confirm_transfer. Each bill's transaction reference is
+    `reference_base` (a block from transaction_references) plus its row
+    number, so at most REFERENCE_BLOCK_SIZE bills can be selected.
+    """
+    account = (
+        select(BankAccount.id, BankAccount.status, BankAccount.balance, BankAccount.version)
+        .where(BankAccount.id == account_id, BankAccount.user_id == user_id)
+        .cte("account")
+    )
+    type_name = cast(Bill.type, String)
+    outstanding = select(
+        Bill.id,
+        Bill.type,
+        Bill.amount,
+        Bill.due_date,
+        Bill.status,
+        ("BILLER:" + type_name).label("counterparty"),
+        ("Payment for " + type_name + " bill").label("description"),
+    ).where(
+        Bill.user_id == user_id,
+        Bill.status.in_([BillStatus.PENDING, BillStatus.OVERDUE]),
+    )
+    if bill_types is not None:
+        outstanding = outstanding.where(Bill.type.in_(list(bill_types)))
+    locked = outstanding.order_by(Bill.due_date, Bill.id).limit(limit).with_for_update(of=Bill).cte("locked_bills")
+    # Numbered outside the locking select, which can't have window functions
+    row_offset = func.row_number().over(order_by=(locked.c.due_date, locked.c.id)) - 1
+    bills = select(
+        *locked.c,
+        func.lpad(func.to_hex(literal(reference_base, BigInteger) + row_offset), 16, "0").label("reference"),
+    ).cte("selected_bills")
+    total = select(func.sum(bills.c.amount)).scalar_subquery()
+
+    debit = (
+        update(BankAccount)
+        .where(
+            BankAccount.id == account.c.id,
+            BankAccount.version == account.c.version,
+            BankAccount.status == AccountStatus.ACTIVE,
+            BankAccount.balance >= total,
+        )
+        .values(
+            balance=BankAccount.balance - total,
+            version=BankAccount.version + 1,
+            updated_at=now,
+        )
+        .returning(BankAccount.id)
+        .cte("debit")
+    )
+    debited = select(debit.c.id).exists()
+    transactions = (
+        insert(Transaction)
+        .from_select(
+            [
+                "reference",
+                "from_account_id",
+                "amount",
+                "type",
+                "status",
+                "description",
+                "call_id",
+                "created_at",
+                "updated_at",
+                "completed_at",
+            ],
+            select(
+                bills.c.reference,
+                account.c.id,
+                bills.c.amount,
+                literal(TransactionType.WITHDRAWAL, Transaction.__table__.c.type.type),
+                literal(TransactionStatus.COMPLETED, Transaction.__table__.c.status.type),
+                bills.c.description,
+                literal(call_id, BigInteger),
+                literal(now),
+                literal(now),
+                literal(now),
+            ).where(debited),
+        )
+        .returning(Transaction.id, Transaction.reference)
+        .cte("bill_transactions")
+    )
+    paid = (
+        update(Bill)
+        .where(Bill.id == bills.c.id, transactions.c.reference == bills.c.reference)
+        .values(
+            status=BillStatus.PAID,
+            paid_from_account_id=account.c.id,
+            transaction_id=transactions.c.id,
+            paid_at=now,
+            updated_at=now,
+        )
+        .returning(Bill.id, Bill.transaction_id)
+        .cte("paid")
+    )
+
+    # Ledger: the account's opening balance if it has none yet (the snapshot
+    # still has the balance from before the debit), then a posting per bill
+    unledgered = (
+        _unledgered_accounts()
+        .where(BankAccount.id == select(account.c.id).scalar_subquery(), debited)
+        .cte("unledgered")
+    )
+    opening = _opening_balances_insert(unledgered).cte("opening")
+    postings = (
+        select(
+            paid.c.transaction_id,
+            bills.c.amount,
+            bills.c.counterparty,
+            LEDGER_POSTING_SEQUENCE.next_value().label("posting_id"),
+        )
+        .join(bills, bills.c.id == paid.c.id)
+        .cte("postings")
+    )
+    entry_type = literal(LedgerEntryType.BILL_PAYMENT, LedgerEntry.__table__.c.type.type)
+    legs = select(
+        postings.c.posting_id,
+        account.c.id,
+        literal(None, String),
+        -postings.c.amount,
+        entry_type,
+        postings.c.transaction_id,
+        literal(now),
+        literal(now),
+    ).union_all(
+        select(
+            postings.c.posting_id,
+            literal(None, BigInteger),
+            postings.c.counterparty,
+            postings.c.amount,
+            entry_type,
+            postings.c.transaction_id,
+            literal(now),
+            literal(now),
+        )
+    )
+    ledger = (
+        insert(LedgerEntry)
+        .from_select(
+            ["posting_id", "account_id", "counterparty", "amount", "type", "transaction_id", "created_at", "updated_at"],
+            legs,
+        )
+        .cte("ledger")
+    )
+
+    return (
+        select(
+            account.c.status,
+            account.c.balance,
+            bills.c.id,
+            bills.c.type,
+            bills.c.amount,
+            bills.c.due_date,
+            bills.c.status,
+            select(func.count()).select_from(paid).scalar_subquery(),
+        )
+        .select_from(account)
+        .outerjoin(bills, true())
+        .order_by(bills.c.due_date, bills.c.id)
+        .add_cte(opening, ledger)
+    )
+
+
+async def pay_outstanding_bills(
+    user_id: str,
+    account_id: int,
+    bill_types: Optional[Sequence[BillType]] = None,
+    limit: Optional[int] = None,
+    call_id: Optional[int] = None,
+) -> Optional[BillPayment]:
+    """
+    Pay a user's outstanding bills from one of their accounts, in a single statement.
+
+    Pays the oldest `limit` outstanding bills of `bill_types` (all when None)
+    together, or none of them if the account is inactive or its balance
+    doesn't cover the total. At most REFERENCE_BLOCK_SIZE bills are paid at
+    once. Returns None when the account stayed contended.
+    """
+    limit = min(limit or REFERENCE_BLOCK_SIZE, REFERENCE_BLOCK_SIZE)
+
+    async def attempt() -> BillPayment:
+        async with session_maker() as session:
+            statement = _pay_bills_statement(
+                user_id,
+                account_id,
+                bill_types,
+                limit,
+                call_id,
+                datetime.utcnow(),
+                await transaction_references.reserve_block(),
+            )
+            rows = (await session.execute(statement)).all()
+            if not rows:
+                return BillPayment(account_found=False)
+
+            account_status, available = rows[0][0], rows[0][1]
+            bills = tuple(OutstandingBill(*row[2:7]) for row in rows if row[2] is not None)
+            payment = BillPayment(
+                account_found=True,
+                account_status=account_status,
+                available=available,
+                bills=bills,
+                paid=bool(bills) and rows[0][7] == len(bills),
+            )
+            payable = bills and account_status == AccountStatus.ACTIVE and available >= payment.total
+            if payable and not payment.paid:
+                # The account changed after the snapshot; roll back and re-run
+                raise StaleDataError(f"Account {account_id} of user {user_id} changed during bill payment")
+
+            await session.commit()
+            if payment.paid:
+                balance_cache.invalidate_users(user_id)
+            return payment
+
+    return await _retry_on_version_conflict(attempt, f"paying bills of user {user_id}")
 
 
 # Extended Account Management Functions
 
 
-async def get_account_by_title_and_user(
-    title: str, user_id: str
-) -> Optional[BankAccount]:
-    """Get a bank account by title for a specific user."""
+async def get_account_title_index(user_id: str) -> AccountTitleIndex:
+    """Index of a user's account titles for fuzzy matching, from the cache or one query."""
+    index = account_title_indexes.get(user_id)
+    if index is not None:
+        return index
+
+    generation = account_title_indexes.generation
+    stmt = (
+        select(BankAccount.id, BankAccount.title, BankAccount.status, BankAccount.account_number)
+        .where(BankAccount.user_id == user_id)
+        .order_by(BankAccount.id)
+    )
     async with session_maker() as session:
-        stmt = select(BankAccount).where(
-            and_(BankAccount.title == title, BankAccount.user_id == user_id)
-        )
         result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+        index = AccountTitleIndex(result.all())
+    account_title_indexes.put(user_id, generation, index)
+    return index
 
 
 async def get_user_by_phone_number(phone_number: str) -> Optional[str]:
-    """Get user_id by phone number from the calls table (as a proxy for user lookup)."""
+    """Get the user a phone number, in any format, belongs to from the phone directory."""
+    normalized = normalize_phone_number(phone_number)
+    if not normalized:
+        return None
+    user_id = phone_directory_cache.get(normalized)
+    if user_id:
+        return user_id
     async with session_maker() as session:
-        stmt = select(Call.user_id).where(Call.phone_number == phone_number).limit(1)
-        result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+        stmt = select(PhoneDirectoryEntry.user_id).where(PhoneDirectoryEntry.phone_number == normalized)
+        user_id = await session.scalar(stmt)
+    if user_id:
+        phone_directory_cache.put(normalized, user_id)
+    return user_id
 
 
 async def get_default_account_for_user(user_id: str) -> Optional[BankAccount]:
@@ -521,28 +1621,67 @@ async def get_default_account_for_user(user_id: str) -> Optional[BankAccount]:
 async def close_account(
     account_id: int,
     transfer_to_account_id: Optional[int] = None,
+    call_id: Optional[int] = None,
 ) -> Optional[BankAccount]:
-    """Close a bank account, optionally transferring remaining balance."""
-    async with session_maker() as session:
-        account = await session.get(BankAccount, account_id)
-        if not account:
-            return None
-
-        # If there's a balance and a transfer account is specified
-        if account.balance > 0 and transfer_to_account_id:
-            transfer_account = await session.get(BankAccount, transfer_to_account_id)
-            if transfer_account:
-                transfer_account.balance += account.balance
-                transfer_account.updated_at = datetime.utcnow()
+    """
+    Close a bank account, optionally sweeping its remaining balance.
+
+    The sweep is recorded as a completed transfer and posted to the ledger in
+    the same DB transaction that closes the account, retried if either
+    account changes concurrently.
+    """
+
+    async def attempt() -> Optional[BankAccount]:
+        now = datetime.utcnow()
+        async with session_maker() as session:
+            account_ids = [account_id] + ([transfer_to_account_id] if transfer_to_account_id else [])
+            accounts = await _load_accounts(session, account_ids)
+            account = accounts.get(account_id)
+            if not account:
+                return None
+
+            transfer_account = accounts.get(transfer_to_account_id)
+            if account.balance > 0 and transfer_account:
+                await _post_opening_balances(session, accounts)
+                amount = account.balance
+                transaction = Transaction(
+                    reference=await transaction_references.next_reference(),
+                    from_account_id=account.id,
+                    to_account_id=transfer_account.id,
+                    amount=amount,
+                    type=TransactionType.TRANSFER,
+                    status=TransactionStatus.COMPLETED,
+                    description=f"Closing balance of {account.account_number} moved to {transfer_account.account_number}",
+                    call_id=call_id,
+                    completed_at=now,
+                )
+                session.add(transaction)
+                transfer_account.balance += amount
+                transfer_account.updated_at = now
                 account.balance = Decimal("0.00")
+                await session.flush()
+
+                await _post_ledger(
+                    session,
+                    LedgerEntryType.ACCOUNT_CLOSURE,
+                    [
+                        LedgerLeg(-amount, account_id=account.id),
+                        LedgerLeg(amount, account_id=transfer_account.id),
+                    ],
+                    transaction_id=transaction.id,
+                )
 
-        account.status = AccountStatus.CLOSED
-        account.closed_at = datetime.utcnow()
-        account.updated_at = datetime.utcnow()
+            account.status = AccountStatus.CLOSED
+            account.closed_at = now
+            account.updated_at = now
 
-        await session.commit()
-        await session.refresh(account)
-        return account
+            await session.commit()
+            balance_cache.invalidate_users(account.user_id)
+            account_title_indexes.invalidate_users(account.user_id)
+            await session.refresh(account)
+            return account
+
+    return await _retry_on_version_conflict(attempt, f"closing account {account_id}")
 
 
 async def update_account_status(
@@ -558,25 +1697,14 @@ async def update_account_status(
         account.updated_at = datetime.utcnow()
 
         await session.commit()
+        balance_cache.invalidate_users(account.user_id)
         await session.refresh(account)
         return account
 
 
 async def generate_account_number() -> str:
-    """Generate a unique account number."""
-    import random
-    import string
-
-    async with session_maker() as session:
-        while True:
-            # Generate a 12-digit account number
-            account_number = "".join(random.choices(string.digits, k=12))
-            stmt = select(BankAccount).where(
-                BankAccount.account_number == account_number
-            )
-            result = await session.execute(stmt)
-            if not result.scalar_one_or_none():
-                return account_number
+    """Allocate a unique account number, usually without touching the DB (see infrastructure.account_numbers)."""
+    return await account_number_allocator.allocate()
 
 
 # OTP Repository Functions
@@ -584,62 +1712,88 @@ async def generate_account_number() -> str:
 
 async def generate_otp_token() -> str:
     """Generate a 6-digit OTP token."""
-    import random
-    return "".join(random.choices("0123456789", k=6))
+    return "".join(secrets.choice("0123456789") for _ in range(6))
+
+
+def hash_otp_token(user_id: str, token: str) -> str:
+    """
+    What an OTP token is stored and looked up as.
+
+    Keyed with OTP_HASH_KEY, since a plain hash of six digits is reversed by
+    trying all million of them, and salted with the user so equal tokens of
+    different users hash differently.
+    """
+    message = f"{user_id}:{token}".encode()
+    return hmac.new(settings.OTP_HASH_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+class IssuedOTP(NamedTuple):
+    """A newly issued OTP; the plaintext token exists only here, to be read out to the user."""
+
+    id: int
+    token: str
+    transaction_id: Optional[int]
+    expires_at: datetime
+
+
+def _issue_otp_statement(user_id: str, token_hash: str, transaction_id: Optional[int], now: datetime, expires_at: datetime):
+    """
+    Expires the user's pending OTPs and inserts the new one, in one statement.
+
+    The insert skips, returning nothing, when a concurrent issuance committed
+    a pending OTP after this statement's snapshot (ux_otp_user_pending).
+    """
+    expired = (
+        update(OTP)
+        .where(OTP.user_id == user_id, OTP.status == OTPStatus.PENDING)
+        .values(status=OTPStatus.EXPIRED, updated_at=now)
+        .returning(OTP.id)
+        .cte("expired")
+    )
+    # Selecting from `expired` makes the expiry run before the insert; an
+    # unreferenced CTE could run after it and leave the old OTP conflicting
+    new_otp = select(
+        literal(user_id),
+        literal(token_hash),
+        literal(transaction_id, BigInteger),
+        literal(OTPStatus.PENDING, OTP.__table__.c.status.type),
+        literal(expires_at),
+        literal(now),
+        literal(now),
+    ).where(select(func.count()).select_from(expired).scalar_subquery() >= 0)
+    return (
+        pg_insert(OTP)
+        .from_select(
+            ["user_id", "token_hash", "transaction_id", "status", "expires_at", "created_at", "updated_at"],
+            new_otp,
+        )
+        # Inline predicate: a bound parameter can't be matched to the partial index
+        .on_conflict_do_nothing(index_elements=[OTP.user_id], index_where=text("status = 'PENDING'"))
+        .returning(OTP.id)
+    )
 
 
 async def create_otp(
     user_id: str,
-    transaction_id: int,
+    transaction_id: Optional[int],
     expires_in_minutes: int = 5,
-) -> OTP:
-    """Create a new OTP for a pending transaction."""
-    from datetime import timedelta
-    
-    async with session_maker() as session:
-        # Expire any existing pending OTPs for this user
-        stmt = (
-            select(OTP)
-            .where(OTP.user_id == user_id)
-            .where(OTP.status == OTPStatus.PENDING)
-        )
-        result = await session.execute(stmt)
-        existing_otps = result.scalars().all()
-        for existing_otp in existing_otps:
-            existing_otp.status = OTPStatus.EXPIRED
-            existing_otp.updated_at = datetime.utcnow()
-        
-        # Create new OTP
-        token = await generate_otp_token()
-        expires_at = datetime.utcnow() + timedelta(minutes=expires_in_minutes)
-        
-        otp = OTP(
-            user_id=user_id,
-            token=token,
-            transaction_id=transaction_id,
-            status=OTPStatus.PENDING,
-            expires_at=expires_at,
-        )
-        session.add(otp)
-        await session.commit()
-        await session.refresh(otp)
-        return otp
-
-
-async def get_pending_otp_by_user(user_id: str) -> Optional[OTP]:
-    """Get the current pending OTP for a user."""
-    async with session_maker() as session:
-        stmt = (
-            select(OTP)
-            .where(OTP.user_id == user_id)
-            .where(OTP.status == OTPStatus.PENDING)
-            .where(OTP.expires_at > datetime.utcnow())
-            .options(selectinload(OTP.transaction))
-            .order_by(desc(OTP.created_at))
-            .limit(1)
-        )
-        result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+) -> IssuedOTP:
+    """
+    Issue a new OTP for a pending transaction, expiring the user's pending ones.
+
+    Only the token's hash is stored. Of concurrent issuances for one user the
+    last to commit wins; the others re-run against its OTP and expire it.
+    """
+    token = await generate_otp_token()
+    token_hash = hash_otp_token(user_id, token)
+    while True:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(minutes=expires_in_minutes)
+        async with session_maker() as session:
+            otp_id = await session.scalar(_issue_otp_statement(user_id, token_hash, transaction_id, now, expires_at))
+            await session.commit()
+        if otp_id is not None:
+            return IssuedOTP(otp_id, token, transaction_id, expires_at)
 
 
 async def get_otps_by_user(
@@ -661,41 +1815,370 @@ async def get_otps_by_user(
 
 
 async def verify_and_use_otp(user_id: str, token: str) -> Optional[OTP]:
-    """Verify OTP token and mark it as used. Returns the OTP if valid, None otherwise."""
-    async with session_maker() as session:
-        stmt = (
-            select(OTP)
-            .where(OTP.user_id == user_id)
-            .where(OTP.token == token)
-            .where(OTP.status == OTPStatus.PENDING)
-            .where(OTP.expires_at > datetime.utcnow())
-            .options(selectinload(OTP.transaction))
+    """
+    Verify an OTP token and mark it as used, in a single UPDATE ... RETURNING.
+
+    Returns the OTP if the token matched a pending, unexpired OTP of the user,
+    None otherwise. Of concurrent verifications of one token only one gets it.
+    """
+    now = datetime.utcnow()
+    stmt = (
+        update(OTP)
+        .where(
+            OTP.user_id == user_id,
+            OTP.token_hash == hash_otp_token(user_id, token),
+            OTP.status == OTPStatus.PENDING,
+            OTP.expires_at > now,
         )
-        result = await session.execute(stmt)
-        otp = result.scalar_one_or_none()
-        
-        if not otp:
-            return None
-        
-        otp.status = OTPStatus.USED
-        otp.used_at = datetime.utcnow()
-        otp.updated_at = datetime.utcnow()
-        
+        .values(status=OTPStatus.USED, used_at=now, updated_at=now)
+        .returning(OTP)
+        .execution_options(synchronize_session=False)
+    )
+    async with session_maker() as session:
+        otp = await session.scalar(stmt)
         await session.commit()
-        await session.refresh(otp)
         return otp
 
 
-async def expire_otp(otp_id: int) -> Optional[OTP]:
-    """Mark an OTP as expired."""
+class TransferConfirmation(NamedTuple):
+    """What confirm_transfer found and did; fields it didn't get to are None."""
+
+    # False when the token didn't match a pending, unexpired OTP of the user
+    otp_found: bool
+    transaction_id: Optional[int] = None
+    # Transaction status before and after the confirmation
+    previous_status: Optional[TransactionStatus] = None
+    status: Optional[TransactionStatus] = None
+    amount: Optional[Decimal] = None
+    from_account_id: Optional[int] = None
+    to_account_id: Optional[int] = None
+    from_account_title: Optional[str] = None
+    to_account_title: Optional[str] = None
+    # Source balance the confirmation was checked against
+    available: Optional[Decimal] = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status == TransactionStatus.COMPLETED
+
+
+def _confirm_transfer_statement(user_id: str, token: str, now: datetime):
+    """
+    The whole OTP confirmation as one data-modifying CTE.
+
+    All parts see the same snapshot. The balance updates are compare-and-swap
+    on the account versions read in that snapshot, so when another writer got
+    in first they update nothing instead of acting on stale balances.
+    """
+    otp = (
+        select(OTP.id, OTP.transaction_id)
+        .where(
+            OTP.user_id == user_id,
+            OTP.token_hash == hash_otp_token(user_id, token),
+            OTP.status == OTPStatus.PENDING,
+            OTP.expires_at > now,
+        )
+        .cte("otp")
+    )
+    txn = (
+        select(
+            Transaction.id,
+            Transaction.status,
+            Transaction.amount,
+            Transaction.from_account_id,
+            Transaction.to_account_id,
+        )
+        .join(otp, Transaction.id == otp.c.transaction_id)
+        .cte("txn")
+    )
+    src = (
+        select(BankAccount.id, BankAccount.user_id, BankAccount.title, BankAccount.balance, BankAccount.version)
+        .join(txn, BankAccount.id == txn.c.from_account_id)
+        .cte("src")
+    )
+    dst = (
+        select(BankAccount.id, BankAccount.user_id, BankAccount.title, BankAccount.version)
+        .join(txn, BankAccount.id == txn.c.to_account_id)
+        .cte("dst")
+    )
+
+    used_otp = (
+        update(OTP)
+        .where(OTP.id == otp.c.id, OTP.status == OTPStatus.PENDING)
+        .values(status=OTPStatus.USED, used_at=now, updated_at=now)
+        .returning(OTP.id)
+        .cte("used_otp")
+    )
+    debit = (
+        update(BankAccount)
+        .where(
+            BankAccount.id == src.c.id,
+            BankAccount.version == src.c.version,
+            BankAccount.balance >= txn.c.amount,
+            txn.c.status == TransactionStatus.PENDING,
+            dst.c.id != src.c.id,
+            select(used_otp.c.id).exists(),
+        )
+        .values(
+            balance=BankAccount.balance - txn.c.amount,
+            version=BankAccount.version + 1,
+            updated_at=now,
+        )
+        .returning(BankAccount.id)
+        .cte("debit")
+    )
+    credit = (
+        update(BankAccount)
+        .where(
+            BankAccount.id == txn.c.to_account_id,
+            BankAccount.version == dst.c.version,
+            select(debit.c.id).exists(),
+        )
+        .values(
+            balance=BankAccount.balance + txn.c.amount,
+            version=BankAccount.version + 1,
+            updated_at=now,
+        )
+        .returning(BankAccount.id)
+        .cte("credit")
+    )
+    moved = select(credit.c.id).exists()
+    status_type = Transaction.__table__.c.status.type
+    settle = (
+        update(Transaction)
+        .where(
+            Transaction.id == txn.c.id,
+            Transaction.status == TransactionStatus.PENDING,
+            select(used_otp.c.id).exists(),
+        )
+        .values(
+            status=case(
+                (moved, literal(TransactionStatus.COMPLETED, status_type)),
+                else_=literal(TransactionStatus.FAILED, status_type),
+            ),
+            completed_at=case((moved, now), else_=None),
+        )
+        .returning(Transaction.status)
+        .cte("settle")
+    )
+
+    # Ledger: opening balances first (the snapshot still has the balances
+    # from before the move), then the transfer legs under one posting id
+    unledgered = (
+        _unledgered_accounts()
+        .where(BankAccount.id.in_(select(src.c.id).union_all(select(dst.c.id))), moved)
+        .cte("unledgered")
+    )
+    opening = _opening_balances_insert(unledgered).cte("opening")
+    posting = (
+        select(LEDGER_POSTING_SEQUENCE.next_value().label("posting_id"))
+        .where(moved)
+        .cte("posting")
+    )
+    entry_type = literal(LedgerEntryType.TRANSFER, LedgerEntry.__table__.c.type.type)
+    legs = (
+        select(
+            posting.c.posting_id,
+            txn.c.from_account_id,
+            -txn.c.amount,
+            entry_type,
+            txn.c.id,
+            literal(now),
+            literal(now),
+        )
+        .union_all(
+            select(
+                posting.c.posting_id,
+                txn.c.to_account_id,
+                txn.c.amount,
+                entry_type,
+                txn.c.id,
+                literal(now),
+                literal(now),
+            )
+        )
+    )
+    ledger = (
+        insert(LedgerEntry)
+        .from_select(
+            ["posting_id", "account_id", "amount", "type", "transaction_id", "created_at", "updated_at"],
+            legs,
+        )
+        .cte("ledger")
+    )
+
+    return (
+        select(
+            otp.c.transaction_id,
+            txn.c.status,
+            select(settle.c.status).scalar_subquery(),
+            txn.c.amount,
+            txn.c.from_account_id,
+            txn.c.to_account_id,
+            src.c.title,
+            dst.c.title,
+            src.c.balance,
+            src.c.user_id,
+            dst.c.user_id,
+            select(used_otp.c.id).exists(),
+            moved,
+        )
+        .select_from(otp)
+        .outerjoin(txn, true())
+        .outerjoin(src, true())
+        .outerjoin(dst, true())
+        .add_cte(opening, ledger)
+    )
+
+
+async def confirm_transfer(user_id: str, token: str) -> Optional[TransferConfirmation]:
+    """
+    Confirm a pending transfer with its OTP, in a single statement.
+
+    Consumes the OTP, and if its transaction is still pending moves the
+    money, posts it to the ledger and completes the transaction; if the
+    source balance doesn't cover it or an account is missing the transaction
+    is failed instead. Returns None when the accounts stayed contended.
+    """
+
+    async def attempt() -> TransferConfirmation:
+        async with session_maker() as session:
+            row = (await session.execute(_confirm_transfer_statement(user_id, token, datetime.utcnow()))).first()
+            if row is None:
+                return TransferConfirmation(otp_found=False)
+
+            (
+                transaction_id,
+                previous_status,
+                status,
+                amount,
+                from_account_id,
+                to_account_id,
+                from_account_title,
+                to_account_title,
+                available,
+                from_user_id,
+                to_user_id,
+                otp_used,
+                moved,
+            ) = row
+            if not otp_used:
+                # Confirmed concurrently with the same token
+                return TransferConfirmation(otp_found=False)
+
+            movable = (
+                previous_status == TransactionStatus.PENDING
+                and from_account_title is not None
+                and to_account_title is not None
+                and from_account_id != to_account_id
+                and available >= amount
+            )
+            if movable and not moved:
+                # An account changed after the snapshot; roll back and re-run
+                raise StaleDataError(f"Accounts of transaction {transaction_id} changed during confirmation")
+
+            await session.commit()
+            if moved:
+                balance_cache.invalidate_users(from_user_id, to_user_id)
+            return TransferConfirmation(
+                otp_found=True,
+                transaction_id=transaction_id,
+                previous_status=previous_status,
+                status=status or previous_status,
+                amount=amount,
+                from_account_id=from_account_id,
+                to_account_id=to_account_id,
+                from_account_title=from_account_title,
+                to_account_title=to_account_title,
+                available=available,
+            )
+
+    return await _retry_on_version_conflict(attempt, f"confirming a transfer of user {user_id}")
+
+
+# Maintenance Repository Functions
+
+
+async def expire_stale_otps(batch_size: int) -> int:
+    """Mark up to `batch_size` pending OTPs past their expiry as EXPIRED. Returns rows updated."""
+    now = datetime.utcnow()
+    batch = (
+        select(OTP.id)
+        .where(OTP.status == OTPStatus.PENDING, OTP.expires_at <= now)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(OTP)
+        .where(OTP.id.in_(batch))
+        .values(status=OTPStatus.EXPIRED, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
     async with session_maker() as session:
-        otp = await session.get(OTP, otp_id)
-        if not otp:
-            return None
-        
-        otp.status = OTPStatus.EXPIRED
-        otp.updated_at = datetime.utcnow()
-        
+        result = await session.execute(stmt)
         await session.commit()
-        await session.refresh(otp)
-        return otp
+        return result.rowcount
+
+
+async def fail_unconfirmed_transactions(created_before: datetime, batch_size: int) -> int:
+    """
+    Fail up to `batch_size` OTP-gated transactions that can no longer be confirmed.
+
+    A pending transaction is abandoned when it has an OTP, none of its OTPs
+    was used, and none is still pending and unexpired. Transactions without
+    an OTP are left alone. Returns rows updated.
+    """
+    now = datetime.utcnow()
+    has_otp = select(OTP.id).where(OTP.transaction_id == Transaction.id)
+    still_confirmable = select(OTP.id).where(
+        OTP.transaction_id == Transaction.id,
+        or_(
+            OTP.status == OTPStatus.USED,
+            and_(OTP.status == OTPStatus.PENDING, OTP.expires_at > now),
+        ),
+    )
+    batch = (
+        select(Transaction.id)
+        .where(
+            Transaction.status == TransactionStatus.PENDING,
+            Transaction.created_at <= created_before,
+            has_otp.exists(),
+            ~still_confirmable.exists(),
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Transaction)
+        .where(Transaction.id.in_(batch))
+        .values(status=TransactionStatus.FAILED, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    async with session_maker() as session:
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount
+
+
+async def mark_overdue_bills(batch_size: int) -> int:
+    """Move up to `batch_size` pending bills past their due date to OVERDUE. Returns rows updated."""
+    now = datetime.utcnow()
+    batch = (
+        select(Bill.id)
+        .where(Bill.status == BillStatus.PENDING, Bill.due_date < now)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Bill)
+        .where(Bill.id.in_(batch))
+        .values(status=BillStatus.OVERDUE, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    async with session_maker() as session:
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount
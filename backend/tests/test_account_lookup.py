@@ -0,0 +1,19 @@
+from core.tools.account_lookup import _unresolved
+from core.tools.messages import render
+from infrastructure.account_titles import AccountTitleIndex
+from infrastructure.models import AccountStatus
+
+
+def test_accounts_sharing_a_title_are_offered_by_their_last_digits():
+    index = AccountTitleIndex(
+        [
+            (1, "Savings", AccountStatus.ACTIVE, "0000000012347"),
+            (2, "Savings", AccountStatus.ACTIVE, "0000000056781"),
+        ]
+    )
+    match = index.resolve("savings")
+    problem = _unresolved("savings", match, index.titles)
+    assert render(problem, "en") == (
+        "Which account do you mean: 'Savings' ending in two three four seven, "
+        "'Savings' ending in six seven eight one?"
+    )
@@ -0,0 +1,76 @@
+from infrastructure.account_titles import AccountTitleIndex, TitleCandidate
+from infrastructure.models import AccountStatus
+
+ACTIVE, SUSPENDED, CLOSED = AccountStatus.ACTIVE, AccountStatus.SUSPENDED, AccountStatus.CLOSED
+
+
+def test_exact_title():
+    index = AccountTitleIndex([(1, "Savings", ACTIVE), (2, "Travel Fund", ACTIVE)])
+    match = index.resolve("Savings")
+    assert (match.account_id, match.title, match.confidence) == (1, "Savings", 1.0)
+
+
+def test_fuzzy_title():
+    index = AccountTitleIndex([(1, "Savings", ACTIVE), (2, "Travel Fund", ACTIVE)])
+    assert index.resolve("travel fun").account_id == 2
+    assert index.resolve("my saving account").account_id == 1
+
+
+def test_no_match():
+    match = AccountTitleIndex([(1, "Savings", ACTIVE)]).resolve("Mortgage")
+    assert match.account_id is None
+    assert not match.ambiguous
+
+
+def test_open_account_wins_over_closed_one_with_the_same_title():
+    index = AccountTitleIndex([(1, "Savings", CLOSED), (2, "Savings", ACTIVE)])
+    assert index.resolve("Savings").account_id == 2
+    assert index.resolve("savings").account_id == 2
+
+
+def test_open_account_wins_over_closed_one_named_exactly():
+    index = AccountTitleIndex([(1, "savings", CLOSED), (2, "Savings", ACTIVE)])
+    assert index.resolve("savings").account_id == 2
+
+
+def test_closed_account_still_matches_up_to_case():
+    index = AccountTitleIndex([(1, "Savings", CLOSED), (2, "Travel Fund", ACTIVE)])
+    assert index.resolve("SAVINGS").account_id == 1
+
+
+def test_latest_closed_account_when_only_closed_ones_match():
+    index = AccountTitleIndex([(1, "Savings", CLOSED), (3, "Savings", CLOSED)])
+    assert index.resolve("Savings").account_id == 3
+
+
+def test_closed_account_never_matches_fuzzily():
+    index = AccountTitleIndex([(1, "Savings", CLOSED)])
+    assert index.resolve("saving").account_id is None
+
+
+def test_two_open_accounts_with_the_same_title_are_ambiguous():
+    index = AccountTitleIndex(
+        [
+            (1, "Savings", ACTIVE, "0000000000017"),
+            (2, "Savings", SUSPENDED, "0000000000025"),
+            (3, "Savings", CLOSED, "0000000000033"),
+        ]
+    )
+    match = index.resolve("savings")
+    assert match.ambiguous
+    assert match.candidates == (
+        TitleCandidate(1, "Savings", "0000000000017"),
+        TitleCandidate(2, "Savings", "0000000000025"),
+    )
+
+
+def test_fuzzy_candidates_are_one_per_account():
+    index = AccountTitleIndex([(1, "Savings", ACTIVE), (2, "Savings", ACTIVE), (3, "Travel Fund", ACTIVE)])
+    match = index.resolve("saving")
+    assert match.ambiguous
+    assert [candidate.account_id for candidate in match.candidates] == [1, 2]
+
+
+def test_titles_are_distinct_and_skip_closed_accounts():
+    index = AccountTitleIndex([(1, "Savings", ACTIVE), (2, "Savings", ACTIVE), (3, "Old", CLOSED)])
+    assert index.titles == ("Savings",)
@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import pytest
+
+from provider_stub import ProviderStub, ProviderStubConfig
+
+from core.calls import assistants
+from core.calls.assistants import assistant_config_hash, get_assistant_id, sync_assistants
+from core.calls.build_payload import PER_LANGUAGE_CONFIGS, build_assistant_config
+from core.calls.initiate_call import initiate_call
+from infrastructure.models import Call
+from settings import settings
+
+LANGUAGES = sorted(PER_LANGUAGE_CONFIGS)
+
+
+@pytest.fixture(autouse=True)
+def provider_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "VAPI_ASSISTANT_CACHE_PATH", str(tmp_path / "assistants.json"))
+    monkeypatch.setattr(settings, "GROQ_PRIVATE_API_KEY", "test")
+    monkeypatch.setattr(settings, "GROQ_PHONE_NUMBER_ID", "test")
+    monkeypatch.setattr(assistants, "_ASSISTANT_IDS", {})
+
+
+def run_against_stub(monkeypatch, scenario, config=None):
+    """Run `scenario(stub)` with the provider URL pointed at a fresh stub."""
+
+    async def main():
+        async with ProviderStub(config or ProviderStubConfig(latency_ms=0, jitter_ms=0)) as stub:
+            monkeypatch.setattr(settings, "VAPI_API_URL", stub.url)
+            return await scenario(stub)
+
+    return asyncio.run(main())
+
+
+def write_cache(entries: dict[str, dict]):
+    with open(settings.VAPI_ASSISTANT_CACHE_PATH, "w") as f:
+        json.dump(entries, f)
+
+
+def read_cache() -> dict[str, dict]:
+    with open(settings.VAPI_ASSISTANT_CACHE_PATH) as f:
+        return json.load(f)
+
+
+def current_hash(language: str) -> str:
+    return assistant_config_hash(build_assistant_config(language))
+
+
+def register(stub: ProviderStub, language: str, config_hash: str) -> str:
+    assistant_id = f"existing-{language}"
+    stub.assistants[assistant_id] = {
+        **build_assistant_config(language),
+        "id": assistant_id,
+        "metadata": {"language": language, "configHash": config_hash},
+    }
+    return assistant_id
+
+
+def test_cache_hit_makes_no_requests(monkeypatch):
+    write_cache({language: {"id": f"cached-{language}", "hash": current_hash(language)} for language in LANGUAGES})
+
+    async def scenario(stub):
+        ids = await sync_assistants()
+        assert stub.stats.requests == 0
+        return ids
+
+    ids = run_against_stub(monkeypatch, scenario)
+    assert ids == {language: f"cached-{language}" for language in LANGUAGES}
+
+
+def test_cache_miss_finds_existing_assistant(monkeypatch):
+    async def scenario(stub):
+        expected = {language: register(stub, language, current_hash(language)) for language in LANGUAGES}
+        ids = await sync_assistants()
+        # One listing, no writes
+        assert stub.stats.requests == 1
+        assert stub.stats.assistant_writes == 0
+        return ids, expected
+
+    ids, expected = run_against_stub(monkeypatch, scenario)
+    assert ids == expected
+    assert read_cache() == {
+        language: {"id": expected[language], "hash": current_hash(language)} for language in LANGUAGES
+    }
+
+
+def test_stale_cache_entry_is_patched(monkeypatch):
+    async def scenario(stub):
+        cached = {language: register(stub, language, "stale") for language in LANGUAGES}
+        write_cache({language: {"id": cached[language], "hash": "stale"} for language in LANGUAGES})
+        ids = await sync_assistants()
+        assert stub.stats.assistant_writes == len(LANGUAGES)
+        assert len(stub.assistants) == len(LANGUAGES)
+        for language, assistant_id in cached.items():
+            assert stub.assistants[assistant_id]["metadata"]["configHash"] == current_hash(language)
+        return ids, cached
+
+    ids, cached = run_against_stub(monkeypatch, scenario)
+    assert ids == cached
+
+
+def test_patch_of_deleted_assistant_falls_back_to_create(monkeypatch):
+    write_cache({language: {"id": f"deleted-{language}", "hash": "stale"} for language in LANGUAGES})
+
+    async def scenario(stub):
+        ids = await sync_assistants()
+        assert set(ids.values()) == set(stub.assistants)
+        return ids
+
+    ids = run_against_stub(monkeypatch, scenario)
+    assert sorted(ids) == LANGUAGES
+    assert not any(assistant_id.startswith("deleted-") for assistant_id in ids.values())
+    assert {language: entry["id"] for language, entry in read_cache().items()} == ids
+
+
+def test_failed_sync_dials_inline(monkeypatch):
+    async def scenario(stub):
+        return await sync_assistants()
+
+    ids = run_against_stub(monkeypatch, scenario, ProviderStubConfig(latency_ms=0, jitter_ms=0, error_rate=1.0))
+    assert ids == {}
+    assert all(get_assistant_id(language) is None for language in LANGUAGES)
+
+
+def test_dial_with_deleted_assistant_is_sent_inline(monkeypatch):
+    monkeypatch.setattr(settings, "VAPI_PERSISTENT_ASSISTANTS", True)
+    write_cache({"en": {"id": "deleted-en", "hash": current_hash("en")}})
+    monkeypatch.setitem(assistants._ASSISTANT_IDS, "en", "deleted-en")
+    call = Call(id=1, phone_number="60123456789", language="en", customer_name="test-inline")
+
+    async def scenario(stub):
+        outcome = await initiate_call(call)
+        assert stub.stats.created == 1
+        return outcome
+
+    outcome = run_against_stub(monkeypatch, scenario)
+    assert outcome.succeeded
+    assert get_assistant_id("en") is None
+    assert "en" not in read_cache()
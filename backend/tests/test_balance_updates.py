@@ -0,0 +1,158 @@
+import asyncio
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+
+from infrastructure import repositories
+from infrastructure.models import AccountStatus, BankAccount, TransactionType
+from settings import settings
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "BALANCE_UPDATE_MAX_ATTEMPTS", 4)
+    monkeypatch.setattr(settings, "BALANCE_UPDATE_RETRY_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(repositories, "balance_update_stats", type(repositories.balance_update_stats)())
+
+
+def test_retry_reruns_the_operation_after_a_conflict():
+    calls = 0
+
+    async def operation():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise StaleDataError("changed")
+        return "done"
+
+    assert asyncio.run(repositories._retry_on_version_conflict(operation, "test")) == "done"
+    stats = repositories.balance_update_stats
+    assert (calls, stats.attempts, stats.conflicts, stats.exhausted) == (3, 3, 2, 0)
+
+
+def test_retry_gives_up_after_max_attempts():
+    async def operation():
+        raise StaleDataError("changed")
+
+    assert asyncio.run(repositories._retry_on_version_conflict(operation, "test")) is None
+    stats = repositories.balance_update_stats
+    assert (stats.attempts, stats.conflicts, stats.exhausted) == (4, 4, 1)
+
+
+def test_retry_doesnt_swallow_other_errors():
+    async def operation():
+        raise repositories.InsufficientFunds(Decimal("1.00"))
+
+    with pytest.raises(repositories.InsufficientFunds):
+        asyncio.run(repositories._retry_on_version_conflict(operation, "test"))
+    assert repositories.balance_update_stats.attempts == 1
+
+
+class _StubSession:
+    """Just enough of an AsyncSession for one transfer attempt."""
+
+    def __init__(self, conflict: bool):
+        self.conflict = conflict
+        self.committed = False
+        self.added = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add(self, row):
+        self.added.append(row)
+
+    async def flush(self):
+        if self.conflict:
+            raise StaleDataError("account version changed")
+        for row in self.added:
+            row.id = 1
+
+    async def commit(self):
+        self.committed = True
+
+    async def refresh(self, row):
+        pass
+
+
+def test_transfer_rereads_accounts_after_a_version_conflict(monkeypatch):
+    # What the database holds; the first attempt sees a stale balance
+    stored = {1: Decimal("100.00"), 2: Decimal("0.00")}
+    reads = [{1: Decimal("150.00"), 2: Decimal("0.00")}]
+    sessions = []
+    ledger = []
+
+    def session_maker():
+        sessions.append(_StubSession(conflict=len(sessions) == 0))
+        return sessions[-1]
+
+    async def load_accounts(session, account_ids):
+        balances = reads.pop(0) if reads else stored
+        return {
+            account_id: BankAccount(
+                id=account_id,
+                user_id=f"user-{account_id}",
+                account_number=str(account_id),
+                balance=balances[account_id],
+                status=AccountStatus.ACTIVE,
+            )
+            for account_id in account_ids
+        }
+
+    async def post_opening_balances(session, accounts):
+        pass
+
+    async def post_ledger(session, entry_type, legs, transaction_id=None):
+        ledger.append((entry_type, legs))
+
+    async def next_reference():
+        return uuid.uuid4().hex[:16]
+
+    monkeypatch.setattr(repositories, "session_maker", session_maker)
+    monkeypatch.setattr(repositories, "_load_accounts", load_accounts)
+    monkeypatch.setattr(repositories, "_post_opening_balances", post_opening_balances)
+    monkeypatch.setattr(repositories, "_post_ledger", post_ledger)
+    monkeypatch.setattr(repositories.transaction_references, "next_reference", next_reference)
+
+    transaction = asyncio.run(repositories.transfer_money_between_accounts(1, 2, Decimal("30.00")))
+
+    assert transaction is not None
+    assert transaction.type == TransactionType.TRANSFER
+    assert [session.committed for session in sessions] == [False, True]
+    # Only the attempt that committed posted to the ledger
+    assert len(ledger) == 1
+    assert [leg.amount for leg in ledger[0][1]] == [Decimal("-30.00"), Decimal("30.00")]
+    assert repositories.balance_update_stats.conflicts == 1
+
+
+@pytest.mark.db
+def test_concurrent_transfers_from_one_account_all_settle(run_db, monkeypatch):
+    count, amount = 20, Decimal("1.00")
+
+    async def scenario():
+        run_id = f"test-{uuid.uuid4().hex[:8]}"
+        source = await repositories.create_account(f"{run_id}-SRC", run_id, "Source", amount * count)
+        destination = await repositories.create_account(f"{run_id}-DST", run_id, "Destination")
+        results = await asyncio.gather(
+            *(
+                repositories.transfer_money_between_accounts(source.id, destination.id, amount)
+                for _ in range(count)
+            )
+        )
+        return (
+            results,
+            await repositories.get_account_by_id(source.id),
+            await repositories.get_account_by_id(destination.id),
+        )
+
+    monkeypatch.setattr(settings, "BALANCE_UPDATE_MAX_ATTEMPTS", 50)
+    results, source, destination = run_db(scenario)
+    settled = sum(1 for result in results if result)
+    assert source.balance == amount * (count - settled)
+    assert destination.balance == amount * settled
+    assert settled == count
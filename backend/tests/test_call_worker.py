@@ -0,0 +1,23 @@
+import asyncio
+
+from entrypoints.background_jobs import main as worker
+from settings import settings
+
+
+def test_cycle_doesnt_claim_calls_without_dial_settings(monkeypatch):
+    claimed = []
+
+    async def claim_due_calls(*args):
+        claimed.append(args)
+        return []
+
+    monkeypatch.setattr(worker, "claim_due_calls", claim_due_calls)
+    monkeypatch.setattr(settings, "GROQ_PRIVATE_API_KEY", "key")
+    monkeypatch.setattr(settings, "GROQ_PHONE_NUMBER_ID", None)
+
+    assert asyncio.run(worker.run_cycle(asyncio.Event())) == 0
+    assert claimed == []
+
+    monkeypatch.setattr(settings, "GROQ_PHONE_NUMBER_ID", "phone")
+    asyncio.run(worker.run_cycle(asyncio.Event()))
+    assert len(claimed) == 1
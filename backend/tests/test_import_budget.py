@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+from import_budget import BUDGETS_MS, measure_entrypoint, slowest_imports
+
+# Multiplies every budget, e.g. IMPORT_BUDGET_SCALE=1.5 on slow CI hosts
+BUDGET_SCALE = float(os.environ.get("IMPORT_BUDGET_SCALE", "1"))
+
+
+@pytest.mark.timing
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_entrypoint_imports_within_budget(module):
+    took_ms, imports = measure_entrypoint(module)
+    budget_ms = BUDGETS_MS[module] * BUDGET_SCALE
+    assert took_ms <= budget_ms, (
+        f"{module} imports in {took_ms:.0f} ms, over its {budget_ms:.0f} ms budget. Slowest imports:\n"
+        + "\n".join(slowest_imports(imports, 10))
+    )
@@ -0,0 +1,131 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from infrastructure import repositories
+from infrastructure.models import OTPStatus
+from settings import settings
+
+
+@pytest.fixture(autouse=True)
+def otp_hash_key(monkeypatch):
+    monkeypatch.setattr(settings, "OTP_HASH_KEY", "test-key")
+
+
+class _StubSession:
+    """Records the statements it's given and answers them from `results`."""
+
+    def __init__(self, results: list):
+        self.results = results
+        self.statements = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def scalar(self, statement):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+    async def commit(self):
+        pass
+
+
+def _compiled(statement):
+    return statement.compile(dialect=postgresql.dialect())
+
+
+def _sql(compiled) -> str:
+    return " ".join(str(compiled).split())
+
+
+def test_hash_is_deterministic_and_hides_the_token():
+    token_hash = repositories.hash_otp_token("user-1", "123456")
+    assert token_hash == repositories.hash_otp_token("user-1", "123456")
+    assert len(token_hash) == 64
+    assert "123456" not in token_hash
+
+
+def test_hash_is_salted_with_the_user():
+    assert repositories.hash_otp_token("user-1", "123456") != repositories.hash_otp_token("user-2", "123456")
+
+
+def test_hash_is_keyed(monkeypatch):
+    token_hash = repositories.hash_otp_token("user-1", "123456")
+    monkeypatch.setattr(settings, "OTP_HASH_KEY", "another-key")
+    assert repositories.hash_otp_token("user-1", "123456") != token_hash
+
+
+def test_generated_tokens_are_six_digits():
+    tokens = [asyncio.run(repositories.generate_otp_token()) for _ in range(20)]
+    assert all(len(token) == 6 and token.isdigit() for token in tokens)
+
+
+def test_issue_statement_expires_pending_and_skips_on_conflict():
+    compiled = _compiled(repositories._issue_otp_statement("user-1", "hash", None, None, None))
+    sql = _sql(compiled)
+    assert sql.startswith("WITH expired AS (UPDATE otps SET status=")
+    assert "WHERE otps.user_id = %(user_id_1)s AND otps.status = %(status_1)s" in sql
+    assert compiled.params["status_1"] == OTPStatus.PENDING
+    assert "ON CONFLICT (user_id) WHERE status = 'PENDING' DO NOTHING" in sql
+
+
+def test_create_otp_stores_only_the_hash_and_reissues_after_a_conflict(monkeypatch):
+    # The first insert loses to a concurrent issuance and returns no row
+    session = _StubSession([None, 7])
+    monkeypatch.setattr(repositories, "session_maker", session)
+
+    issued = asyncio.run(repositories.create_otp("user-1", 3))
+
+    assert (issued.id, issued.transaction_id) == (7, 3)
+    assert len(session.statements) == 2
+    for statement in session.statements:
+        params = _compiled(statement).params.values()
+        assert repositories.hash_otp_token("user-1", issued.token) in params
+        assert issued.token not in params
+
+
+def test_verification_matches_on_the_hash_of_a_pending_otp(monkeypatch):
+    session = _StubSession([None])
+    monkeypatch.setattr(repositories, "session_maker", session)
+
+    assert asyncio.run(repositories.verify_and_use_otp("user-1", "123456")) is None
+
+    compiled = _compiled(session.statements[0])
+    params = compiled.params
+    assert params["user_id_1"] == "user-1"
+    assert params["token_hash_1"] == repositories.hash_otp_token("user-1", "123456")
+    assert "123456" not in params.values()
+    assert "otps.status = %(status_1)s" in _sql(compiled)
+    assert params["status_1"] == OTPStatus.PENDING
+
+
+@pytest.mark.db
+def test_concurrent_issuance_leaves_one_single_use_otp(run_db):
+    requests = 10
+
+    async def scenario():
+        user_id = f"test-{uuid.uuid4().hex[:8]}"
+        issued = await asyncio.gather(*(repositories.create_otp(user_id, None) for _ in range(requests)))
+        otps = await repositories.get_otps_by_user(user_id, limit=requests + 1)
+        pending = [otp for otp in otps if otp.status == OTPStatus.PENDING]
+        winner = next(otp for otp in issued if otp.id == pending[0].id)
+        stale = [otp.token for otp in issued if otp.token != winner.token]
+        stale_results = await asyncio.gather(*(repositories.verify_and_use_otp(user_id, token) for token in stale))
+        results = await asyncio.gather(
+            *(repositories.verify_and_use_otp(user_id, winner.token) for _ in range(requests))
+        )
+        return otps, pending, stale_results, results
+
+    otps, pending, stale_results, results = run_db(scenario)
+    assert len(otps) == requests
+    assert len(pending) == 1
+    assert not any(stale_results)
+    assert sum(1 for result in results if result) == 1
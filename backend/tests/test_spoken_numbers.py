@@ -0,0 +1,77 @@
+import pytest
+
+from core.tools.spoken_numbers import _malay, _mandarin, amount_to_words, numbers_to_words, spell_digits
+
+
+@pytest.mark.parametrize(
+    "number, words",
+    [
+        (0, "kosong"),
+        (7, "tujuh"),
+        (10, "sepuluh"),
+        (11, "sebelas"),
+        (15, "lima belas"),
+        (20, "dua puluh"),
+        (99, "sembilan puluh sembilan"),
+        (100, "seratus"),
+        (101, "seratus satu"),
+        (250, "dua ratus lima puluh"),
+        (1000, "seribu"),
+        (1100, "seribu seratus"),
+        (2019, "dua ribu sembilan belas"),
+        (1000000, "satu juta"),
+        (2500000, "dua juta lima ratus ribu"),
+        (1000000000, "satu bilion"),
+    ],
+)
+def test_malay(number, words):
+    assert _malay(number) == words
+
+
+@pytest.mark.parametrize(
+    "number, words",
+    [
+        (0, "零"),
+        (7, "七"),
+        (10, "十"),
+        (15, "十五"),
+        (20, "二十"),
+        (110, "一百一十"),
+        (101, "一百零一"),
+        (1010, "一千零一十"),
+        (2019, "二千零一十九"),
+        (10000, "一万"),
+        (10001, "一万零一"),
+        (100000, "十万"),
+        (120000, "十二万"),
+        (1000100, "一百万零一百"),
+        (100000000, "一亿"),
+        (100000001, "一亿零一"),
+    ],
+)
+def test_mandarin(number, words):
+    assert _mandarin(number) == words
+
+
+def test_amounts_in_malay_and_mandarin():
+    assert amount_to_words("1250.50", "ms") == "seribu dua ratus lima puluh ringgit dan lima puluh sen"
+    assert amount_to_words("12.05", "zh") == "十二令吉五仙"
+
+
+def test_identifiers_in_free_text_are_spelled_digit_by_digit():
+    assert numbers_to_words("card 1234-5678", "en") == "card one two three four - five six seven eight"
+    assert numbers_to_words("reference 00123", "en") == "reference zero zero one two three"
+    assert numbers_to_words("call 60123456789", "en").startswith("call six zero one two")
+    assert numbers_to_words("version 1.2.3", "en") == "version one . two . three"
+    assert numbers_to_words("plan v2", "en") == "plan v2"
+
+
+def test_numbers_and_decimals_in_free_text():
+    assert numbers_to_words("3 bills, 12.50 each.", "en") == "three bills, twelve point five zero each."
+    assert numbers_to_words("3.14", "ms") == "tiga perpuluhan satu empat"
+    assert numbers_to_words("3.14", "zh") == "三点一四"
+
+
+def test_spelled_digits():
+    assert spell_digits("+6012", "ms") == "+ enam kosong satu dua"
+    assert spell_digits("6012", "zh") == "六零一二"
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql
+
+from core.tools import bills
+from core.tools.messages import render
+from entrypoints.api.tool_parameters import ListBillsToolCallParameters
+from infrastructure import repositories
+from infrastructure.models import AccountStatus, BillStatus, BillType
+from infrastructure.repositories import BillCursor, BillTypeSummary, OutstandingBill
+
+
+class _StubSession:
+    """Records the statements it's given and returns no rows."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def all(self):
+        return []
+
+
+def test_account_summary_and_pages_leave_out_closed_accounts(monkeypatch):
+    session = _StubSession()
+    monkeypatch.setattr(repositories, "session_maker", session)
+
+    asyncio.run(repositories.get_account_summary("user-1"))
+    asyncio.run(repositories.get_accounts_page("user-1", 5))
+
+    for statement in session.statements:
+        compiled = statement.compile(dialect=postgresql.dialect())
+        assert "bank_accounts.status IN (__[POSTCOMPILE_status_1])" in str(compiled)
+        assert compiled.params["status_1"] == [AccountStatus.ACTIVE, AccountStatus.SUSPENDED]
+
+
+def test_bill_summary_reads_counts_and_amounts_as_words(monkeypatch):
+    due = datetime(2026, 11, 2)
+
+    async def get_outstanding_bill_summary(user_id):
+        return (
+            BillTypeSummary(BillType.ELECTRICITY, 2, Decimal("120.50"), due, 1),
+            BillTypeSummary(BillType.WATER, 1, Decimal("30.00"), due, 0),
+        )
+
+    async def get_outstanding_bills_page(user_id, limit, cursor=None):
+        page = [OutstandingBill(1, BillType.ELECTRICITY, Decimal("60.25"), due, BillStatus.OVERDUE)]
+        return page, BillCursor(due, 1)
+
+    monkeypatch.setattr(bills, "get_outstanding_bill_summary", get_outstanding_bill_summary)
+    monkeypatch.setattr(bills, "get_outstanding_bills_page", get_outstanding_bills_page)
+
+    result = asyncio.run(bills.list_outstanding_bills("user-1", ListBillsToolCallParameters(limit=1), "ms"))
+    text = render(result, "ms")
+
+    assert "Anda mempunyai tiga bil tertunggak berjumlah seratus lima puluh ringgit dan lima puluh sen" in text
+    assert "dua bil berjumlah seratus dua puluh ringgit dan lima puluh sen" in text
+    assert "satu lewat bayar" in text
+    assert "enam puluh ringgit dan dua puluh lima sen" in text
+    assert "Berikut satu bil" in text
@@ -90,10 +90,61 @@ export async function POST(request: Request) {
     const backendDb = (await import("@/db/backend-db")).default;
     const connection = await backendDb.getConnection();
 
+    let transactionActive = false;
+
     try {
+      await connection.beginTransaction();
+      transactionActive = true;
+      const now = new Date();
+
+      // Register the number for recipient lookups; it takes precedence over
+      // numbers other users have called, but never over another user's
+      // onboarding
+      const [claim] = await connection.query(
+        `INSERT INTO phone_directory (
+          phone_number,
+          user_id,
+          source,
+          created_at,
+          updated_at
+        )
+        SELECT normalize_phone_number(?), ?, 'ONBOARDING', ?, ?
+        WHERE normalize_phone_number(?) IS NOT NULL
+        ON CONFLICT (phone_number) DO UPDATE SET
+          user_id = EXCLUDED.user_id,
+          source = EXCLUDED.source,
+          updated_at = EXCLUDED.updated_at
+        WHERE phone_directory.source <> 'ONBOARDING'
+          OR phone_directory.user_id = EXCLUDED.user_id
+        RETURNING phone_number`,
+        [phoneNumber.trim(), session.user.id, now, now, phoneNumber.trim()]
+      );
+
+      if ((claim as any).affectedRows === 0) {
+        const [owners] = await connection.query(
+          `SELECT user_id
+          FROM phone_directory
+          WHERE phone_number = normalize_phone_number(?)
+            AND source = 'ONBOARDING'
+            AND user_id <> ?`,
+          [phoneNumber.trim(), session.user.id]
+        );
+        if ((owners as any[]).length > 0) {
+          await connection.rollback();
+          transactionActive = false;
+          connection.release();
+          return NextResponse.json(
+            {
+              success: false,
+              error: "This phone number is already registered to another user",
+            },
+            { status: 409 }
+          );
+        }
+      }
+
       // Generate a unique account number (format: ACC-XXXXXXXXXX)
       const accountNumber = `ACC-${Date.now()}${Math.floor(Math.random() * 1000)}`;
-      const now = new Date();
 
       // Insert new account
       const [result] = await connection.query(
@@ -135,6 +186,9 @@ export async function POST(request: Request) {
 
       const accountData = (accounts as any[])[0];
 
+      await connection.commit();
+      transactionActive = false;
+
       // Now update user with phone number and mark onboarding as completed
       await db
         .update(user)
@@ -159,6 +213,9 @@ export async function POST(request: Request) {
         },
       });
     } catch (error) {
+      if (transactionActive) {
+        await connection.rollback();
+      }
       connection.release();
       console.error("Error creating bank account or updating user:", error);
       return NextResponse.json(
@@ -118,7 +118,7 @@ function OTPCard({ otp }: { otp: OTP }) {
                   isPending ? "text-foreground" : "text-muted-foreground"
                 )}
               >
-                {otp.token}
+                {otp.token ?? "••••••"}
               </span>
               <span
                 className={cn(
@@ -1,7 +1,7 @@
 export interface OTP {
   id: number;
   user_id: string;
-  token: string;
+  token: string | null;
   transaction_id: number | null;
   status: 'PENDING' | 'USED' | 'EXPIRED';
   expires_at: string;